@@ -1,26 +1,44 @@
-from flask import Flask, render_template, jsonify, Response
+from flask import Flask, render_template, jsonify, Response, request
 from flask_socketio import SocketIO
-import pandas as pd
 import json
 import os
-import time
 from utils.secrets import read_secret
+from utils.lazy import lazy_singleton
 from websocket_server import init_socketio, start_market_data_stream
 from market_simulator import MarketDataSimulator
-from trade_executor import execute_trade, close_trade, adjust_risk_parameters, calculate_position_size
 from performance_tracker import PerformanceTracker
+from pubsub import Channel
+from csv_cache import CsvCache
+from trade_journal import get_trade_journal
+import orjson
+
+# Server-sent events
+SSE_KEEPALIVE = 15     # Seconds of silence before a keep-alive comment, which also detects closed clients
+SSE_RETRY_MS = 1000    # Reconnection delay suggested to EventSource clients
 
 app = Flask(__name__)
 socketio = init_socketio(app)
-start_market_data_stream(socketio)
+# Live ticks for the SSE endpoint, encoded once per tick whatever the number of clients
+market_data_channel = Channel(encoder=json.dumps)
+start_market_data_stream(app.extensions['market_data_hub'], market_data_channel)
 
 # Path to the data directory
 DATA_DIR = 'data'
 STATUS_FILE = os.path.join(DATA_DIR, 'status.json')
-TRADES_FILE = os.path.join(DATA_DIR, 'trades.csv')
 MARKET_DATA_FILE = os.path.join(DATA_DIR, 'market_data.csv')
+MARKET_DATA_ROWS = 100  # Ticks returned by /api/market_data
+
+# Parsed and encoded file contents, refreshed when the file changes
+market_data_cache = CsvCache(MARKET_DATA_FILE, max_rows=MARKET_DATA_ROWS)
+
+# pandas and the market data store are imported on first use to keep startup fast
+@lazy_singleton
+def get_market_data_store():
+    from market_data_store import MarketDataStore
+    return MarketDataStore()
 
 def main():
+    from trade_executor import execute_trade, close_trade, adjust_risk_parameters, calculate_position_size
     simulator = MarketDataSimulator()
     entry_price, stop_loss, take_profit = None, None, None
     account_balance = 10000  # Example starting balance
@@ -44,10 +62,28 @@ def main():
                 entry_price, stop_loss, take_profit = None, None, None
 
         # Log performance metrics periodically
-        if len(performance_tracker.trades) % 10 == 0:
+        if performance_tracker.count % 10 == 0:
             metrics = performance_tracker.calculate_metrics()
             print("Live Performance Metrics:", metrics)
 
+def cached_json_response(cache):
+    """
+    Serve a CsvCache's JSON with its ETag, or 304 Not Modified if the client already has it.
+    """
+    body, etag = cache.get()
+    return json_response(body, etag)
+
+def json_response(body, etag):
+    """
+    Serve encoded JSON with an ETag, or 304 Not Modified if the client already has that version.
+    """
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -64,42 +100,73 @@ def api_status():
 
 @app.route('/api/trades')
 def api_trades():
-    """API endpoint to get open trades."""
-    if os.path.exists(TRADES_FILE):
-        trades = pd.read_csv(TRADES_FILE).to_dict(orient='records')
-        return jsonify(trades)
-    else:
-        return jsonify({"error": "Trades file not found"}), 404
+    """API endpoint to get trades from the trade journal.
+
+    Optional query parameters: `trade_id`, `start` and `end` (ISO
+    timestamps) and `limit` (newest trades only). Responses are tagged with
+    the journal's last entry, so polling clients get 304 until it changes.
+    """
+    journal = get_trade_journal()
+    etag = f"trades-{journal.last_seq}"
+    if etag in request.if_none_match:
+        return json_response(None, etag)
+    limit = request.args.get('limit')
+    if limit is not None and not limit.isdigit():
+        return jsonify({"error": "limit must be a non-negative integer"}), 400
+    trades = journal.query(request.args.get('trade_id'), request.args.get('start'), request.args.get('end'),
+                           int(limit) if limit is not None else None)
+    return json_response(orjson.dumps(trades), etag)
 
 @app.route('/api/market_data')
 def api_market_data():
-    """API endpoint to get recent market data."""
-    if os.path.exists(MARKET_DATA_FILE):
-        data = pd.read_csv(MARKET_DATA_FILE, parse_dates=['time'])
-        data = data.tail(100).to_dict(orient='records')  # Fetch last 100 data points
-        return jsonify(data)
-    else:
+    """API endpoint to get recent market data.
+
+    With an `instrument` query parameter (and optional `granularity`, `start`
+    and `end`), candles are served from the market data store; otherwise the
+    last MARKET_DATA_ROWS ticks of the market data file are returned.
+    """
+    instrument = request.args.get('instrument')
+    if instrument:
+        granularity = request.args.get('granularity', 'M1')
+        start, end = request.args.get('start'), request.args.get('end')
+        if start or end:
+            data = get_market_data_store().read(instrument, granularity, start, end)
+        else:
+            data = get_market_data_store().tail(instrument, granularity, 100)
+        if data.empty:
+            return jsonify({"error": f"No {instrument} {granularity} market data"}), 404
+        return jsonify(data.reset_index().to_dict(orient='records'))
+    try:
+        return cached_json_response(market_data_cache)
+    except FileNotFoundError:
         return jsonify({"error": "Market data file not found"}), 404
 
 @app.route('/api/stream/market_data')
 def stream_market_data():
+    """Server-sent events of live ticks.
+
+    Reconnecting clients send the id of the last event they received in the
+    Last-Event-ID header (EventSource does this itself) and get the recent
+    ticks they missed first.
+    """
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('lastEventId'))
+    subscription = market_data_channel.subscribe(last_event_id)
+
     def generate():
-        last_modified = 0
-        while True:
-            try:
-                if os.path.exists(MARKET_DATA_FILE):
-                    current_modified = os.path.getmtime(MARKET_DATA_FILE)
-                    if current_modified > last_modified:
-                        data = pd.read_csv(MARKET_DATA_FILE, parse_dates=['time'])
-                        latest_data = data.tail(1).to_dict(orient='records')[0]
-                        yield f"data: {json.dumps(latest_data)}\n\n"
-                        last_modified = current_modified
-                time.sleep(1)  # Check every second
-            except Exception as e:
-                print(f"Error in stream: {e}")
-                time.sleep(1)
-
-    return Response(generate(), mimetype='text/event-stream')
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while True:
+                event = subscription.get(timeout=SSE_KEEPALIVE)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                event_id, data = event
+                yield f"id: {event_id}\ndata: {data}\n\n"
+        finally:
+            subscription.close()
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 if __name__ == '__main__':
     main()
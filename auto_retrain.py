@@ -5,6 +5,8 @@ import os
 import sys
 
 # Configuration
+RETRAIN_NUM_ENVS = 16  # Parallel training episodes for the nightly fine-tune
+RETRAIN_WORKERS = 0  # Environment worker processes (0 = all cores)
 LOG_DIR = "logs"
 os.makedirs(LOG_DIR, exist_ok=True)
 logging.basicConfig(
@@ -25,7 +27,11 @@ def run_fetch_data():
 def run_retraining():
     try:
         logging.info("Starting model retraining.")
-        subprocess.check_call(["python", "retrain_agent.py"])
+        subprocess.check_call([
+            "python", "retrain_agent.py",
+            "--num-envs", str(RETRAIN_NUM_ENVS),
+            "--workers", str(RETRAIN_WORKERS),
+        ])
         logging.info("Model retraining completed successfully.")
     except subprocess.CalledProcessError as e:
         logging.error(f"Model retraining failed: {e}")
@@ -1,8 +1,10 @@
-import gym
 import numpy as np
 import pandas as pd
 from stable_baselines3 import PPO
-from forex_env import ForexEnv  # Replace with the actual path to your custom environment
+from forex_env import WINDOW_SIZE
+from vec_forex_env import VecForexEnv, stack_price_arrays
+from market_data_store import MarketDataStore
+from price_array import slice_price_array
 import matplotlib.pyplot as plt
 
 def calculate_sharpe_ratio(returns, risk_free_rate=0):
@@ -46,75 +48,148 @@ def calculate_max_drawdown(equity_curve):
     drawdown = (equity_curve - cumulative_max) / cumulative_max
     return drawdown.min() * 100
 
-def backtest(model_path, historical_data_path, output_csv='backtest_results.csv'):
+def episode_bounds(segment_lengths, episodes_per_segment=1, window_size=WINDOW_SIZE):
+    """
+    Split each instrument segment of a stacked price array into contiguous episodes.
+
+    Consecutive episodes overlap by `window_size` - 1 rows, so every bar after
+    the first window of a segment is traded by exactly one episode.
+
+    Parameters:
+    - segment_lengths (list of int): Rows of each instrument segment.
+    - episodes_per_segment (int, optional): Episodes per segment. Defaults to 1.
+    - window_size (int, optional): Bars per observation. Defaults to WINDOW_SIZE.
+
+    Returns:
+    - np.ndarray: (episodes, 2) array of (start, end) rows.
+    """
+    bounds = []
+    offset = 0
+    for length in segment_lengths:
+        steps = length - window_size
+        # Episodes can't be shorter than one step
+        cuts = np.linspace(0, steps, min(episodes_per_segment, steps) + 1).astype(np.int64)
+        for first, last in zip(cuts[:-1], cuts[1:]):
+            bounds.append((offset + first, offset + last + window_size))
+        offset += length
+    return np.array(bounds, dtype=np.int64)
+
+def run_episodes(model, env, steps):
+    """
+    Step every episode of `env` once to completion, predicting all actions in one batch per step.
+
+    Parameters:
+    - model (PPO): Trained model.
+    - env (VecForexEnv): Environment with fixed episode bounds.
+    - steps (np.ndarray): Steps in each environment's episode.
+
+    Returns:
+    - tuple: (equity, trade_profit) arrays of shape (max steps, num_envs),
+      NaN after an episode's last step. An account that goes bust keeps its
+      final equity for the rest of its episode.
+    """
+    equity = np.full((steps.max(), env.num_envs), np.nan)
+    trade_profit = np.full_like(equity, np.nan)
+    busted = np.zeros(env.num_envs, dtype=bool)
+    obs = env.reset()
+    for t in range(len(equity)):
+        actions, _states = model.predict(obs, deterministic=True)
+        obs, rewards, dones, infos = env.step(actions)
+        live = np.flatnonzero((t < steps) & ~busted)
+        equity[t, live] = [infos[i]['current_equity'] for i in live]
+        trade_profit[t, live] = [infos[i]['trade_profit'] for i in live]
+        if busted.any():
+            equity[t, busted] = equity[t - 1, busted]
+            trade_profit[t, busted] = 0
+        busted |= dones & (t < steps - 1)
+    return equity, trade_profit
+
+def backtest(model_path, instruments, granularity, start=None, end=None, episodes=32, output_csv='backtest_results.csv'):
     """
     Backtest the trained agent on historical data and calculate performance metrics.
 
+    Every instrument's history is split into `episodes` consecutive episodes,
+    and all episodes of all instruments are stepped in lockstep in one
+    VecForexEnv, so the policy runs once per step on a batch of observations.
+    Each episode starts flat; the equity curve of an instrument chains the
+    PnL of its episodes.
+
     Parameters:
     - model_path (str): Path to the trained PPO model.
-    - historical_data_path (str): Path to the historical Forex data CSV file.
+    - instruments (str or list of str): Instruments to backtest on (e.g., 'EUR_USD').
+    - granularity (str): Candle granularity (e.g., 'M1').
+    - start (optional): Inclusive start of the backtest period. Defaults to the first stored candle.
+    - end (optional): Exclusive end of the backtest period. Defaults to the last stored candle.
+    - episodes (int, optional): Episodes per instrument run in parallel. Defaults to 32.
     - output_csv (str, optional): Path to save the backtest results. Defaults to 'backtest_results.csv'.
     """
-    # Load the historical data
-    data = pd.read_csv(historical_data_path, parse_dates=['time'], index_col='time')
-    
-    # Initialize the custom Forex trading environment with historical data
-    env = ForexEnv(historical_data=data)
-    
+    if isinstance(instruments, str):
+        instruments = [instruments]
+
+    # Memory-map the historical data, with the technical indicators the agent was trained on
+    store = MarketDataStore()
+    data = {instrument: slice_price_array(store.load_price_array(instrument, granularity), start, end)
+            for instrument in instruments}
+
+    # One fixed-range episode per slice of each instrument's history
+    stacked = stack_price_arrays(data)
+    bounds = episode_bounds(stacked.segment_lengths, episodes)
+    env = VecForexEnv(stacked, episode_bounds=bounds)
+
     # Load the trained PPO model
-    model = PPO.load(model_path, env=env)
-    
-    obs = env.reset()
-    done = False
-    trades = []
-    equity_curve = []
-    
-    while not done:
-        action, _states = model.predict(obs, deterministic=True)
-        obs, reward, done, info = env.step(action)
-        
-        # Assuming the environment returns 'trade_profit' in 'info' dict
-        trade_profit = info.get('trade_profit', 0)
-        trades.append(trade_profit)
-        
-        # Assuming the environment tracks equity and returns it in 'info'
-        current_equity = info.get('current_equity', env.initial_balance)
-        equity_curve.append(current_equity)
-    
-    # Convert equity_curve to pandas Series for calculations
-    equity_series = pd.Series(equity_curve, index=data.index[:len(equity_curve)])
-    
-    # Calculate performance metrics
-    returns = equity_series.pct_change().dropna()
-    sharpe_ratio = calculate_sharpe_ratio(returns)
-    win_rate = calculate_win_rate(trades)
-    max_drawdown = calculate_max_drawdown(equity_series)
-    
+    model = PPO.load(model_path)
+
+    steps = bounds[:, 1] - bounds[:, 0] - env.window_size
+    equity, trade_profit = run_episodes(model, env, steps)
+
+    results = []
+    plt.figure(figsize=(12, 6))
+    segment_starts = np.cumsum([0] + list(stacked.segment_lengths))
+    for k, instrument in enumerate(instruments):
+        envs = np.flatnonzero(env.instrument_idx == k)
+        # Chain the episodes: each continues from the previous one's final equity
+        pnl = [equity[:steps[i], i] - env.initial_balance for i in envs]
+        offsets = np.cumsum([0.0] + [p[-1] for p in pnl[:-1]])
+        equity_curve = env.initial_balance + np.concatenate([p + o for p, o in zip(pnl, offsets)])
+        trades = np.concatenate([trade_profit[:steps[i], i] for i in envs]).tolist()
+
+        # Equity is marked at the close of the bar after each action
+        first_bar = bounds[envs[0], 0] - segment_starts[k] + env.window_size
+        times = data[instrument].times[first_bar:first_bar + len(equity_curve)]
+        index = pd.DatetimeIndex(times.astype('datetime64[ns]'), name='time')
+        equity_series = pd.Series(equity_curve, index=index)
+
+        # Calculate performance metrics
+        returns = equity_series.pct_change().dropna()
+        results.append({
+            'Instrument': instrument,
+            'Sharpe Ratio': calculate_sharpe_ratio(returns),
+            'Win Rate (%)': calculate_win_rate(trades),
+            'Maximum Drawdown (%)': calculate_max_drawdown(equity_series)
+        })
+        equity_series.plot(label=instrument)
+
     # Save backtest results
-    backtest_results = {
-        'Sharpe Ratio': sharpe_ratio,
-        'Win Rate (%)': win_rate,
-        'Maximum Drawdown (%)': max_drawdown
-    }
-    
-    results_df = pd.DataFrame([backtest_results])
+    results_df = pd.DataFrame(results)
     results_df.to_csv(output_csv, index=False)
-    
+
     # Display the results
     print("\nBacktest Performance Metrics:")
     print(results_df)
-    
-    # Plot the equity curve
-    plt.figure(figsize=(12, 6))
-    equity_series.plot(title='Equity Curve')
+
+    # Plot the equity curves
+    plt.title('Equity Curve')
     plt.xlabel('Time')
     plt.ylabel('Equity')
+    plt.legend()
     plt.grid(True)
     plt.show()
 
 if __name__ == "__main__":
     MODEL_PATH = "ppo_forex_agent.zip"          # Path to your trained model
-    HISTORICAL_DATA_PATH = "historical_data.csv"  # Path to your historical data CSV
+    INSTRUMENTS = ["EUR_USD"]                   # Instruments to backtest on
+    GRANULARITY = "M1"                          # Candle granularity
+    EPISODES = 32                               # Episodes per instrument stepped in lockstep
     OUTPUT_CSV = "backtest_results.csv"         # Output path for backtest results
 
-    backtest(MODEL_PATH, HISTORICAL_DATA_PATH, OUTPUT_CSV) 
\ No newline at end of file
+    backtest(MODEL_PATH, INSTRUMENTS, GRANULARITY, episodes=EPISODES, output_csv=OUTPUT_CSV) 
\ No newline at end of file
@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+from position_ledger import DEFAULT_SPREAD, DEFAULT_COMMISSION
+from price_array import PriceArray
+from performance_tracker import RunningStats
+
+# Default exit levels, in price units from the fill (as in trade_executor.execute_trade)
+STOP_LOSS_DISTANCE = 0.001
+TAKE_PROFIT_DISTANCE = 0.002
+SCAN_BARS = 64  # Bars examined by the first exit scan of each trade; doubles while no exit is found
+
+# Why each trade was closed
+EXIT_STOP_LOSS = 0
+EXIT_TAKE_PROFIT = 1
+EXIT_RULE = 2
+EXIT_END_OF_DATA = 3
+
+TRADE_DTYPE = np.dtype([
+    ('entry_bar', np.int64),
+    ('exit_bar', np.int64),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('units', np.float64),
+    ('pnl', np.float64),
+    ('reason', np.int8),
+])
+
+def to_columns(data):
+    """
+    Expose market data as a dict of per-column NumPy arrays.
+
+    Rule functions written for one row, such as `trading_strategy.should_enter_trade`,
+    evaluate element-wise on these arrays. Candle data without quotes gets its
+    'close' column aliased as 'bid', so quote-based rules apply to it too.
+
+    Parameters:
+    - data (pd.DataFrame, PriceArray or dict): Market data.
+
+    Returns:
+    - dict: Column name to 1-D array (views where possible).
+    """
+    if isinstance(data, PriceArray):
+        columns = {name: data.prices[:, i] for i, name in enumerate(data.columns)}
+    elif isinstance(data, pd.DataFrame):
+        columns = {name: data[name].to_numpy() for name in data.select_dtypes(include=[np.number]).columns}
+    else:
+        columns = {name: np.asarray(values) for name, values in data.items()}
+    if 'bid' not in columns and 'close' in columns:
+        columns['bid'] = columns['close']
+    return columns
+
+class BacktestEngine:
+    """
+    Network-free backtest of a single-position, rule-based strategy.
+
+    Entry signals are evaluated for every bar in one vectorized call. The
+    simulation then jumps from event to event instead of walking bars: it
+    finds the next entry signal with a binary search, and the exit of the
+    open trade with vectorized scans over growing windows of bars, checking
+    the stop loss and take profit against each bar's low/high and the exit
+    rule against its columns. Cost therefore scales with the number of trades
+    rather than the number of bars.
+
+    Fills follow PositionLedger: market orders fill at the price column plus
+    or minus half the spread, stop loss and take profit orders at their level,
+    and the stop loss is assumed to fill first when a bar touches both. A
+    trade opened on a bar can exit from the next bar on; after an exit the
+    strategy may enter again from the following bar.
+    """
+
+    def __init__(self, data, price_column=None):
+        """
+        Parameters:
+        - data (pd.DataFrame, PriceArray or dict): Market data with the price
+          column and, optionally, 'high' and 'low' for intrabar exits.
+        - price_column (str, optional): Column used for market fills. Defaults
+          to 'bid' if present, otherwise 'close'.
+        """
+        self.columns = to_columns(data)
+        self.price_column = price_column or ('bid' if 'bid' in self.columns else 'close')
+        self.price = self.columns[self.price_column]
+        self.high = self.columns.get('high', self.price)
+        self.low = self.columns.get('low', self.price)
+        self.bars = len(self.price)
+        self._entries = {}  # Entry rule -> bars with an entry signal, shared by runs with other parameters
+
+    def _window(self, start, end):
+        return {name: values[start:end] for name, values in self.columns.items()}
+
+    def _find_exit(self, start, direction, entry, stop_loss, take_profit, exit_rule):
+        """
+        Return (bar, reason, exit price) of the first exit at or after bar `start`.
+        """
+        size = SCAN_BARS
+        while start < self.bars:
+            end = min(start + size, self.bars)
+            low = self.low[start:end]
+            high = self.high[start:end]
+            if direction > 0:
+                stopped = low <= stop_loss
+                taken = high >= take_profit
+            else:
+                stopped = high >= stop_loss
+                taken = low <= take_profit
+            hit = stopped | taken
+            if exit_rule is not None:
+                ruled = np.asarray(exit_rule(self._window(start, end), entry), dtype=bool)
+                hit = hit | ruled
+            if hit.any():
+                i = int(np.argmax(hit))
+                if stopped[i]:
+                    return start + i, EXIT_STOP_LOSS, stop_loss
+                if taken[i]:
+                    return start + i, EXIT_TAKE_PROFIT, take_profit
+                return start + i, EXIT_RULE, None
+            start = end
+            size *= 2
+        return self.bars - 1, EXIT_END_OF_DATA, None
+
+    def run(self, entry_rule, exit_rule=None, stop_loss=STOP_LOSS_DISTANCE, take_profit=TAKE_PROFIT_DISTANCE,
+            direction=1, units=1.0, spread=DEFAULT_SPREAD, commission=DEFAULT_COMMISSION):
+        """
+        Simulate the strategy over the whole history.
+
+        Parameters:
+        - entry_rule (callable): Maps the column dict to a per-bar boolean entry signal,
+          e.g. `trading_strategy.should_enter_trade`.
+        - exit_rule (callable, optional): Maps a column dict window and the entry price
+          to a per-bar boolean exit signal, e.g. `trading_strategy.should_exit_trade`.
+        - stop_loss (float, optional): Stop loss distance from the fill, or None. Defaults to STOP_LOSS_DISTANCE.
+        - take_profit (float, optional): Take profit distance from the fill, or None. Defaults to TAKE_PROFIT_DISTANCE.
+        - direction (int, optional): 1 to trade long, -1 to trade short. Defaults to 1.
+        - units (float, optional): Position size. Defaults to 1.
+        - spread (float, optional): Bid/ask spread in price units. Defaults to DEFAULT_SPREAD.
+        - commission (float, optional): Commission per unit, charged on open and on close.
+
+        Returns:
+        - np.ndarray: One TRADE_DTYPE record per trade, in time order.
+        """
+        entries = self._entries.get(entry_rule)
+        if entries is None:
+            signal = np.broadcast_to(np.asarray(entry_rule(self.columns), dtype=bool), (self.bars,))
+            entries = self._entries[entry_rule] = np.flatnonzero(signal)
+        half_spread = direction * spread / 2
+        trades = []
+        bar = 0
+        while True:
+            k = np.searchsorted(entries, bar)
+            if k == len(entries):
+                break
+            entry_bar = int(entries[k])
+            entry = float(self.price[entry_bar]) + half_spread
+            sl = entry - direction * stop_loss if stop_loss else -direction * np.inf
+            tp = entry + direction * take_profit if take_profit else direction * np.inf
+
+            exit_bar, reason, exit_price = self._find_exit(entry_bar + 1, direction, entry, sl, tp, exit_rule)
+            if exit_price is None:
+                exit_price = float(self.price[exit_bar]) - half_spread
+            pnl = units * direction * (exit_price - entry) - 2 * commission * units
+            trades.append((entry_bar, exit_bar, entry, exit_price, units, pnl, reason))
+            bar = exit_bar + 1
+        return np.array(trades, dtype=TRADE_DTYPE)
+
+def summarize(trades):
+    """
+    Compute performance metrics of a backtest's trades.
+
+    The trades' PnL goes through the same RunningStats as PerformanceTracker,
+    so a backtest reports exactly the metrics live trading does.
+
+    Returns:
+    - dict: The all-time metrics of `RunningStats.metrics` ('trades', 'win_rate', 'total_pnl',
+      'profit_factor', 'sharpe', 'sortino', 'max_drawdown', ...).
+    """
+    pnl = trades['pnl']
+    stats = RunningStats()
+    for profit in pnl.tolist():
+        stats.add(profit)
+    equity = np.concatenate([[0.0], np.cumsum(pnl)])
+    return stats.metrics(float((np.maximum.accumulate(equity) - equity).max()))
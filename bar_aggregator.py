@@ -0,0 +1,166 @@
+import numpy as np
+
+GRANULARITY_SECONDS = {
+    'S5': 5, 'S10': 10, 'S15': 15, 'S30': 30,
+    'M1': 60, 'M2': 120, 'M4': 240, 'M5': 300, 'M10': 600, 'M15': 900, 'M30': 1800,
+    'H1': 3600, 'H2': 7200, 'H3': 10800, 'H4': 14400, 'H6': 21600, 'H8': 28800, 'H12': 43200,
+    'D': 86400,
+}
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+LIVE_GRANULARITIES = ('M1', 'M5', 'H1')  # Bars built from live ticks
+BAR_BUFFER_CAPACITY = 1024               # Bars kept per granularity
+
+class BarBuffer:
+    """
+    Fixed-capacity ring buffer of bars.
+
+    Every row is written twice, at its slot and `capacity` rows further on,
+    so the newest n bars are always one contiguous slice: appends and window
+    reads are O(1) and allocation-free, and memory stays at 2 x capacity rows
+    however many bars pass through. Windows are views into the buffer and
+    are overwritten by later appends; callers that keep them must copy them.
+    """
+
+    def __init__(self, capacity, columns, dtype=np.float64):
+        self.capacity = capacity
+        self.columns = list(columns)
+        self._rows = np.zeros((2 * capacity, len(self.columns)), dtype=dtype)
+        self._times = np.zeros(2 * capacity, dtype=np.int64)
+        self._pos = 0      # Slot of the next append
+        self.count = 0     # Bars held, at most `capacity`
+
+    def __len__(self):
+        return self.count
+
+    def append(self, values, time_ns=0):
+        """
+        Add one bar, dropping the oldest once the buffer is full.
+
+        Parameters:
+        - values (sequence of float): One value per column, in `columns` order.
+        - time_ns (int, optional): Bar time in UTC nanoseconds.
+        """
+        pos = self._pos
+        self._rows[pos] = self._rows[pos + self.capacity] = values
+        self._times[pos] = self._times[pos + self.capacity] = time_ns
+        self._pos = pos + 1 if pos + 1 < self.capacity else 0
+        if self.count < self.capacity:
+            self.count += 1
+
+    def window(self, n=None):
+        """
+        Return the newest `n` bars (all held bars by default), oldest first, as a view.
+        """
+        n = self.count if n is None else min(n, self.count)
+        end = self._pos + self.capacity
+        return self._rows[end - n:end]
+
+    def times(self, n=None):
+        """Return the times of the newest `n` bars, oldest first, as a view."""
+        n = self.count if n is None else min(n, self.count)
+        end = self._pos + self.capacity
+        return self._times[end - n:end]
+
+    def column(self, name, n=None):
+        """Return one column of the newest `n` bars, oldest first, as a view."""
+        return self.window(n)[:, self.columns.index(name)]
+
+class BarAggregator:
+    """
+    Incremental tick-to-bar aggregation for one instrument and granularity.
+
+    Bars are aligned to whole multiples of the granularity since the UNIX
+    epoch, like OANDA's candles up to H1, and their volume is the number of
+    ticks. A bar is complete once a tick or heartbeat at or after its end
+    arrives; ticks older than the forming bar are ignored.
+    """
+
+    def __init__(self, granularity='M1'):
+        self.granularity = granularity
+        self.period = GRANULARITY_SECONDS[granularity] * 10**9
+        self.bar = None  # The forming bar, as returned on completion
+
+    def update(self, time_ns, price):
+        """
+        Add one tick.
+
+        Parameters:
+        - time_ns (int): Tick time in UTC nanoseconds.
+        - price (float): Tick price (e.g. the mid).
+
+        Returns:
+        - dict or None: The bar the tick completed ('time' in UTC nanoseconds plus BAR_COLUMNS), if any.
+        """
+        start = time_ns - time_ns % self.period
+        bar = self.bar
+        if bar is not None and start == bar['time']:
+            if price > bar['high']:
+                bar['high'] = price
+            elif price < bar['low']:
+                bar['low'] = price
+            bar['close'] = price
+            bar['volume'] += 1
+            return None
+        if bar is not None and start < bar['time']:
+            return None
+        self.bar = {'time': start, 'open': price, 'high': price, 'low': price, 'close': price, 'volume': 1}
+        return bar
+
+    def flush(self, time_ns):
+        """
+        Complete the forming bar if `time_ns` is past its end, e.g. on a heartbeat in a quiet market.
+
+        Returns:
+        - dict or None: The completed bar, if any.
+        """
+        bar = self.bar
+        if bar is not None and time_ns >= bar['time'] + self.period:
+            self.bar = None
+            return bar
+        return None
+
+class TickAggregator:
+    """
+    Builds bars of several granularities from the ticks of one instrument.
+
+    Each tick updates one BarAggregator per granularity, and completed bars
+    are stored in a BarBuffer per granularity (`bars`), so the cost per tick
+    is constant and memory is bounded by the buffer capacity.
+    """
+
+    def __init__(self, granularities=LIVE_GRANULARITIES, capacity=BAR_BUFFER_CAPACITY):
+        self.aggregators = {granularity: BarAggregator(granularity) for granularity in granularities}
+        self.bars = {granularity: BarBuffer(capacity, BAR_COLUMNS) for granularity in granularities}
+
+    def _store(self, completed):
+        for granularity, bar in completed.items():
+            self.bars[granularity].append([bar[column] for column in BAR_COLUMNS], bar['time'])
+        return completed
+
+    def update(self, time_ns, price):
+        """
+        Add one tick.
+
+        Returns:
+        - dict: Granularity to the bar the tick completed, for the granularities that completed one.
+        """
+        completed = {}
+        for granularity, aggregator in self.aggregators.items():
+            bar = aggregator.update(time_ns, price)
+            if bar:
+                completed[granularity] = bar
+        return self._store(completed)
+
+    def flush(self, time_ns):
+        """
+        Complete the bars that ended before `time_ns`, e.g. on a heartbeat.
+
+        Returns:
+        - dict: Granularity to completed bar, as for `update`.
+        """
+        completed = {}
+        for granularity, aggregator in self.aggregators.items():
+            bar = aggregator.flush(time_ns)
+            if bar:
+                completed[granularity] = bar
+        return self._store(completed)
@@ -0,0 +1,76 @@
+"""
+Throughput benchmark for the vectorized backtest engine.
+
+Runs the trading_strategy rules with stop loss and take profit over synthetic
+M1 data, checks the trades against a straightforward per-bar Python loop on a
+prefix of the data, and reports bars per second for both.
+
+Usage (from the repository root):
+    python -m benchmarks.backtest_engine --rows 10000000
+"""
+import argparse
+import time
+import numpy as np
+from backtest_engine import BacktestEngine, TRADE_DTYPE, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_RULE, EXIT_END_OF_DATA
+from backtest_engine import STOP_LOSS_DISTANCE, TAKE_PROFIT_DISTANCE
+from position_ledger import DEFAULT_SPREAD
+from trading_strategy import should_enter_trade, should_exit_trade
+from benchmarks.forex_env_steps import make_synthetic_m1
+
+
+def loop_backtest(data, spread=DEFAULT_SPREAD):
+    """
+    Bar-by-bar reference implementation of BacktestEngine.run for a long-only strategy.
+    """
+    close, high, low = data['close'].to_numpy(), data['high'].to_numpy(), data['low'].to_numpy()
+    trades = []
+    entry = None
+    for bar in range(len(close)):
+        row = {'bid': close[bar]}
+        if entry is None:
+            if should_enter_trade(row):
+                entry_bar, entry = bar, close[bar] + spread / 2
+                stop_loss, take_profit = entry - STOP_LOSS_DISTANCE, entry + TAKE_PROFIT_DISTANCE
+            continue
+        if low[bar] <= stop_loss:
+            exit_price, reason = stop_loss, EXIT_STOP_LOSS
+        elif high[bar] >= take_profit:
+            exit_price, reason = take_profit, EXIT_TAKE_PROFIT
+        elif should_exit_trade(row, entry):
+            exit_price, reason = close[bar] - spread / 2, EXIT_RULE
+        else:
+            continue
+        trades.append((entry_bar, bar, entry, exit_price, 1.0, exit_price - entry, reason))
+        entry = None
+    if entry is not None:
+        exit_price = close[-1] - spread / 2
+        trades.append((entry_bar, len(close) - 1, entry, exit_price, 1.0, exit_price - entry, EXIT_END_OF_DATA))
+    return np.array(trades, dtype=TRADE_DTYPE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized backtest engine.")
+    parser.add_argument('--rows', type=int, default=10_000_000, help="Rows of synthetic M1 data")
+    parser.add_argument('--check-rows', type=int, default=200_000, help="Rows replayed by the per-bar loop")
+    args = parser.parse_args()
+
+    data = make_synthetic_m1(args.rows)
+
+    prefix = data.iloc[:args.check_rows]
+    start = time.perf_counter()
+    expected = loop_backtest(prefix)
+    loop_rate = len(prefix) / (time.perf_counter() - start)
+    trades = BacktestEngine(prefix).run(should_enter_trade, should_exit_trade)
+    assert len(trades) == len(expected) and np.allclose(trades['pnl'], expected['pnl']), "Engine disagrees with per-bar loop"
+
+    engine = BacktestEngine(data)
+    start = time.perf_counter()
+    trades = engine.run(should_enter_trade, should_exit_trade)
+    engine_rate = len(data) / (time.perf_counter() - start)
+
+    print(f"Per-bar loop: {loop_rate:>14,.0f} bars/s ({len(prefix)} bars, {len(expected)} trades)")
+    print(f"Engine:       {engine_rate:>14,.0f} bars/s ({len(data)} bars, {len(trades)} trades)")
+
+
+if __name__ == "__main__":
+    main()
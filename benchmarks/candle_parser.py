@@ -0,0 +1,105 @@
+"""
+Benchmark of the streaming candle parser against dict-per-candle processing.
+
+Writes a large candles response fixture in the OANDA v3 format (RFC3339
+times, mid prices), then decodes it with:
+- json: `json.loads` of the whole body, one dict per candle, a DataFrame and
+  `pd.to_datetime` on the time strings (the previous fetch_forex_data path);
+- streaming: `candle_parser.parse_candles` over 1 MiB chunks of the file.
+
+Reports wall time and peak traced (Python heap) memory of each.
+
+Usage (from the repository root):
+    python -m benchmarks.candle_parser --candles 1000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from candle_parser import parse_candles, CHUNK_BYTES
+
+
+def write_fixture(path, candles, seed=0):
+    """
+    Write a candles response with `candles` M1 mid-price candles to `path`.
+    """
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0002, candles))
+    open_ = np.concatenate([[1.1], close[:-1]])
+    high = np.maximum(open_, close) + np.abs(rng.normal(0, 0.0001, candles))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0, 0.0001, candles))
+    volume = rng.integers(1, 200, candles)
+    times = pd.date_range("2020-01-01", periods=candles, freq="min").strftime('%Y-%m-%dT%H:%M:%S.000000000Z')
+
+    with open(path, 'w') as f:
+        f.write('{"instrument":"EUR_USD","granularity":"M1","candles":[')
+        for i in range(candles):
+            f.write(('' if i == 0 else ',')
+                    + f'{{"complete":true,"volume":{volume[i]},"time":"{times[i]}",'
+                    + f'"mid":{{"o":"{open_[i]:.5f}","h":"{high[i]:.5f}","l":"{low[i]:.5f}","c":"{close[i]:.5f}"}}}}')
+        f.write(']}')
+
+
+def parse_json(path):
+    with open(path, 'rb') as f:
+        raw_data = json.loads(f.read())['candles']
+    frames = []
+    for candle in raw_data:
+        frames.append({
+            'time': candle['time'],
+            'open': float(candle['mid']['o']),
+            'high': float(candle['mid']['h']),
+            'low': float(candle['mid']['l']),
+            'close': float(candle['mid']['c']),
+            'volume': candle['volume']
+        })
+    df = pd.DataFrame(frames)
+    df['time'] = pd.to_datetime(df['time'])
+    return len(df.set_index('time'))
+
+
+def read_chunks(path):
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_BYTES):
+            yield chunk
+
+
+def parse_streaming(path):
+    return sum(len(records) for records, _ in parse_candles(read_chunks(path)))
+
+
+def measure(parse, path):
+    start = time.perf_counter()
+    rows = parse(path)
+    elapsed = time.perf_counter() - start
+
+    # Separate traced run: tracing slows allocation-heavy code down a lot
+    tracemalloc.start()
+    parse(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark candle response parsing.")
+    parser.add_argument('--candles', type=int, default=1_000_000, help="Candles in the response fixture")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'candles.json')
+        write_fixture(path, args.candles)
+        print(f"Fixture: {args.candles} candles, {os.path.getsize(path) / 2**20:.0f} MB")
+
+        for name, parse in (('json', parse_json), ('streaming', parse_streaming)):
+            rows, elapsed, peak = measure(parse, path)
+            print(f"{name:>10}: {rows} candles in {elapsed:.2f}s "
+                  f"({rows / elapsed:,.0f} candles/s), peak memory {peak:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
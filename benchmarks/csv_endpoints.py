@@ -0,0 +1,84 @@
+"""
+Latency of /api/market_data as its CSV file grows.
+
+Writes market data files of increasing size (in the format of
+test_updates.py) to a temporary directory and times, through Flask's test
+client: the first request after the file was written (a tail read), a
+request after a few rows were appended (an incremental read), a repeated
+request (a stat call) and a conditional request answered with 304. The
+previous implementation, pd.read_csv of the whole file, is timed for
+comparison, and the responses are checked against it.
+
+Usage (from the repository root):
+    python -m benchmarks.csv_endpoints --max-rows 10000000
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import orjson
+import app as dashboard
+
+APPENDED_ROWS = 10
+
+
+def write_market_data(path, rows, start=0):
+    """Append `rows` ticks, with the index column and header test_updates.py writes."""
+    index = np.arange(start, start + rows)
+    times = pd.Timestamp('2024-01-01') + pd.to_timedelta(index, unit='s')
+    data = pd.DataFrame({'time': times, 'instrument': 'EUR_USD', 'bid': 1.0921 + index * 1e-9, 'ask': 1.0922})
+    data.index = index
+    data.to_csv(path, mode='a', header=not os.path.exists(path))
+
+
+def timed(function, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def check(response, expected):
+    got = orjson.loads(response.data)
+    expected = orjson.loads(expected.to_json(orient='records', date_format='iso'))
+    assert len(got) == len(expected), "Row count differs from pandas"
+    for row, want in zip(got, expected):
+        assert row.keys() == want.keys() and all(
+            row[key] == want[key] or abs(row[key] - want[key]) < 1e-12 for key in row if key != 'time'), \
+            f"{row} differs from pandas {want}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the CSV-backed API endpoints against file size.")
+    parser.add_argument('--max-rows', type=int, default=1_000_000, help="Largest market data file, in rows")
+    args = parser.parse_args()
+
+    client = dashboard.app.test_client()
+    directory = tempfile.mkdtemp()
+    sizes = [n for n in (10_000, 100_000, 1_000_000, 10_000_000) if n <= args.max_rows]
+    print(f"{'endpoint':>16} {'rows':>10} {'file MB':>8} {'first ms':>9} {'append ms':>10} "
+          f"{'repeat ms':>10} {'304 ms':>8} {'pandas ms':>10}")
+    for rows in sizes:
+        path = os.path.join(directory, f'market_data_{rows}.csv')
+        write_market_data(path, rows)
+        dashboard.market_data_cache = cache = dashboard.CsvCache(path, max_rows=dashboard.MARKET_DATA_ROWS)
+        first, _ = timed(lambda: client.get('/api/market_data'), repeat=1)
+        write_market_data(path, APPENDED_ROWS, start=rows)
+        append, response = timed(lambda: client.get('/api/market_data'), repeat=1)
+        repeat, _ = timed(lambda: client.get('/api/market_data'))
+        not_modified, response_304 = timed(lambda: client.get('/api/market_data', headers={'If-None-Match': f'"{cache.etag}"'}))
+        assert response_304.status_code == 304
+        baseline, expected = timed(lambda: pd.read_csv(path, parse_dates=['time']).tail(dashboard.MARKET_DATA_ROWS), repeat=1)
+        check(response, expected)
+        size = os.path.getsize(path) / 2**20
+        print(f"{'/api/market_data':>16} {rows:>10} {size:>8.0f} {first * 1e3:>9.2f} {append * 1e3:>10.2f} "
+              f"{repeat * 1e3:>10.3f} {not_modified * 1e3:>8.3f} {baseline * 1e3:>10.1f}")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Micro-benchmark for ForexEnv stepping throughput.
+
+Compares the array-backed ForexEnv against the previous pandas-based
+observation path on a synthetic M1 dataset.
+
+Usage (from the repository root):
+    python -m benchmarks.forex_env_steps --rows 1000000 --steps 50000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from forex_env import ForexEnv
+
+
+def make_synthetic_m1(rows, seed=0):
+    """
+    Build a synthetic OHLCV M1 dataset with a random-walk close price.
+
+    Parameters:
+    - rows (int): Number of one-minute bars.
+    - seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+    - pd.DataFrame: OHLCV data indexed by time.
+    """
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 1e-4, rows))
+    spread = np.abs(rng.normal(0, 5e-5, rows))
+    return pd.DataFrame({
+        'open': np.roll(close, 1),
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.integers(1, 500, rows),
+    }, index=pd.date_range('2020-01-01', periods=rows, freq='min', name='time'))
+
+
+class PandasForexEnv(ForexEnv):
+    """ForexEnv with the original per-step pandas observation path."""
+
+    def _next_observation(self):
+        frame = self.data.iloc[self.current_step:self.current_step + self.window_size]
+        if len(frame) < self.window_size:
+            frame = frame.reindex(range(self.window_size), fill_value=0)
+        obs = frame.values.flatten()
+        return obs.astype(np.float32)
+
+    def step(self, action):
+        self.data.iloc[self.current_step]['close']
+        return super().step(action)
+
+
+def steps_per_second(env, steps):
+    """
+    Measure how many environment steps per second `env` sustains.
+
+    Parameters:
+    - env (ForexEnv): Environment to step.
+    - steps (int): Number of steps to time.
+
+    Returns:
+    - float: Steps per second.
+    """
+    env.reset()
+    start = time.perf_counter()
+    for i in range(steps):
+        _, _, done, _ = env.step(i % 3)
+        if done:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ForexEnv step throughput.")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Rows of synthetic M1 data")
+    parser.add_argument('--steps', type=int, default=50_000, help="Steps to time per environment")
+    args = parser.parse_args()
+
+    data = make_synthetic_m1(args.rows)
+
+    start = time.perf_counter()
+    env = ForexEnv(historical_data=data)
+    build_time = time.perf_counter() - start
+
+    before = steps_per_second(PandasForexEnv(historical_data=data), args.steps)
+    after = steps_per_second(env, args.steps)
+
+    print(f"Dataset: {args.rows} M1 rows, {args.steps} steps")
+    print(f"Array conversion: {build_time * 1000:.1f} ms")
+    print(f"Before (pandas):  {before:,.0f} steps/sec")
+    print(f"After (NumPy):    {after:,.0f} steps/sec")
+    print(f"Speedup:          {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
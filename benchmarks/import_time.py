@@ -0,0 +1,70 @@
+"""
+Cold-start budget check for the service entry points.
+
+Imports each module in a fresh interpreter under `python -X importtime`,
+takes the best cumulative import time over several runs, and checks that
+it stays within its budget and that none of the deferred heavy dependencies
+(pandas, the OANDA and Telegram clients, torch) were pulled in. Exits with
+status 1 on any regression, so it can gate a deploy.
+
+Usage (from the repository root):
+    python -m benchmarks.import_time --runs 5
+"""
+import argparse
+import ast
+import re
+import subprocess
+import sys
+
+# Cumulative import time budgets, in milliseconds
+IMPORT_BUDGETS_MS = {
+    'app': 600,
+    'live_trading': 800,
+}
+
+# Modules that must only be imported on first use. live_trading still imports
+# pandas (through forex_env, feature_engine and price_array): ForexEnv builds
+# its history DataFrame as soon as the live loop starts, so deferring it
+# would only move the cost.
+DEFERRED_MODULES = {
+    'app': ['pandas', 'oandapyV20', 'telegram', 'trade_executor', 'market_data_store'],
+    'live_trading': ['telegram', 'torch', 'stable_baselines3', 'gym'],
+}
+
+
+def import_time_ms(module):
+    """
+    Import `module` in a new interpreter and return its cumulative import time
+    in ms, along with the deferred modules it loaded.
+    """
+    deferred = DEFERRED_MODULES.get(module, [])
+    code = f"import sys, {module}; print([m for m in {deferred!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    match = re.search(rf"^import time:\s+\d+ \|\s+(\d+) \| {re.escape(module)}$", result.stderr, re.MULTILINE)
+    return int(match.group(1)) / 1000, ast.literal_eval(result.stdout.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time budgets of the entry points.")
+    parser.add_argument('--runs', type=int, default=5, help="Imports per module; the fastest one is reported")
+    parser.add_argument('--modules', nargs='+', default=list(IMPORT_BUDGETS_MS), help="Modules to check")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        timings = [import_time_ms(module) for _ in range(args.runs)]
+        best = min(ms for ms, _ in timings)
+        loaded = timings[0][1]
+        budget = IMPORT_BUDGETS_MS.get(module, float('inf'))
+        status = 'ok' if best <= budget and not loaded else 'FAIL'
+        print(f"{module:<14} {best:>8.1f} ms (budget {budget} ms) {status}")
+        if loaded:
+            print(f"  eagerly imports: {', '.join(loaded)}")
+        failed |= status != 'ok'
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Per-tick cost benchmark for the live bar pipeline.
+
+Feeds synthetic ticks through a TickAggregator (M1/M5/H1 bars) and every
+completed M1 bar into ForexEnv.process_live_data, reporting the cost per tick
+and per bar at increasing uptimes together with the process's peak RSS. For
+comparison it also times the previous implementation, which concatenated
+each new bar onto the full history DataFrame. Observations are checked
+against the last window of the full bar history.
+
+Usage (from the repository root):
+    python -m benchmarks.live_bars --bars 200000
+"""
+import argparse
+import resource
+import time
+import numpy as np
+import pandas as pd
+from bar_aggregator import TickAggregator, BAR_COLUMNS
+from forex_env import ForexEnv, WINDOW_SIZE
+
+TICKS_PER_BAR = 20
+
+
+def synthetic_ticks(bars, seed=0):
+    """
+    Return (times in ns, prices) of `bars` minutes of evenly spaced ticks.
+    """
+    rng = np.random.default_rng(seed)
+    ticks = bars * TICKS_PER_BAR
+    times = np.int64(1_700_000_000) * 10**9 + np.arange(ticks, dtype=np.int64) * (60 * 10**9 // TICKS_PER_BAR)
+    prices = 1.1 + np.cumsum(rng.normal(0, 1e-5, ticks))
+    return times, prices
+
+
+def concat_cost(history_bars, new_bars=50):
+    """
+    Seconds per bar of the previous process_live_data (pd.concat of the whole history) at a given uptime.
+    """
+    data = pd.DataFrame(np.random.default_rng(0).random((history_bars, len(BAR_COLUMNS))), columns=BAR_COLUMNS)
+    row = data.iloc[:1]
+    start = time.perf_counter()
+    for _ in range(new_bars):
+        data = pd.concat([data, row])
+        data.reset_index(drop=True, inplace=True)
+        prices = np.ascontiguousarray(data.select_dtypes(include=[np.number]).to_numpy(dtype=np.float32))
+    return (time.perf_counter() - start) / new_bars
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the live tick-to-bar pipeline.")
+    parser.add_argument('--bars', type=int, default=200_000, help="M1 bars of ticks to stream")
+    args = parser.parse_args()
+
+    times, prices = synthetic_ticks(args.bars)
+    aggregator = TickAggregator()
+    env = ForexEnv()
+    closes = []
+    checkpoints = {args.bars // 100, args.bars // 10, args.bars - 1}  # The last bar completes on the next tick
+    print(f"{'bars':>10} {'us/tick':>10} {'us/bar (ring)':>14} {'us/bar (concat)':>16} {'peak RSS MB':>12}")
+    start = time.perf_counter()
+    bars = bars_since = 0
+    for t, price in zip(times.tolist(), prices.tolist()):
+        completed = aggregator.update(t, price)
+        if 'M1' in completed:
+            bar = completed['M1']
+            obs = env.process_live_data({column: bar[column] for column in BAR_COLUMNS})
+            closes.append(bar['close'])
+            bars += 1
+            if bars in checkpoints:
+                elapsed = time.perf_counter() - start
+                expected = np.float32(closes[-WINDOW_SIZE:])
+                assert np.array_equal(obs.reshape(WINDOW_SIZE, -1)[:, BAR_COLUMNS.index('close')], expected), \
+                    "Observation is not the newest window"
+                rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+                interval = bars - bars_since
+                print(f"{bars:>10} {elapsed / (interval * TICKS_PER_BAR) * 1e6:>10.2f} {elapsed / interval * 1e6:>14.1f} "
+                      f"{concat_cost(bars) * 1e6:>16.1f} {rss:>12.0f}")
+                start = time.perf_counter()
+                bars_since = bars
+    print(f"Bars held: {len(env.live)} M1, {len(aggregator.bars['H1'])} H1 (capacity {env.live.capacity})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Latency benchmark for the OANDA trading client.
+
+Runs open/close round trips against the local API stub and reports the
+latency histograms OandaAPI records, comparing:
+- a new connection per request and the full account details to find the
+  trade to close (the previous client's pattern), against
+- pooled keep-alive connections and the open trades endpoint, and
+- the same orders submitted sequentially and concurrently via AsyncOandaAPI.
+
+The stub runs on localhost without TLS, so connection reuse saves less here
+than against the real API, where every new connection costs a TLS handshake.
+
+Usage (from the repository root):
+    python -m benchmarks.oanda_latency --trades 200 --delay 0.002
+"""
+import argparse
+import asyncio
+import time
+import requests
+from oanda_client import OandaAPI, AsyncOandaAPI, REQUEST_TIMEOUT
+from oanda_stub import serve
+from utils.latency import LatencyHistogram
+
+ACCOUNT_ID = "101-001-0000000-001"
+ORDER = {"instrument": "EUR_USD", "units": 1000, "type": "MARKET"}
+
+
+def unpooled_round_trip(base_url, histogram):
+    """
+    Open and close a trade the previous way: a new connection per request and
+    the full account details to find the trade id.
+    """
+    account_url = f"{base_url}/v3/accounts/{ACCOUNT_ID}"
+    with histogram.time():
+        requests.post(f"{account_url}/orders", json={'order': ORDER}, timeout=REQUEST_TIMEOUT).raise_for_status()
+        trades = requests.get(account_url, timeout=REQUEST_TIMEOUT).json()['account']['trades']
+        requests.put(f"{account_url}/trades/{trades[0]['id']}/close", timeout=REQUEST_TIMEOUT).raise_for_status()
+
+
+def pooled_round_trip(api, histogram):
+    with histogram.time():
+        api.place_order(ORDER)
+        trade_id = api.get_open_trades()[0]['id']
+        api.close_trade(trade_id)
+
+
+async def concurrent_orders(api, orders):
+    responses = await asyncio.gather(*(api.place_order(ORDER) for _ in range(orders)))
+    await asyncio.gather(*(api.close_trade(r['orderFillTransaction']['tradeOpened']['tradeID']) for r in responses))
+
+
+def print_summary(label, summary):
+    print(f"{label:<28} n={summary['count']:<5} mean {summary['mean_ms']:7.2f} ms  p50 {summary['p50_ms']:7.2f}  "
+          f"p90 {summary['p90_ms']:7.2f}  p99 {summary['p99_ms']:7.2f}  max {summary['max_ms']:7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OANDA client call latencies against the local stub.")
+    parser.add_argument('--trades', type=int, default=200, help="Open/close round trips per variant")
+    parser.add_argument('--delay', type=float, default=0.002, help="Server-side processing time per request, in seconds")
+    parser.add_argument('--concurrency', type=int, default=8, help="Orders in flight at once in the async variant")
+    args = parser.parse_args()
+
+    stub = serve(port=0, delay=args.delay)
+    try:
+        unpooled = LatencyHistogram()
+        for _ in range(args.trades):
+            unpooled_round_trip(stub.url, unpooled)
+
+        api = OandaAPI("token", ACCOUNT_ID, base_url=stub.url, pool_size=args.concurrency)
+        pooled = LatencyHistogram()
+        for _ in range(args.trades):
+            pooled_round_trip(api, pooled)
+        api.close()
+
+        print_summary("Round trip, unpooled", unpooled.summary())
+        print_summary("Round trip, pooled", pooled.summary())
+        for name, summary in api.latency_summary().items():
+            print_summary(f"  {name}", summary)
+
+        start = time.perf_counter()
+        api = OandaAPI("token", ACCOUNT_ID, base_url=stub.url)
+        for _ in range(args.trades):
+            api.close_trade(api.place_order(ORDER)['orderFillTransaction']['tradeOpened']['tradeID'])
+        sequential = time.perf_counter() - start
+        api.close()
+
+        async def run_async():
+            async with AsyncOandaAPI("token", ACCOUNT_ID, base_url=stub.url, pool_size=args.concurrency) as async_api:
+                start = time.perf_counter()
+                for _ in range(0, args.trades, args.concurrency):
+                    await concurrent_orders(async_api, args.concurrency)
+                return time.perf_counter() - start, async_api.latency_summary()
+
+        concurrent, summary = asyncio.run(run_async())
+        print(f"{args.trades} orders sequential: {sequential:.2f} s; async x{args.concurrency}: {concurrent:.2f} s")
+        print_summary("  async order_fill", summary['order_fill'])
+    finally:
+        stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-trade cost of the streaming PerformanceTracker over millions of trades.
+
+Logs synthetic trade results (one every few seconds of simulated time) and
+times log_trade and calculate_metrics at increasing trade counts, together
+with the process's peak RSS (mostly the benchmark's own input arrays and,
+for the previous implementation, the list of all results). The previous calculate_metrics, which rescanned
+the full list of trades for the win rate, is timed on a list of the same
+length for comparison. At the end, every metric of the all-time totals and
+of both rolling windows is checked against a direct numpy computation.
+
+Usage (from the repository root):
+    python -m benchmarks.performance_tracker --trades 10000000
+"""
+import argparse
+import math
+import resource
+import time
+import numpy as np
+from performance_tracker import PerformanceTracker
+
+SECONDS_PER_TRADE = 5
+
+
+def scan_cost(trades):
+    """Seconds of the previous win-rate rescan over `trades` results."""
+    start = time.perf_counter()
+    sum(1 for p in trades if p > 0) / len(trades)
+    return time.perf_counter() - start
+
+
+def expected_metrics(profits):
+    """Metrics of a run of trade results computed directly."""
+    n = len(profits)
+    wins, losses = profits[profits > 0], profits[profits <= 0]
+    equity = np.concatenate([[0.0], np.cumsum(profits)])
+    downside = math.sqrt((losses ** 2).sum() / n)
+    return {
+        "trades": n,
+        "win_rate": len(wins) / n,
+        "average_profit": wins.sum() / n,
+        "average_loss": losses.sum() / n,
+        "total_pnl": profits.sum(),
+        "profit_factor": wins.sum() / -losses.sum(),
+        "sharpe": profits.mean() / profits.std(ddof=1),
+        "sortino": profits.mean() / downside,
+        "max_drawdown": (np.maximum.accumulate(equity) - equity).max(),
+    }
+
+
+def check(name, got, expected):
+    for key, value in expected.items():
+        assert math.isclose(got[key], value, rel_tol=1e-6, abs_tol=1e-9), f"{name} {key}: {got[key]} != {value}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming PerformanceTracker.")
+    parser.add_argument('--trades', type=int, default=10_000_000, help="Trades to log")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    profits = rng.normal(0.02, 1.0, args.trades)
+    times = 1_700_000_000 + np.arange(args.trades) * SECONDS_PER_TRADE
+    tracker = PerformanceTracker()
+    checkpoints = [n for n in (1_000, 100_000, 1_000_000, 10_000_000, args.trades) if n <= args.trades]
+
+    print(f"{'trades':>10} {'us/log_trade':>13} {'us/metrics':>11} {'previous us/metrics':>20} {'peak RSS MB':>12}")
+    logged = 0
+    start = time.perf_counter()
+    for n in sorted(set(checkpoints)):
+        for profit, t in zip(profits[logged:n].tolist(), times[logged:n].tolist()):
+            tracker.log_trade(profit, t)
+        per_trade = (time.perf_counter() - start) / (n - logged)
+        logged = n
+        t = time.perf_counter()
+        for _ in range(1000):
+            tracker.calculate_metrics()
+        per_metrics = (time.perf_counter() - t) / 1000
+        previous = scan_cost(profits[:n].tolist())
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{n:>10} {per_trade * 1e6:>13.2f} {per_metrics * 1e6:>11.1f} {previous * 1e6:>20.0f} {rss:>12.0f}")
+        start = time.perf_counter()
+
+    metrics = tracker.calculate_metrics()
+    check("all-time", metrics, expected_metrics(profits))
+    check("last_trades", metrics["last_trades"], expected_metrics(profits[-tracker.last_trades.max_trades:]))
+    in_period = times > times[-1] - tracker.last_period.max_seconds
+    check("last_period", metrics["last_period"], expected_metrics(profits[in_period]))
+    print(f"Metrics match numpy; windows hold {len(tracker.last_trades)} and {len(tracker.last_period)} trades, "
+          f"history {len(tracker.trades)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Memory benchmark for memory-mapped price arrays.
+
+Starts several concurrent ForexEnv processes over the same synthetic M1
+dataset, either each holding a private in-RAM copy (DataFrame) or all
+memory-mapping one price array file, and reports RSS and PSS per process.
+PSS splits shared pages between the processes mapping them, so it shows the
+real per-process cost of the shared page cache.
+
+Usage (from the repository root, Linux only):
+    python -m benchmarks.price_array_rss --rows 5000000 --processes 4
+"""
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from forex_env import ForexEnv
+from price_array import save_price_array, load_price_array
+from benchmarks.forex_env_steps import make_synthetic_m1
+
+
+def memory_usage_mb():
+    """
+    Read this process's RSS and PSS in MB from /proc/self/smaps_rollup.
+    """
+    usage = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                usage[key] = int(value.split()[0]) / 1024
+    return usage['Rss'], usage['Pss']
+
+
+def run_env(mode, path, barrier, results):
+    if mode == 'dataframe':
+        # Private copy, as when every process parses the data into pandas
+        price_array = load_price_array(path)
+        data = pd.DataFrame(np.array(price_array.prices), columns=price_array.columns)
+        env = ForexEnv(historical_data=data)
+        del data, price_array
+    else:
+        env = ForexEnv(historical_data=load_price_array(path))
+
+    # Touch every page, as a full pass over the data would
+    env.reset()
+    float(np.asarray(env.prices).sum())
+    for i in range(1000):
+        env.step(i % 3)
+
+    barrier.wait()  # Measure while every process is alive
+    results.put((mode, os.getpid(), *memory_usage_mb()))
+    barrier.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-process memory of shared price arrays.")
+    parser.add_argument('--rows', type=int, default=5_000_000, help="Rows of synthetic M1 data")
+    parser.add_argument('--processes', type=int, default=4, help="Concurrent environment processes")
+    args = parser.parse_args()
+
+    ctx = mp.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'prices.npy')
+        save_price_array(make_synthetic_m1(args.rows), path)
+        print(f"Price array: {args.rows} rows, {os.path.getsize(path) / 2**20:.0f} MB on disk")
+
+        for mode in ('dataframe', 'mmap'):
+            barrier = ctx.Barrier(args.processes)
+            results = ctx.Queue()
+            processes = [ctx.Process(target=run_env, args=(mode, path, barrier, results)) for _ in range(args.processes)]
+            for p in processes:
+                p.start()
+            rows = [results.get() for _ in processes]
+            for p in processes:
+                p.join()
+
+            print(f"\n{mode}:")
+            for _, pid, rss, pss in rows:
+                print(f"  pid {pid}: RSS {rss:8.1f} MB  PSS {pss:8.1f} MB")
+            print(f"  total PSS {sum(r[3] for r in rows):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
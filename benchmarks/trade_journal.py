@@ -0,0 +1,119 @@
+"""
+Burst-write and crash-recovery benchmark for the trade journal.
+
+Appends a burst of trades as fast as one thread can (as a flood of
+place_trade events would), reporting the time each `append` blocks the
+caller, the time until the burst is committed, the trades per commit and
+the latency of /api/trades-style queries against the grown journal. The
+previous implementation, one DataFrame.to_csv(mode='a') per trade, is timed
+on a sample for comparison.
+
+With --crash, a child process appends trades in a loop and is killed
+with SIGKILL; the journal is then reopened and checked: the database must
+pass SQLite's integrity check and hold an unbroken sequence of trades.
+
+Usage (from the repository root):
+    python -m benchmarks.trade_journal --trades 100000
+    python -m benchmarks.trade_journal --crash
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from trade_journal import TradeJournal
+
+CSV_SAMPLE = 500
+
+
+def make_trade(i, start=datetime(2024, 1, 1)):
+    return {'trade_id': str(i), 'instrument': 'EUR_USD', 'units': 1000 if i % 2 else -1000,
+            'type': 'MARKET', 'price': 1.1 + (i % 100) * 1e-5,
+            'timestamp': (start + timedelta(milliseconds=i)).isoformat()}
+
+
+def csv_cost(directory):
+    """Seconds per trade of the previous handler's DataFrame.to_csv append."""
+    import pandas as pd
+    path = os.path.join(directory, 'trades.csv')
+    start = time.perf_counter()
+    for i in range(CSV_SAMPLE):
+        pd.DataFrame([make_trade(i)]).to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+    return (time.perf_counter() - start) / CSV_SAMPLE
+
+
+def burst(trades, directory):
+    journal = TradeJournal(os.path.join(directory, 'trades.db'), legacy_csv=None)
+    blocked = np.empty(trades)
+    start = time.perf_counter()
+    for i in range(trades):
+        t = time.perf_counter()
+        journal.append(make_trade(i))
+        blocked[i] = time.perf_counter() - t
+    submitted = time.perf_counter() - start
+    journal.flush()
+    committed = time.perf_counter() - start
+    print(f"{trades} trades appended in {submitted * 1e3:.0f} ms, committed after {committed * 1e3:.0f} ms "
+          f"({trades / committed:,.0f} trades/s durable)")
+    print(f"append blocked the caller: p50 {np.percentile(blocked, 50) * 1e6:.1f} us, "
+          f"p99 {np.percentile(blocked, 99) * 1e6:.1f} us, max {blocked.max() * 1e3:.2f} ms")
+    print(f"commits: {journal.stats['commits']}, largest {journal.stats['largest_commit']} trades; "
+          f"previous to_csv append: {csv_cost(directory) * 1e3:.2f} ms per trade, blocking the handler")
+
+    middle = make_trade(trades // 2)
+    for name, query in [('last 100', lambda: journal.query(limit=100)),
+                        ('by trade_id', lambda: journal.query(trade_id=middle['trade_id'])),
+                        ('1 s time range', lambda: journal.query(start=middle['timestamp'],
+                                                                 end=make_trade(trades // 2 + 1000)['timestamp']))]:
+        t = time.perf_counter()
+        rows = query()
+        print(f"query {name:>15}: {len(rows):>5} trades in {(time.perf_counter() - t) * 1e3:.2f} ms")
+    journal.close()
+
+
+def crash(directory):
+    path = os.path.join(directory, 'crash.db')
+    child = subprocess.Popen([sys.executable, '-c', f"""
+import itertools, time
+from trade_journal import TradeJournal
+from benchmarks.trade_journal import make_trade
+journal = TradeJournal({path!r}, legacy_csv=None)
+for i in itertools.count():
+    journal.append(make_trade(i))
+    if i % 100 == 0:
+        time.sleep(0.001)
+"""])
+    time.sleep(2)
+    child.send_signal(signal.SIGKILL)
+    child.wait()
+    journal = TradeJournal(path, legacy_csv=None)
+    connection = journal._reader()
+    integrity = connection.execute("PRAGMA integrity_check").fetchone()[0]
+    count, first, last = connection.execute("SELECT COUNT(*), MIN(seq), MAX(seq) FROM trades").fetchone()
+    ids = [int(row['trade_id']) for row in journal.query()]
+    journal.close()
+    contiguous = ids == list(range(len(ids))) and (count == 0 or (first, last) == (1, count))
+    print(f"Killed the writer after 2 s: {count} trades recovered, integrity check {integrity}, "
+          f"sequence {'unbroken' if contiguous else 'BROKEN'}")
+    if integrity != 'ok' or not contiguous:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trade journal.")
+    parser.add_argument('--trades', type=int, default=100_000, help="Trades in the burst")
+    parser.add_argument('--crash', action='store_true', help="Kill a writing process and check recovery")
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp()
+    if args.crash:
+        crash(directory)
+    else:
+        burst(args.trades, directory)
+
+
+if __name__ == "__main__":
+    main()
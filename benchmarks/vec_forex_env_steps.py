@@ -0,0 +1,54 @@
+"""
+Micro-benchmark for VecForexEnv rollout throughput.
+
+Compares stepping N ForexEnv instances one Python call at a time against a
+single VecForexEnv stepping all N episodes in one NumPy call.
+
+Usage (from the repository root):
+    python -m benchmarks.vec_forex_env_steps --num-envs 16 --steps 20000
+"""
+import argparse
+import time
+import numpy as np
+from forex_env import ForexEnv
+from vec_forex_env import VecForexEnv
+from benchmarks.forex_env_steps import make_synthetic_m1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark VecForexEnv step throughput.")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Rows of synthetic M1 data")
+    parser.add_argument('--num-envs', type=int, default=16, help="Parallel episodes")
+    parser.add_argument('--steps', type=int, default=20_000, help="Vectorized steps to time")
+    args = parser.parse_args()
+
+    data = make_synthetic_m1(args.rows)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 3, size=(args.steps, args.num_envs))
+
+    envs = [ForexEnv(historical_data=data) for _ in range(args.num_envs)]
+    for env in envs:
+        env.reset()
+    start = time.perf_counter()
+    for step_actions in actions:
+        for env, action in zip(envs, step_actions):
+            _, _, done, _ = env.step(action)
+            if done:
+                env.reset()
+    before = actions.size / (time.perf_counter() - start)
+
+    vec_env = VecForexEnv(historical_data=data, num_envs=args.num_envs, seed=0)
+    vec_env.reset()
+    start = time.perf_counter()
+    for step_actions in actions:
+        vec_env.step(step_actions)
+    after = actions.size / (time.perf_counter() - start)
+
+    print(f"Dataset: {args.rows} M1 rows, {args.num_envs} envs x {args.steps} steps")
+    print(f"Sequential ForexEnv: {before:,.0f} env-steps/sec")
+    print(f"VecForexEnv:         {after:,.0f} env-steps/sec")
+    print(f"Speedup:             {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Fan-out load test for the Socket.IO market data broadcasts.
+
+Runs the websocket server on a local port, publishes synthetic ticks at a
+fixed rate and connects simulated Socket.IO clients, some of them
+subscribed to a single instrument and some throttled. Every tick carries its
+publish time, so each client measures the publish-to-receive latency of the
+ticks it gets; the report gives the latency percentiles and the ticks and
+events received per client. With
+--legacy the ticks are emitted one event per tick to every client, as
+before the MarketDataHub.
+
+The clients use the polling transport (websocket-client is not a
+dependency), which is the worst case for per-event overhead; clients whose
+connection the server drops under load are counted as dropped.
+
+Usage (from the repository root):
+    python -m benchmarks.websocket_fanout --clients 50 --rate 200 --seconds 10
+    python -m benchmarks.websocket_fanout --clients 50 --rate 200 --seconds 10 --legacy
+"""
+import argparse
+import logging
+import threading
+import time
+import numpy as np
+import socketio as socketio_client
+from flask import Flask
+from websocket_server import init_socketio
+
+INSTRUMENTS = ['EUR_USD', 'GBP_USD', 'USD_JPY']
+
+
+class SimulatedClient:
+    """Socket.IO client recording the latency of every tick it receives."""
+
+    def __init__(self, url, instruments=None, throttle=0):
+        self.latencies = []
+        self.events = 0
+        self.client = socketio_client.Client(reconnection=False)
+        self.client.on('market_data_batch', self._on_batch)
+        self.client.on('market_data', lambda tick: self._on_batch([tick]))
+        self.client.connect(url, transports=['polling'], wait_timeout=10)
+        if instruments or throttle:
+            self.client.emit('subscribe', {'instruments': instruments, 'throttle': throttle})
+
+    def _on_batch(self, ticks):
+        now = time.time()
+        self.events += 1
+        self.latencies.extend(now - tick['sent'] for tick in ticks)
+
+    def close(self):
+        self.client.disconnect()
+
+
+def publish(socketio, hub, rate, seconds, legacy):
+    """Publish `rate` ticks per second, round-robin over INSTRUMENTS, for `seconds`."""
+    interval = 1 / rate
+    start = time.monotonic()
+    n = 0
+    while time.monotonic() - start < seconds:
+        tick = {'instrument': INSTRUMENTS[n % len(INSTRUMENTS)], 'time': time.time(),
+                'bid': 1.1, 'ask': 1.1002, 'sent': time.time()}
+        if legacy:
+            socketio.emit('market_data', tick)
+        else:
+            hub.publish(tick)
+        n += 1
+        delay = start + n * interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Socket.IO market data fan-out.")
+    parser.add_argument('--clients', type=int, default=50, help="Simulated clients")
+    parser.add_argument('--rate', type=float, default=200, help="Ticks published per second")
+    parser.add_argument('--seconds', type=float, default=10, help="Publishing duration")
+    parser.add_argument('--throttled', type=float, default=0.2, help="Fraction of clients throttled to 1 update/s")
+    parser.add_argument('--single', type=float, default=0.2, help="Fraction of clients subscribed to EUR_USD only")
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--legacy', action='store_true', help="Emit one event per tick to every client")
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    app = Flask(__name__)
+    socketio = init_socketio(app)
+    hub = app.extensions['market_data_hub']
+    threading.Thread(target=socketio.run, args=(app,), daemon=True,
+                     kwargs={'port': args.port, 'allow_unsafe_werkzeug': True, 'log_output': False}).start()
+    time.sleep(0.5)
+    if not args.legacy:
+        hub.start()
+
+    url = f"http://127.0.0.1:{args.port}"
+    n_throttled = 0 if args.legacy else int(args.clients * args.throttled)
+    n_single = 0 if args.legacy else int(args.clients * args.single)
+    groups = {'all': [], 'EUR_USD only': [], 'throttled 1/s': []}
+    for i in range(args.clients):
+        if i < n_throttled:
+            groups['throttled 1/s'].append(SimulatedClient(url, throttle=1.0))
+        elif i < n_throttled + n_single:
+            groups['EUR_USD only'].append(SimulatedClient(url, instruments=['EUR_USD']))
+        else:
+            groups['all'].append(SimulatedClient(url))
+    time.sleep(0.5)
+
+    cpu = time.process_time()
+    published = publish(socketio, hub, args.rate, args.seconds, args.legacy)
+    time.sleep(1.5)  # Let the last batches and throttled snapshots arrive
+    cpu = time.process_time() - cpu
+
+    mode = 'legacy per-tick emit' if args.legacy else f'hub, {hub.emit_interval * 1000:g} ms batches'
+    print(f"{args.clients} clients, {published} ticks at {args.rate:g}/s ({mode}); "
+          f"process CPU {cpu / args.seconds * 100:.0f}% (server and clients)")
+    print(f"{'clients':>22} {'n':>4} {'dropped':>8} {'ticks/client':>13} {'events/client':>14} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, clients in groups.items():
+        if not clients:
+            continue
+        latencies = np.concatenate([c.latencies for c in clients]) * 1000
+        dropped = sum(not c.client.connected for c in clients)
+        if not len(latencies):
+            print(f"{name:>22} {len(clients):>4} {dropped:>8} {'no ticks received':>13}")
+            continue
+        ticks = len(latencies) / len(clients)
+        events = sum(c.events for c in clients) / len(clients)
+        print(f"{name:>22} {len(clients):>4} {dropped:>8} {ticks:>13.0f} {events:>14.0f} "
+              f"{np.percentile(latencies, 50):>8.1f} {np.percentile(latencies, 99):>8.1f} {latencies.max():>8.1f}")
+    if not args.legacy:
+        print(f"Hub: {hub.stats}")
+    for clients in groups.values():
+        for client in clients:
+            if client.client.connected:
+                client.close()
+
+
+if __name__ == "__main__":
+    main()
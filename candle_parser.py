@@ -0,0 +1,175 @@
+import re
+import json
+import numpy as np
+
+# Record layout of parsed candles, matching the columns MarketDataStore stores
+CANDLE_DTYPE = np.dtype([
+    ('time', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.int64),
+])
+CHUNK_BYTES = 1 << 20  # Bytes read from the response stream at a time
+
+# One candle object: the only JSON objects with exactly one nested object ('mid')
+_CANDLE = re.compile(rb'\{[^{}]*\{[^{}]*\}[^{}]*\}')
+_CANDLE_SCAN_BYTES = 4096  # Tail of the buffer searched for the last whole candle
+_QUOTE = ord('"')
+_VALUE_END = (ord(','), ord('}'))  # Bytes that end an unquoted value
+_PRICE_KEYS = (('open', b'o'), ('high', b'h'), ('low', b'l'), ('close', b'c'))
+
+def _gather(buf, start, length):
+    """
+    Copy the byte ranges [start, start + length) of `buf` into a fixed-width
+    bytes array (NUL padded), ready for NumPy's string-to-number casts.
+    """
+    width = int(length.max()) if len(length) else 1
+    cols = np.arange(width)
+    idx = np.minimum(start[:, None] + cols, len(buf) - 1)
+    chars = np.where(cols < length[:, None], buf[idx], 0).astype(np.uint8)
+    return chars.view(f'S{width}').ravel()
+
+def _parse_block(block):
+    """
+    Decode a run of whole candle objects into records and a completeness mask.
+
+    Works on the raw bytes with array operations only: the quoted strings are
+    located from the positions of the quote characters, keys are matched by
+    length and content, and every value column is cast in one NumPy call, so
+    no per-candle Python objects are created. Keys may come in any order.
+
+    Returns:
+    - tuple: (np.ndarray of CANDLE_DTYPE records, np.ndarray of bool 'complete' flags),
+      or None if the candles aren't in the shape this parser handles (RFC3339
+      times and a 'mid' block only).
+    """
+    buf = np.frombuffer(block, dtype=np.uint8)
+    quotes = np.flatnonzero(buf == _QUOTE)
+    start = quotes[0::2] + 1  # First byte of each quoted string
+    length = quotes[1::2] - start
+    first = buf[start] if len(start) else start
+    following = np.append(quotes[2::2], len(buf))  # Opening quote of the next string, or the end of the block
+
+    def strings(key):
+        index = np.flatnonzero((length == len(key)) & (first == key[0]))
+        if len(key) > 1:
+            index = index[_gather(buf, start[index], length[index]) == key]
+        return index
+
+    def unquoted_value(index):
+        # Bytes between a key's closing quote and the next string (or the end of the block),
+        # e.g. b':146,' or b':146},{'; only punctuation can follow the ',' or '}' ending the value
+        value_start = start[index] + length[index] + 1
+        chars = _gather(buf, value_start, following[index] - value_start).view(np.uint8).reshape(len(index), -1)
+        if not ((chars == _VALUE_END[0]) | (chars == _VALUE_END[1])).any(axis=1).all():
+            return None
+        return chars
+
+    times = strings(b'time') + 1
+    n = len(times)
+    keys = {key: strings(key) for key in (b'volume', b'complete') + tuple(k for _, k in _PRICE_KEYS)}
+    if (n == 0 or len(strings(b'mid')) != n or len(strings(b'bid')) or len(strings(b'ask'))
+            or any(len(index) != n for index in keys.values())
+            or times[-1] >= len(start) or not (buf[start[times] + length[times] - 1] == ord('Z')).all()):
+        return None
+    volume = unquoted_value(keys[b'volume'])
+    complete = unquoted_value(keys[b'complete'])
+    if volume is None or complete is None:
+        return None
+
+    records = np.empty(n, dtype=CANDLE_DTYPE)
+    # RFC3339 times end in 'Z'; drop it, NumPy parses the rest as UTC
+    records['time'] = _gather(buf, start[times], length[times] - 1).astype('datetime64[ns]').astype(np.int64)
+    for field, key in _PRICE_KEYS:
+        prices = keys[key] + 1
+        records[field] = _gather(buf, start[prices], length[prices]).astype(np.float64)
+    digits = (volume >= ord('0')) & (volume <= ord('9'))
+    places = np.cumsum(digits[:, ::-1], axis=1)[:, ::-1] - digits
+    records['volume'] = (np.where(digits, volume - ord('0'), 0).astype(np.int64) * 10 ** places).sum(axis=1)
+    return records, (complete == ord('t')).any(axis=1)
+
+def _parse_time(value):
+    # RFC3339 ('2024-01-01T00:00:00.000000000Z') or UNIX ('1704067200.000000000') time to UTC nanoseconds
+    if value.endswith('Z'):
+        return int(np.datetime64(value[:-1], 'ns').astype(np.int64))
+    seconds, _, fraction = value.partition('.')
+    return int(seconds) * 10**9 + int(fraction[:9].ljust(9, '0'))
+
+def _parse_json(candles):
+    """
+    Decode candle dicts from `json` into records and a completeness mask, one candle at a time.
+    """
+    records = np.empty(len(candles), dtype=CANDLE_DTYPE)
+    for i, candle in enumerate(candles):
+        if 'mid' not in candle:
+            raise ValueError("Candles have no mid prices; request them with price='M'")
+        mid = candle['mid']
+        records[i] = (_parse_time(candle['time']), mid['o'], mid['h'], mid['l'], mid['c'], candle['volume'])
+    return records, np.array([bool(candle.get('complete')) for candle in candles], dtype=bool)
+
+def _decode_rest(text, started):
+    # Candle dicts of the rest of a response: the whole body, or what follows the last candle parsed
+    if not started:
+        return json.loads(text)['candles'] if text.strip() else []
+    decoder = json.JSONDecoder()
+    candles = []
+    position = 0
+    while True:
+        while position < len(text) and text[position] in ' \t\r\n,':
+            position += 1
+        if position == len(text) or text[position] == ']':
+            return candles
+        candle, position = decoder.raw_decode(text, position)
+        candles.append(candle)
+
+def parse_candles(chunks):
+    """
+    Incrementally decode an OANDA candles response into typed record arrays.
+
+    The response body is consumed chunk by chunk; every chunk's whole candles
+    are decoded straight into a CANDLE_DTYPE array (int64 UTC nanosecond times,
+    float64 prices), and a partial candle at the end of a chunk is carried over
+    to the next one. Memory use is bounded by the chunk size, however large
+    the response. Candles in a shape the array parser doesn't handle (e.g.
+    with bid and ask blocks, or UNIX times) are decoded with `json` instead,
+    holding the rest of the response in memory; candles without mid prices
+    raise ValueError.
+
+    Parameters:
+    - chunks (iterable of bytes): The response body, e.g. `response.iter_content(CHUNK_BYTES)`.
+
+    Yields:
+    - tuple: (np.ndarray of CANDLE_DTYPE records, np.ndarray of bool 'complete' flags)
+    """
+    buffer = b''
+    started = False   # Some candles were parsed, so `buffer` starts after a candle
+    fallback = False  # A block the array parser couldn't decode was met
+    for chunk in chunks:
+        buffer += chunk
+        if fallback:
+            continue
+        # A match can only start at a real candle's '{', so scanning the tail is safe
+        last = None
+        for last in _CANDLE.finditer(buffer, max(len(buffer) - _CANDLE_SCAN_BYTES, 0)):
+            pass
+        if last is None and len(buffer) > _CANDLE_SCAN_BYTES:
+            for last in _CANDLE.finditer(buffer):
+                pass
+            # No candle in the shape _CANDLE matches, or one would have ended by now
+            fallback = last is None
+        if last is None:
+            continue
+        parsed = _parse_block(buffer[:last.end()])
+        if parsed is None:
+            fallback = True
+            continue
+        buffer = buffer[last.end():]
+        started = True
+        yield parsed
+    # Candles left unparsed: in an unhandled shape, or never matched by _CANDLE (e.g. two nested blocks)
+    if fallback or b'"time"' in buffer:
+        candles = _decode_rest(buffer.decode(), started)
+        if candles:
+            yield _parse_json(candles)
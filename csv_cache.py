@@ -0,0 +1,178 @@
+import os
+import csv
+import threading
+from collections import deque
+import orjson
+
+TAIL_BLOCK_SIZE = 64 * 1024      # Bytes read per backward seek when tail-reading
+TAIL_REREAD_BYTES = 1024 * 1024  # New bytes beyond which a windowed cache tail-reads instead of reading them all
+CHECK_BYTES = 256                # Bytes before the parsed offset compared on every change, to detect rewrites
+
+def parse_value(value):
+    """
+    Convert a CSV field like pandas.read_csv would: int, float, None for empty, else str.
+    """
+    if value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+def read_tail(path, rows, start=0):
+    """
+    Read the last complete lines of a file by seeking backwards from its end.
+
+    Parameters:
+    - path (str): File to read.
+    - rows (int): Lines wanted.
+    - start (int, optional): Offset before which nothing is read (e.g. the end of the header).
+
+    Returns:
+    - tuple: (list of the last `rows` lines as bytes, offset just past the last complete line).
+    """
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        data = b''
+        position = end
+        while position > start and data.count(b'\n') <= rows:
+            size = min(TAIL_BLOCK_SIZE, position - start)
+            position -= size
+            f.seek(position)
+            data = f.read(size) + data
+    complete = data.rfind(b'\n') + 1  # A trailing partial line is still being written
+    lines = data[:complete].splitlines()
+    if position > start:
+        lines = lines[1:]  # The first line may be cut
+    return lines[-rows:], position + complete
+
+class CsvCache:
+    """
+    Cache of the rows of an append-only CSV file, encoded as JSON.
+
+    Each `get` costs a stat call while the file is unchanged. When it grew,
+    only the appended lines are parsed and encoded, and the response is
+    joined from the rows encoded so far; a cache of the last `max_rows` rows
+    that falls far behind, or loads a file for the first time, seeks back
+    from the end of the file instead, so its cost doesn't depend on the
+    file's size. A file that shrank or was replaced is loaded again, and so
+    is one rewritten in place: the last CHECK_BYTES parsed (the end of the
+    last row, or of the header) are compared on every change. Rows are
+    objects keyed by the header. Like pandas, each column keeps the type its
+    values parsed as (int, then float, then str); empty values are null.
+    """
+
+    def __init__(self, path, max_rows=None):
+        """
+        Parameters:
+        - path (str): CSV file with a header line.
+        - max_rows (int, optional): Keep only the last rows. Defaults to all rows.
+        """
+        self.path = path
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._key = None        # (inode, size, mtime) the cache reflects
+        self._offset = 0        # End of the last complete line parsed
+        self._check = b''       # The CHECK_BYTES of the file before `_offset`
+        self._header = None
+        self._header_end = 0
+        self._types = []        # Type each column parses as so far
+        self._rows = deque(maxlen=max_rows)  # Encoded rows
+        self._body = None
+        self.etag = None
+        self.loads = 0          # Reads of the file, full or partial
+
+    def _parse(self, lines):
+        fields, types = self._header, self._types
+        for values in csv.reader(line.decode() for line in lines):
+            row = {}
+            for i, value in zip(range(len(fields)), values):
+                if value == '':
+                    row[fields[i]] = None
+                    continue
+                try:
+                    row[fields[i]] = types[i](value)
+                except ValueError:
+                    row[fields[i]] = value = parse_value(value)
+                    types[i] = type(value)
+            self._rows.append(orjson.dumps(row))
+
+    def _read_header(self):
+        with open(self.path, 'rb') as f:
+            line = f.readline()
+        if not line.endswith(b'\n'):
+            return False
+        names = next(csv.reader([line.decode()]))
+        # Unnamed columns (like a DataFrame index written by to_csv) are named as pandas does
+        self._header = [name or f"Unnamed: {i}" for i, name in enumerate(names)]
+        self._types = [int] * len(names)
+        self._header_end = len(line)
+        self._check = line[-CHECK_BYTES:]
+        return True
+
+    def _rewritten(self):
+        # Whether the bytes parsed last no longer end at `_offset`
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset - len(self._check))
+            return f.read(len(self._check)) != self._check
+
+    def _read_check(self):
+        with open(self.path, 'rb') as f:
+            start = max(self._offset - CHECK_BYTES, 0)
+            f.seek(start)
+            self._check = f.read(self._offset - start)
+
+    def _refresh(self, stat):
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if key == self._key:
+            return
+        if (self._key is None or stat.st_ino != self._key[0] or stat.st_size < self._offset
+                or self._rewritten()):
+            self._rows.clear()
+            self._header = None
+        if self._header is None:
+            if not self._read_header():
+                self._key = key
+                self._encode()
+                return
+            self._offset = self._header_end
+        appended = stat.st_size - self._offset
+        if self.max_rows and (not self._rows or appended > TAIL_REREAD_BYTES):
+            lines, self._offset = read_tail(self.path, self.max_rows, self._header_end)
+            self._rows.clear()
+            self._read_check()
+        else:
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read(appended)
+            complete = data.rfind(b'\n') + 1
+            lines = data[:complete].splitlines()
+            self._offset += complete
+            self._check = (self._check + data[:complete])[-CHECK_BYTES:]
+        self._parse(line for line in lines if line.strip())
+        self._key = key
+        self._encode()
+        self.loads += 1
+
+    def _encode(self):
+        self._body = b'[' + b','.join(self._rows) + b']'
+        ino, size, mtime = self._key
+        self.etag = f"{ino:x}-{mtime:x}-{size:x}"
+
+    def get(self):
+        """
+        Return the current rows as JSON.
+
+        Returns:
+        - tuple: (JSON array of the rows as bytes, ETag of that body).
+
+        Raises:
+        - FileNotFoundError: If the file doesn't exist.
+        """
+        with self._lock:
+            self._refresh(os.stat(self.path))
+            return self._body, self.etag
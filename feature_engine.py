@@ -0,0 +1,264 @@
+import os
+import json
+import hashlib
+import math
+import numpy as np
+import pandas as pd
+
+# Default technical-indicator configuration (periods in bars)
+FEATURE_CONFIG = {
+    'sma': [5, 20],
+    'ema': [12, 26],
+    'rsi': [14],
+    'atr': [14],
+    'volatility': [20],
+}
+FEATURE_CACHE_DIR = os.path.join("data", "features")
+
+def feature_columns(config=None):
+    """
+    Return the feature column names produced for `config`, in order.
+
+    Parameters:
+    - config (dict, optional): Indicator name to list of periods. Defaults to FEATURE_CONFIG.
+
+    Returns:
+    - list of str: Column names such as 'sma_5' or 'rsi_14'.
+    """
+    config = config or FEATURE_CONFIG
+    return [f"{name}_{period}" for name in FEATURE_CONFIG if name in config for period in config[name]]
+
+def compute_features(data, config=None):
+    """
+    Compute technical-indicator features for a whole history in vectorized form.
+
+    Values are NaN during each indicator's warm-up, matching IncrementalFeatures:
+    SMA(n) needs n bars, RSI(n), ATR(n) and volatility(n) need n + 1 bars, and
+    EMA(n) is defined from the first bar.
+
+    Parameters:
+    - data (pd.DataFrame): OHLC market data with 'high', 'low' and 'close' columns.
+    - config (dict, optional): Indicator name to list of periods. Defaults to FEATURE_CONFIG.
+
+    Returns:
+    - pd.DataFrame: One column per feature, indexed like `data`.
+    """
+    config = config or FEATURE_CONFIG
+    close = data['close'].astype(np.float64)
+    high = data['high'].astype(np.float64)
+    low = data['low'].astype(np.float64)
+    bar = np.arange(len(data))
+    features = {}
+
+    for period in config.get('sma', []):
+        features[f"sma_{period}"] = close.rolling(period).mean()
+
+    for period in config.get('ema', []):
+        features[f"ema_{period}"] = close.ewm(span=period, adjust=False).mean()
+
+    delta = close.diff()
+    for period in config.get('rsi', []):
+        avg_gain = delta.clip(lower=0).ewm(alpha=1 / period, adjust=False).mean()
+        avg_loss = (-delta).clip(lower=0).ewm(alpha=1 / period, adjust=False).mean()
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+        features[f"rsi_{period}"] = rsi.where(bar >= period)
+
+    prev_close = close.shift(1)
+    true_range = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+    for period in config.get('atr', []):
+        atr = true_range.ewm(alpha=1 / period, adjust=False).mean()
+        features[f"atr_{period}"] = atr.where(bar >= period)
+
+    returns = close.pct_change()
+    for period in config.get('volatility', []):
+        features[f"volatility_{period}"] = returns.rolling(period).std()
+
+    return pd.DataFrame(features, index=data.index)[feature_columns(config)]
+
+def data_fingerprint(data):
+    """
+    Hash the contents and index of `data` into a hex digest for cache keys.
+    """
+    return hashlib.sha256(pd.util.hash_pandas_object(data, index=True).values.tobytes()).hexdigest()
+
+def load_or_compute_features(data, config=None, cache_dir=FEATURE_CACHE_DIR):
+    """
+    Return the features of `data`, reading them from the on-disk cache when available.
+
+    Cache files are keyed by a hash of the data plus the feature configuration,
+    so any change to either recomputes the features.
+
+    Parameters:
+    - data (pd.DataFrame): OHLC market data.
+    - config (dict, optional): Indicator name to list of periods. Defaults to FEATURE_CONFIG.
+    - cache_dir (str, optional): Directory for cached feature arrays. Defaults to FEATURE_CACHE_DIR.
+
+    Returns:
+    - pd.DataFrame: One column per feature, indexed like `data`.
+    """
+    config = config or FEATURE_CONFIG
+    config_key = json.dumps(config, sort_keys=True)
+    key = hashlib.sha256((data_fingerprint(data) + config_key).encode()).hexdigest()[:32]
+    path = os.path.join(cache_dir, f"features_{key}.npy")
+
+    if os.path.exists(path):
+        values = np.load(path)
+        return pd.DataFrame(values, index=data.index, columns=feature_columns(config))
+
+    features = compute_features(data, config)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, features.to_numpy(dtype=np.float64))
+    os.replace(tmp_path, path)
+    return features
+
+def add_features(data, config=None, cache_dir=FEATURE_CACHE_DIR):
+    """
+    Append technical-indicator columns to `data` and drop the warm-up rows.
+
+    Parameters:
+    - data (pd.DataFrame): OHLC market data.
+    - config (dict, optional): Indicator name to list of periods. Defaults to FEATURE_CONFIG.
+    - cache_dir (str, optional): Feature cache directory, or None to disable caching.
+
+    Returns:
+    - pd.DataFrame: `data` with one extra column per feature.
+    """
+    if cache_dir is None:
+        features = compute_features(data, config)
+    else:
+        features = load_or_compute_features(data, config, cache_dir)
+    return data.join(features).dropna(subset=list(features.columns))
+
+class RollingWindow:
+    """
+    Fixed-size ring buffer with running sum and sum of squares.
+
+    Updates are O(1); the running sums are rebuilt from the buffer each time it
+    wraps around, which bounds floating-point drift at amortized O(1) cost.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.values = np.zeros(size)
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._pos = 0
+
+    def push(self, value):
+        old = self.values[self._pos]
+        self.values[self._pos] = value
+        self._pos += 1
+        if self.count < self.size:
+            self.count += 1
+            old = 0.0
+        if self._pos == self.size:
+            self._pos = 0
+            self.total = float(self.values.sum())
+            self.total_sq = float(np.dot(self.values, self.values))
+        else:
+            self.total += value - old
+            self.total_sq += value * value - old * old
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+    def mean(self):
+        return self.total / self.size if self.full else math.nan
+
+    def std(self):
+        """Sample standard deviation (ddof=1) of a full window."""
+        if not self.full or self.size < 2:
+            return math.nan
+        variance = (self.total_sq - self.total * self.total / self.size) / (self.size - 1)
+        return math.sqrt(max(variance, 0.0))
+
+class IncrementalFeatures:
+    """
+    O(1)-per-bar version of `compute_features` for live data.
+
+    Feed bars in time order with `update`; each call returns the feature vector
+    for the newest bar, identical (up to floating-point rounding) to the last
+    row `compute_features` would produce for the same history.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or FEATURE_CONFIG
+        self.columns = feature_columns(self.config)
+        self._sma = {p: RollingWindow(p) for p in self.config.get('sma', [])}
+        self._ema = {p: math.nan for p in self.config.get('ema', [])}
+        self._rsi = {p: [math.nan, math.nan] for p in self.config.get('rsi', [])}  # avg gain, avg loss
+        self._atr = {p: math.nan for p in self.config.get('atr', [])}
+        self._volatility = {p: RollingWindow(p) for p in self.config.get('volatility', [])}
+        self.bars_seen = 0
+        self._prev_close = None
+        self.values = dict.fromkeys(self.columns, math.nan)
+
+    def update(self, high, low, close):
+        """
+        Consume one bar and return the updated features.
+
+        Parameters:
+        - high (float): Bar high.
+        - low (float): Bar low.
+        - close (float): Bar close.
+
+        Returns:
+        - np.ndarray: Feature values in `self.columns` order (NaN while warming up).
+        """
+        prev_close = self._prev_close
+        bar = self.bars_seen
+        values = self.values
+
+        for period, window in self._sma.items():
+            window.push(close)
+            values[f"sma_{period}"] = window.mean()
+
+        for period, ema in self._ema.items():
+            alpha = 2 / (period + 1)
+            ema = close if bar == 0 else ema + alpha * (close - ema)
+            self._ema[period] = ema
+            values[f"ema_{period}"] = ema
+
+        if prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            delta = close - prev_close
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            for period, averages in self._rsi.items():
+                if bar == 1:
+                    averages[0], averages[1] = gain, loss
+                else:
+                    averages[0] += (gain - averages[0]) / period
+                    averages[1] += (loss - averages[1]) / period
+            for period, window in self._volatility.items():
+                window.push(delta / prev_close)
+                values[f"volatility_{period}"] = window.std()
+
+        for period, averages in self._rsi.items():
+            avg_gain, avg_loss = averages
+            if bar < period or (avg_gain == 0 and avg_loss == 0):
+                rsi = math.nan
+            elif avg_loss == 0:
+                rsi = 100.0
+            else:
+                rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+            values[f"rsi_{period}"] = rsi
+
+        for period, atr in self._atr.items():
+            atr = true_range if bar == 0 else atr + (true_range - atr) / period
+            self._atr[period] = atr
+            values[f"atr_{period}"] = atr if bar >= period else math.nan
+
+        self._prev_close = close
+        self.bars_seen += 1
+        return np.fromiter((values[c] for c in self.columns), dtype=np.float64, count=len(self.columns))
+
+    @property
+    def ready(self):
+        """True once every feature is past its warm-up."""
+        return not any(math.isnan(v) for v in self.values.values())
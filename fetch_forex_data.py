@@ -1,99 +1,203 @@
 import os
-from datetime import datetime
+import sys
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
-from oandapyV20 import API
-import oandapyV20.endpoints.instruments as instruments
-from azure.storage.blob import BlobServiceClient
 from utils.secrets import read_secret
+from oanda_client import create_session, OANDA_API_URL, REQUEST_TIMEOUT
+from market_data_store import MarketDataStore
+from candle_parser import parse_candles, CHUNK_BYTES
 
-# Define the output CSV path
-OUTPUT_CSV = "data/processed_forex_data.csv"  # Ensure this variable is defined
+# Series to fetch
+INSTRUMENT = "EUR_USD"
+GRANULARITY = "M1"
+INSTRUMENTS = [
+    "EUR_USD", "GBP_USD", "USD_JPY", "USD_CHF", "AUD_USD", "USD_CAD",
+    "NZD_USD", "EUR_GBP", "EUR_JPY", "GBP_JPY", "EUR_CHF", "AUD_JPY",
+]
+GRANULARITIES = [GRANULARITY]
 
-def fetch_data():
+# Candles endpoint (the API root, timeout and retries are set in oanda_client)
+MAX_CANDLES = 5000     # Largest page the candles endpoint returns
+BACKFILL_DAYS = 30     # History fetched for a series with nothing stored yet
+MAX_WORKERS = 8        # Series downloaded concurrently
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def fetch_candles(session, instrument, granularity, since, include_first=False, page_size=MAX_CANDLES, base_url=OANDA_API_URL):
+    """
+    Page forward through the candles after `since`, yielding complete candles only.
+
+    Each request asks for up to `page_size` candles starting strictly after the
+    last candle received, so no candle is downloaded twice. Paging stops at the
+    first short page or incomplete (still forming) candle, i.e. once caught up.
+    Responses are streamed and decoded chunk by chunk into typed records, so
+    no page is ever held in memory as JSON or Python objects.
+
+    Parameters:
+    - session (requests.Session): Authenticated session.
+    - instrument (str): Instrument name (e.g., 'EUR_USD').
+    - granularity (str): Candle granularity (e.g., 'M1').
+    - since (pd.Timestamp): Time of the newest candle already stored.
+    - include_first (bool, optional): Also return the candle at `since`. Defaults to False.
+    - page_size (int, optional): Candles per request. Defaults to MAX_CANDLES.
+    - base_url (str, optional): REST API root. Defaults to OANDA_API_URL.
+
+    Yields:
+    - np.ndarray: Complete candles as CANDLE_DTYPE records, in time order.
     """
-    Fetch raw Forex data from OANDA API.
-    
+    url = f"{base_url}/v3/instruments/{instrument}/candles"
+    cursor = pd.Timestamp(since).isoformat()
+    while True:
+        params = {
+            "granularity": granularity,
+            "price": "M",
+            "from": cursor,
+            "count": page_size,
+            "includeFirst": "true" if include_first else "false",
+        }
+        received = 0
+        caught_up = False
+        with session.get(url, params=params, timeout=REQUEST_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            for records, complete in parse_candles(response.iter_content(CHUNK_BYTES)):
+                if not complete.all():
+                    records = records[:np.argmin(complete)]
+                    caught_up = True
+                if len(records):
+                    received += len(records)
+                    cursor = pd.Timestamp(int(records['time'][-1]), tz='UTC').isoformat()
+                    include_first = False
+                    yield records
+                if caught_up:
+                    break
+        if caught_up or received < page_size:
+            return
+
+def save_processed_data(df, store, instrument=INSTRUMENT, granularity=GRANULARITY):
+    """
+    Merge the new processed data into the market data store, deduplicating on time.
+
+    Parameters:
+    - df (pd.DataFrame or np.ndarray): Processed market data or CANDLE_DTYPE records.
+    - store (MarketDataStore): Target market data store.
+    - instrument (str, optional): Instrument name. Defaults to INSTRUMENT.
+    - granularity (str, optional): Candle granularity. Defaults to GRANULARITY.
+
     Returns:
-    - list: List of candle data.
+    - list of str: Paths of the daily partitions that were written.
     """
-    access_token = read_secret('oanda_access_token')
-    client = API(access_token=access_token)
-    params = {
-        "granularity": "M1",
-        "count": 5000  # Number of data points
-    }
-    
-    r = instruments.InstrumentsCandles(instrument="EUR_USD", params=params)
-    client.request(r)
-    raw_data = r.response.get('candles', [])
-    
-    return raw_data
-
-def process_data(raw_data):
+    written = store.write(instrument, granularity, df)
+    logging.info(f"Processed data saved to {len(written)} partition(s) of {instrument} {granularity}.")
+    return written
+
+def sync_series(session, store, instrument=INSTRUMENT, granularity=GRANULARITY, base_url=OANDA_API_URL):
     """
-    Process raw Forex data into a pandas DataFrame.
-    
+    Bring one stored series up to date with the API.
+
+    The newest stored timestamp is the resume cursor: every page is written to
+    the store as soon as it arrives, so an interrupted sync continues from the
+    last page it saved. A series with no stored data is backfilled from
+    BACKFILL_DAYS ago.
+
     Parameters:
-    - raw_data (list): Raw candle data from OANDA API.
-    
+    - session (requests.Session): Authenticated session.
+    - store (MarketDataStore): Target market data store.
+    - instrument (str, optional): Instrument name. Defaults to INSTRUMENT.
+    - granularity (str, optional): Candle granularity. Defaults to GRANULARITY.
+    - base_url (str, optional): REST API root. Defaults to OANDA_API_URL.
+
     Returns:
-    - pd.DataFrame: Processed Forex data.
+    - list of str: Paths of the daily partitions that were written.
     """
-    frames = []
-    for candle in raw_data:
-        frames.append({
-            'time': candle['time'],
-            'open': float(candle['mid']['o']),
-            'high': float(candle['mid']['h']),
-            'low': float(candle['mid']['l']),
-            'close': float(candle['mid']['c']),
-            'volume': candle['volume']
-        })
-    
-    df = pd.DataFrame(frames)
-    df['time'] = pd.to_datetime(df['time'])
-    df.set_index('time', inplace=True)
-    
-    return df
-
-def save_processed_data(df, output_path):
+    since = store.last_timestamp(instrument, granularity)
+    backfill = since is None
+    if backfill:
+        since = pd.Timestamp.now(tz='UTC').floor('D') - pd.Timedelta(days=BACKFILL_DAYS)
+
+    written = set()
+    candles = 0
+    for page in fetch_candles(session, instrument, granularity, since, include_first=backfill, base_url=base_url):
+        written.update(save_processed_data(page, store, instrument, granularity))
+        candles += len(page)
+    logging.info(f"Fetched {candles} new {instrument} {granularity} candles after {since}.")
+    return sorted(written)
+
+def sync_all(session, store, instruments=INSTRUMENTS, granularities=GRANULARITIES, max_workers=MAX_WORKERS, base_url=OANDA_API_URL):
     """
-    Append the new processed data to the existing CSV file.
+    Bring every instrument x granularity series up to date concurrently.
+
+    Series are synced on a bounded thread pool sharing one pooled session;
+    each writes to its own store partitions. A failing series is logged and
+    does not stop the others.
 
     Parameters:
-    - df (pd.DataFrame): Processed market data.
-    - output_path (str): Path to the CSV file.
+    - session (requests.Session): Authenticated session from `create_session`.
+    - store (MarketDataStore): Target market data store.
+    - instruments (list of str, optional): Instrument names. Defaults to INSTRUMENTS.
+    - granularities (list of str, optional): Candle granularities. Defaults to GRANULARITIES.
+    - max_workers (int, optional): Series downloaded at once. Defaults to MAX_WORKERS.
+    - base_url (str, optional): REST API root. Defaults to OANDA_API_URL.
+
+    Returns:
+    - tuple: (list of written partition paths, list of (instrument, granularity) that failed)
     """
-    if os.path.exists(output_path):
-        df.to_csv(output_path, mode='a', header=False)
-    else:
-        df.to_csv(output_path, mode='w', header=True)
-    print(f"Processed data saved to {output_path}.")
+    written = []
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(sync_series, session, store, instrument, granularity, base_url): (instrument, granularity)
+            for instrument in instruments
+            for granularity in granularities
+        }
+        for future in as_completed(futures):
+            instrument, granularity = futures[future]
+            try:
+                written.extend(future.result())
+            except Exception as e:
+                logging.error(f"Error fetching {instrument} {granularity}: {e}")
+                failed.append((instrument, granularity))
+    return sorted(written), failed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync candles from OANDA into the market data store.")
+    parser.add_argument('--instruments', nargs='+', default=INSTRUMENTS, help="Instruments to fetch")
+    parser.add_argument('--granularities', nargs='+', default=GRANULARITIES, help="Candle granularities to fetch")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help="Series downloaded concurrently")
+    return parser.parse_args()
 
 def main():
-    # Fetch and process data
-    raw_data = fetch_data()
-    df_processed = process_data(raw_data)
-
-    # Save the processed data by appending
-    save_processed_data(df_processed, OUTPUT_CSV)
-    
-    # Upload to Azure Blob Storage
+    args = parse_args()
+
+    # Fetch the candles after the newest stored one of every series and merge them into the store
+    session = create_session(read_secret('oanda_access_token'), pool_size=args.workers)
+    store = MarketDataStore()
+    written, failed = sync_all(session, store, args.instruments, args.granularities, args.workers)
+
+    # Upload to Azure Blob Storage (imported here so the sync functions don't need the Azure SDK)
     try:
+        from azure.storage.blob import BlobServiceClient
         connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
         blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-        
+
         container_name = "forex-data"
         container_client = blob_service_client.get_container_client(container_name)
-        
-        blob_name = f"forex_data_{datetime.now().strftime('%Y%m%d')}.csv"
-        blob_client = container_client.get_blob_client(blob_name)
-        
-        with open(OUTPUT_CSV, "rb") as data:
-            blob_client.upload_blob(data, overwrite=True)
-        print(f"Successfully uploaded {blob_name} to Azure Blob Storage")
+
+        # Upload the partitions touched by this run, mirroring the store layout
+        for path in written:
+            blob_name = os.path.relpath(path, store.root).replace(os.sep, '/')
+            blob_client = container_client.get_blob_client(blob_name)
+
+            with open(path, "rb") as data:
+                blob_client.upload_blob(data, overwrite=True)
+            logging.info(f"Successfully uploaded {blob_name} to Azure Blob Storage")
     except Exception as e:
-        print(f"Error uploading to Azure Blob Storage: {str(e)}")
+        logging.error(f"Error uploading to Azure Blob Storage: {str(e)}")
+
+    if failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,105 +1,207 @@
 import gymnasium as gym
-from gym import spaces
+from gymnasium import spaces
 import pandas as pd
 import numpy as np
+from price_array import PriceArray, to_price_array
+from position_ledger import PositionLedger, PIP_SIZE, MAX_POSITIONS, DEFAULT_SPREAD, DEFAULT_COMMISSION
+from bar_aggregator import BarBuffer
+
+# Number of consecutive bars stacked into a single observation
+WINDOW_SIZE = 10
+
+# Simulated order parameters
+TRADE_UNITS = 1000       # Units per Buy/Sell action (one micro lot)
+STOP_LOSS_PIPS = 50      # Stop loss distance in pips
+TAKE_PROFIT_PIPS = 50    # Take profit distance in pips
+
+# Live bars kept by process_live_data
+LIVE_BUFFER_BARS = 1024
 
 class ForexEnv(gym.Env):
     """
     Custom Environment for Forex Trading that follows OpenAI Gym interface.
+
+    The historical DataFrame is converted once into a contiguous float32 array
+    and observations are served as views into that array, so stepping the
+    environment does not allocate pandas objects.
+
+    Buy and Sell open positions in a PositionLedger with stop loss and take
+    profit orders that fill intrabar from the high/low of the following bars.
+    The reward is the per-step change in mark-to-market equity, net of spread
+    and commission.
     """
     metadata = {'render.modes': ['human']}
-    
-    def __init__(self, historical_data=None):
+
+    def __init__(self, historical_data=None, window_size=WINDOW_SIZE, trade_units=TRADE_UNITS,
+                 stop_loss_pips=STOP_LOSS_PIPS, take_profit_pips=TAKE_PROFIT_PIPS,
+                 spread=DEFAULT_SPREAD, commission=DEFAULT_COMMISSION, max_positions=MAX_POSITIONS):
         super(ForexEnv, self).__init__()
-        
+
+        self.window_size = window_size
+        self.trade_units = trade_units
+        self.stop_loss_distance = stop_loss_pips * PIP_SIZE
+        self.take_profit_distance = take_profit_pips * PIP_SIZE
+
         # Define action and observation space
         # Actions: 0 = Hold, 1 = Buy, 2 = Sell
         self.action_space = spaces.Discrete(3)
-        
-        # Example observation: price and technical indicators
-        self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(10,), dtype=np.float32)
-        
+
         # Load historical data
-        if historical_data is not None:
-            self.data = historical_data
+        if isinstance(historical_data, PriceArray):
+            self.data = None  # Served straight from the (possibly memory-mapped) array
+            self.prices, self.columns = historical_data.prices, list(historical_data.columns)
+            self._index_columns()
         else:
-            self.data = pd.DataFrame()  # Empty DataFrame if no data provided
-        
+            self.data = historical_data if historical_data is not None else pd.DataFrame()
+            self._load_data(self.data)
+
+        # Observation: the last `window_size` bars of every numeric column, flattened
+        obs_size = self._obs_size if self._obs_size else 10
+        self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(obs_size,), dtype=np.float32)
+
         self.current_step = 0
         self.initial_balance = 10000
         self.balance = self.initial_balance
         self.equity = self.initial_balance
-        self.positions = []
+        self.positions = PositionLedger(capacity=max_positions, spread=spread, commission=commission)
         self.profit_pool = 0
+        self._account = np.ones(1, dtype=bool)
+        self.live = None  # BarBuffer of live bars, created by process_live_data
+
+    def _load_data(self, data):
+        """
+        Convert market data into the array representation used by the environment.
+
+        Parameters:
+        - data (pd.DataFrame): Market data; only numeric columns are kept.
+        """
+        self.prices, self.columns = to_price_array(data)
+        self._index_columns()
+
+    def _index_columns(self):
+        """
+        Locate the price columns and size the observation buffers for `self.prices`.
+        """
+        self._close_idx = self.columns.index('close') if 'close' in self.columns else None
+        # Without high/low columns, exits are checked against the close
+        self._high_idx = self.columns.index('high') if 'high' in self.columns else self._close_idx
+        self._low_idx = self.columns.index('low') if 'low' in self.columns else self._close_idx
+        self._obs_size = self.window_size * self.prices.shape[1]
+        # Preallocated buffer for windows that run past the end of the data
+        self._pad = np.zeros(self._obs_size, dtype=np.float32)
 
     def reset(self):
         self.current_step = 0
         self.balance = self.initial_balance
         self.equity = self.initial_balance
-        self.positions = []
+        self.positions.reset()
         self.profit_pool = 0
         return self._next_observation()
-    
+
     def _next_observation(self):
-        # Example: return last 10 steps of data as observation
-        frame = self.data.iloc[self.current_step:self.current_step+10]
-        if len(frame) < 10:
-            # Pad with zeros or handle as needed
-            frame = frame.reindex(range(10), fill_value=0)
-        obs = frame.values.flatten()
-        return obs.astype(np.float32)
-    
+        """
+        Return the last `window_size` bars as a flat float32 observation.
+
+        Full windows are read-only views into `self.prices`; windows that run
+        past the end of the data are copied into a reused, zero-padded buffer.
+        Callers that keep observations around must copy them.
+        """
+        start = self.current_step
+        end = start + self.window_size
+        if end <= len(self.prices):
+            return self.prices[start:end].reshape(-1)
+        tail = self.prices[start:].reshape(-1)
+        self._pad[:tail.size] = tail
+        self._pad[tail.size:] = 0
+        return self._pad
+
+    def _bar(self, column, bar):
+        """
+        Return a one-element view of `column` at row `bar`, as consumed by the ledger.
+        """
+        return self.prices[bar:bar + 1, column]
+
     def step(self, action):
-        # Implement the logic for each action
-        # Update balance, equity, open positions, etc.
-        # Calculate reward
         done = False
         info = {}
-        
-        # Example logic (to be replaced with actual trading logic)
-        current_price = self.data.iloc[self.current_step]['close']
-        
+
+        # The newest bar in the observation is the one the agent acts on
+        bar = min(self.current_step + self.window_size, len(self.prices)) - 1
+        current_price = self._bar(self._close_idx, bar)
+        realized_before = self.positions.realized_pnl[0]
+
         if action == 1:  # Buy
-            # Execute buy logic
-            pass
+            self.positions.open(self._account, self.trade_units, current_price,
+                                self.stop_loss_distance, self.take_profit_distance)
         elif action == 2:  # Sell
-            # Execute sell logic
-            pass
+            self.positions.open(self._account, -self.trade_units, current_price,
+                                self.stop_loss_distance, self.take_profit_distance)
         else:
             # Hold
             pass
-        
+
         # Update step
         self.current_step += 1
-        if self.current_step >= len(self.data) - 10:
+        if self.current_step >= len(self.prices) - self.window_size:
+            done = True
+
+        # Fill stop loss / take profit orders touched by the next bar, then mark to its close
+        bar = min(bar + 1, len(self.prices) - 1)
+        self.positions.check_exits(self._bar(self._high_idx, bar), self._bar(self._low_idx, bar))
+        unrealized = self.positions.unrealized_pnl(self._bar(self._close_idx, bar))[0]
+
+        # Realized profit (net of costs) goes to the profit pool; reward is the change in equity
+        self.profit_pool = self.positions.realized_pnl[0]
+        previous_equity = self.equity
+        self.equity = self.balance + self.profit_pool + unrealized
+        reward = float(self.equity - previous_equity)
+        if self.equity <= 0:
             done = True
-        
-        # Calculate reward (example)
-        reward = 0  # Replace with actual reward calculation
-        
-        # Update equity
-        self.equity = self.balance + self.profit_pool
-        
+
         # Update info
         info['current_equity'] = self.equity
-        info['trade_profit'] = 0  # Replace with actual trade profit/loss
-        
+        info['trade_profit'] = self.profit_pool - realized_before
+
         return self._next_observation(), reward, done, info
-    
+
     def render(self, mode='human', close=False):
         # Implement visualization if needed
         pass
-    
+
     def process_live_data(self, new_data):
         """
         Integrate new live data into the environment.
 
+        Bars are appended to a fixed-capacity ring buffer (`self.live`, the
+        last LIVE_BUFFER_BARS bars, seeded with the tail of the historical
+        data) and the environment's prices become a view of it, with the
+        current step on the newest window. Each call therefore costs O(new
+        bars) and memory stays bounded however long the process runs.
+
         Parameters:
-        - new_data (pd.DataFrame): New market data to append.
-        
+        - new_data (pd.DataFrame or dict): New market data to append (numeric
+          columns), or one bar as a mapping of column to value.
+
         Returns:
         - np.ndarray: The latest observation.
         """
-        self.data = pd.concat([self.data, new_data])
-        self.data.reset_index(drop=True, inplace=True)
-        return self._next_observation() 
\ No newline at end of file
+        first = self.live is None
+        if first:
+            columns = (list(new_data.select_dtypes(include=[np.number]).columns)
+                       if isinstance(new_data, pd.DataFrame) else list(new_data))
+            self.live = BarBuffer(LIVE_BUFFER_BARS, columns, dtype=np.float32)
+            if len(self.prices) and self.columns == columns:
+                for row in self.prices[-LIVE_BUFFER_BARS:]:
+                    self.live.append(row)
+            self.columns = columns
+        if isinstance(new_data, pd.DataFrame):
+            for row in new_data[self.live.columns].to_numpy(dtype=np.float32):
+                self.live.append(row)
+        else:
+            self.live.append([new_data[column] for column in self.live.columns])
+
+        self.prices = self.live.window()
+        if first:
+            self._index_columns()
+        self.current_step = max(len(self.prices) - self.window_size, 0)
+        return self._next_observation()
@@ -1,30 +1,25 @@
-import time
-import pandas as pd
 import numpy as np
-from stable_baselines3 import PPO
 from forex_env import ForexEnv  # Ensure ForexEnv is adapted for live trading
-import telegram
+from feature_engine import IncrementalFeatures
+from numpy_policy import NumpyPolicy, POLICY_PATH
+from bar_aggregator import TickAggregator, BAR_COLUMNS
 import os
 from utils.secrets import read_secret
+from utils.telegram_notifications import get_notifier
 
 # Risk Management Configuration
 MAX_DRAWDOWN_PERCENTAGE = 0.10  # 10% drawdown
 MAX_VOLATILITY_PERCENTAGE = 0.05  # 5% volatility
 
 
-
-
-TELEGRAM_BOT_TOKEN = read_secret('telegram_bot_token')
-TELEGRAM_CHAT_ID = read_secret('telegram_chat_id')
-OANDA_ACCESS_TOKEN = read_secret('oanda_access_token')
-
 # Configuration
-MODEL_PATH = "ppo_forex_agent.zip"       # Path to your trained RL model
+MODEL_PATH = "ppo_forex_agent.zip"       # Trained RL model, used when its NumPy export (POLICY_PATH) is missing
 SYMBOL = "USD"                           # Trading symbol
+INSTRUMENTS = ["EUR_USD"]                # Instruments traded, predicted in one batch per check
 LOT_SIZE = 0.01                          # Trading volume (adjust as needed)
 STOP_LOSS = 50                           # Stop loss in pips
 TAKE_PROFIT = 50                         # Take profit in pips
-CHECK_INTERVAL = 60                      # Time between checks in seconds
+GRANULARITY = "M1"                       # Bars the policy acts on, aggregated from streamed ticks (M1, M5 or H1)
 RISK_PERCENTAGE = 0.02                   # Risk per trade (2%)
 
 def calculate_position_size(account_balance, profit_pool, scaling_factor=0.01, risk_percentage=0.02):
@@ -59,61 +54,108 @@ def calculate_position_size(account_balance, profit_pool, scaling_factor=0.01, r
 
 def send_telegram_message(message):
     """
-    Send a Telegram alert.
+    Queue a Telegram alert; it is sent by the notifier's background dispatcher.
     
     Parameters:
     - message (str): Content of the message.
     """
     try:
-        bot = telegram.Bot(token=TELEGRAM_BOT_TOKEN)
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
-        print("Telegram message sent.")
+        if get_notifier().send_message(message, parse_mode=None):
+            print("Telegram message queued.")
+        else:
+            print("Telegram message dropped: notification queue full.")
     except Exception as e:
         print(f"Failed to send Telegram message: {e}")
 
+def load_policy():
+    """
+    Load the exported NumPy policy, falling back to the full PPO model if it hasn't been exported.
+
+    Returns:
+    - NumpyPolicy or PPO: An object with PPO's `predict` interface.
+    """
+    if os.path.exists(POLICY_PATH):
+        return NumpyPolicy.load(POLICY_PATH)
+    from stable_baselines3 import PPO  # Pulls in torch; only needed without an export
+    return PPO.load(MODEL_PATH)
+
 def main():
-    # Load the trained PPO model
-    model = PPO.load(MODEL_PATH)
+    # Load the trained policy
+    model = load_policy()
 
-    # Initialize the trading environment (ensure it's adapted for live trading)
-    env = ForexEnv()
+    # One trading environment and indicator state per instrument (ensure it's adapted for live trading)
+    envs = {instrument: ForexEnv() for instrument in INSTRUMENTS}
+
+    # Technical indicators, updated in O(1) per new bar
+    features = {instrument: IncrementalFeatures() for instrument in INSTRUMENTS}
+    # Consecutive bars with every indicator warmed up; the observation is clean once it spans a whole window
+    ready_bars = {instrument: 0 for instrument in INSTRUMENTS}
+
+    # Account state, kept in memory from order fills, the transaction stream and periodic reconciliation
+    from trade_executor import get_position_cache
+    positions = get_position_cache()
 
     # Initial account monitoring
-    equity, profit_pool = 10000, 0  # Placeholder values for equity and profit pool
+    equity, profit_pool = 10000, 0  # Placeholder values until the first account snapshot arrives
+    if positions.balance is not None:
+        equity = positions.balance
 
     # Initialize peak equity
     peak_equity = equity
 
+    # Streamed prices, aggregated into bars as they arrive
+    from oanda_client import create_session
+    from price_stream import PriceStream
+    stream = PriceStream(create_session(read_secret('oanda_access_token')), read_secret('oanda_account_id'), INSTRUMENTS)
+    aggregators = {instrument: TickAggregator() for instrument in INSTRUMENTS}
+
     try:
-        while True:
-            # Retrieve the latest market data
-            data = pd.DataFrame()  # Placeholder for market data retrieval
-            if data.empty:
-                print("No data retrieved. Retrying...")
-                time.sleep(CHECK_INTERVAL)
+        for tick in stream:
+            # Act as soon as a bar completes: on the first tick after it, or on a heartbeat in a quiet market
+            if tick['type'] == 'PRICE':
+                bars = aggregators[tick['instrument']].update(tick['time'], (tick['bid'] + tick['ask']) / 2)
+                completed = {tick['instrument']: bars[GRANULARITY]} if GRANULARITY in bars else {}
+            else:
+                completed = {instrument: aggregator.flush(tick['time']) for instrument, aggregator in aggregators.items()}
+                completed = {instrument: bars[GRANULARITY] for instrument, bars in completed.items() if GRANULARITY in bars}
+            if not completed:
                 continue
 
-            # Preprocess data as required by the environment
-            obs = env.process_live_data(data)
-
-            # Predict action using the RL model
-            action, _states = model.predict(obs, deterministic=True)
-
-            # Map action to trading commands
-            if action == 1:
-                # Buy signal
-                lot = calculate_position_size(equity, profit_pool, scaling_factor=LOT_SIZE, risk_percentage=RISK_PERCENTAGE)
-                print(f"Executing buy order with lot size: {lot}")
-            elif action == 2:
-                # Sell signal
-                lot = calculate_position_size(equity, profit_pool, scaling_factor=LOT_SIZE, risk_percentage=RISK_PERCENTAGE)
-                print(f"Executing sell order with lot size: {lot}")
-            elif action == 0:
-                # Close all positions
-                print("Closing all positions")
-
-            # Monitor account status
-            equity, profit_pool = 10000, 0  # Placeholder for account monitoring
+            observations = {}
+            for instrument, bar in completed.items():
+                # Preprocess data as required by the environment: the bar plus its technical indicators
+                instrument_features = features[instrument]
+                feature_values = instrument_features.update(bar['high'], bar['low'], bar['close'])
+                row = {column: bar[column] for column in BAR_COLUMNS}
+                row.update(zip(instrument_features.columns, feature_values))
+                obs = envs[instrument].process_live_data(row)
+                ready_bars[instrument] = ready_bars[instrument] + 1 if instrument_features.ready else 0
+                if ready_bars[instrument] < envs[instrument].window_size:
+                    print(f"Warming up {instrument} technical indicators...")
+                    continue
+                observations[instrument] = obs
+
+            if observations:
+                # Predict the actions of every instrument with one batched policy call
+                actions, _states = model.predict(np.stack(list(observations.values())), deterministic=True)
+
+                # Map actions to trading commands
+                for instrument, action in zip(observations, actions):
+                    if action == 1:
+                        # Buy signal
+                        lot = calculate_position_size(equity, profit_pool, scaling_factor=LOT_SIZE, risk_percentage=RISK_PERCENTAGE)
+                        print(f"Executing {instrument} buy order with lot size: {lot}")
+                    elif action == 2:
+                        # Sell signal
+                        lot = calculate_position_size(equity, profit_pool, scaling_factor=LOT_SIZE, risk_percentage=RISK_PERCENTAGE)
+                        print(f"Executing {instrument} sell order with lot size: {lot}")
+                    elif action == 0:
+                        # Close all positions
+                        print(f"Closing all {instrument} positions")
+
+            # Monitor account status (read from memory; no account polling in the loop)
+            if positions.balance is not None:
+                equity = positions.balance
 
             # Update peak equity
             if equity > peak_equity:
@@ -122,9 +164,9 @@ def main():
             # Calculate drawdown
             drawdown = (peak_equity - equity) / peak_equity if peak_equity != 0 else 0
 
-            # Calculate volatility based on recent market data
-            recent_prices = data['close'].tail(30).tolist() if not data.empty else []
-            volatility = np.std(np.diff(recent_prices) / recent_prices[:-1]) if len(recent_prices) > 1 else 0
+            # Calculate volatility based on recent market data (the most volatile instrument counts)
+            recent_prices = (aggregator.bars[GRANULARITY].column('close', 30) for aggregator in aggregators.values())
+            volatility = max((np.std(np.diff(prices) / prices[:-1]) for prices in recent_prices if len(prices) > 1), default=0)
 
             print(f"Current Equity: {equity:.2f}, Drawdown: {drawdown:.2%}, Volatility: {volatility:.2%}")
 
@@ -144,11 +186,13 @@ def main():
                 print("Trading halted due to high volatility.")
                 break  # Halt trading
 
-            # Wait before next check
-            time.sleep(CHECK_INTERVAL)
-
     except KeyboardInterrupt:
         print("Live trading stopped by user.")
+    finally:
+        stream.stop()
+        if get_notifier.initialized():
+            # Deliver queued alerts (such as the halt reason) before exiting
+            get_notifier().dispatcher.close(timeout=30)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,5 +1,8 @@
+SHORT_TERM_PERIOD = 5
+LONG_TERM_PERIOD = 20
+
 def analyze_market_conditions(market_data):
     # Example: Use moving averages to determine market trend
-    short_term_ma = sum(market_data['bid'][-5:]) / 5
-    long_term_ma = sum(market_data['bid'][-20:]) / 20
-    return short_term_ma > long_term_ma  # Bullish if short-term MA is above long-term MA 
\ No newline at end of file
+    short_term_ma = sum(market_data['bid'][-SHORT_TERM_PERIOD:]) / SHORT_TERM_PERIOD
+    long_term_ma = sum(market_data['bid'][-LONG_TERM_PERIOD:]) / LONG_TERM_PERIOD
+    return short_term_ma > long_term_ma  # Bullish if short-term MA is above long-term MA
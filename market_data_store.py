@@ -0,0 +1,271 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+from price_array import to_utc_ns, save_price_array, load_price_array, saved_at
+from feature_engine import add_features
+
+# Root directory of the partitioned market data store
+STORE_DIR = os.path.join("data", "store")
+# Directory of memory-mappable price arrays exported from the store
+PRICE_ARRAY_DIR = os.path.join("data", "price_arrays")
+NS_PER_DAY = 86_400 * 1_000_000_000
+
+def to_records(df):
+    """
+    Convert market data into the structured array layout stored on disk.
+
+    Parameters:
+    - df (pd.DataFrame): Market data indexed by (or with a column named) 'time'.
+
+    Returns:
+    - np.ndarray: Structured array with an int64 'time' field (UTC nanoseconds)
+      followed by one field per numeric column.
+    """
+    if 'time' in df.columns:
+        df = df.set_index('time')
+    times = pd.DatetimeIndex(pd.to_datetime(df.index, utc=True))
+    numeric = df.select_dtypes(include=[np.number])
+    dtype = [('time', np.int64)] + [(str(c), numeric[c].dtype) for c in numeric.columns]
+    records = np.empty(len(df), dtype=dtype)
+    records['time'] = times.as_unit('ns').asi8
+    for column in numeric.columns:
+        records[str(column)] = numeric[column].to_numpy()
+    return records
+
+def to_frame(records):
+    """
+    Convert stored records back into a DataFrame indexed by UTC time.
+    """
+    index = pd.DatetimeIndex(records['time'].astype('datetime64[ns]'), name='time').tz_localize('UTC')
+    columns = {name: np.asarray(records[name]) for name in records.dtype.names if name != 'time'}
+    return pd.DataFrame(columns, index=index)
+
+class MarketDataStore:
+    """
+    Partitioned columnar store for market data.
+
+    Data is partitioned per instrument, granularity and UTC day into
+    `<root>/<instrument>/<granularity>/<YYYY-MM-DD>.npy` files, each holding a
+    structured NumPy array sorted and unique on its int64 nanosecond 'time'
+    field. Partitions are read memory-mapped, so time-range reads only touch
+    the days they need. Writes merge with the existing partition, keep the
+    newest row for duplicate timestamps and replace the file atomically.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+
+    def _series_dir(self, instrument, granularity):
+        return os.path.join(self.root, instrument, granularity)
+
+    def partition_path(self, instrument, granularity, day):
+        """
+        Return the file path of one daily partition.
+
+        Parameters:
+        - instrument (str): Instrument name (e.g., 'EUR_USD').
+        - granularity (str): Candle granularity (e.g., 'M1').
+        - day (int): Days since the Unix epoch (UTC).
+        """
+        date = np.datetime64(int(day), 'D').astype(str)
+        return os.path.join(self._series_dir(instrument, granularity), f"{date}.npy")
+
+    def days(self, instrument, granularity):
+        """
+        List the stored days of a series as sorted days-since-epoch integers.
+        """
+        series_dir = self._series_dir(instrument, granularity)
+        if not os.path.isdir(series_dir):
+            return []
+        names = sorted(n for n in os.listdir(series_dir) if n.endswith('.npy'))
+        return [int(np.datetime64(n[:-4], 'D').astype(np.int64)) for n in names]
+
+    def instruments(self):
+        """List the instruments with stored data."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(n for n in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, n)))
+
+    def _load_partition(self, instrument, granularity, day):
+        return np.load(self.partition_path(instrument, granularity, day), mmap_mode='r')
+
+    def write(self, instrument, granularity, df):
+        """
+        Merge market data into the store, deduplicating on timestamp.
+
+        Parameters:
+        - instrument (str): Instrument name.
+        - granularity (str): Candle granularity.
+        - df (pd.DataFrame or np.ndarray): Market data indexed by (or with a column
+          named) 'time', or structured records in the layout of `to_records`.
+
+        Returns:
+        - list of str: Paths of the partitions that were written.
+        """
+        records = df if isinstance(df, np.ndarray) else to_records(df)
+        if len(records) == 0:
+            return []
+        os.makedirs(self._series_dir(instrument, granularity), exist_ok=True)
+
+        days = records['time'] // NS_PER_DAY
+        written = []
+        for day in np.unique(days):
+            new = records[days == day]
+            path = self.partition_path(instrument, granularity, day)
+            if os.path.exists(path):
+                existing = np.load(path)
+                if existing.dtype.names != new.dtype.names:
+                    raise ValueError(f"Columns {new.dtype.names} do not match stored columns {existing.dtype.names}")
+                new = np.concatenate([existing, new.astype(existing.dtype)])
+
+            # Stable sort keeps arrival order within a timestamp; keep the last (newest) row
+            new = new[np.argsort(new['time'], kind='stable')]
+            keep = np.append(new['time'][1:] != new['time'][:-1], True)
+            new = new[keep]
+
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, new)
+            os.replace(tmp_path, path)
+            written.append(path)
+        return written
+
+    def read_array(self, instrument, granularity, start=None, end=None):
+        """
+        Read a time range of a series as a structured array.
+
+        Parameters:
+        - instrument (str): Instrument name.
+        - granularity (str): Candle granularity.
+        - start (optional): Inclusive start time. Defaults to the first stored row.
+        - end (optional): Exclusive end time. Defaults to the last stored row.
+
+        Returns:
+        - np.ndarray: Structured array sorted by 'time'.
+        """
+        start_ns = to_utc_ns(start) if start is not None else None
+        end_ns = to_utc_ns(end) if end is not None else None
+        days = self.days(instrument, granularity)
+        if start_ns is not None:
+            days = [d for d in days if d >= start_ns // NS_PER_DAY]
+        if end_ns is not None:
+            days = [d for d in days if d <= (end_ns - 1) // NS_PER_DAY]
+        if not days:
+            return np.empty(0, dtype=[('time', np.int64)])
+
+        parts = []
+        for day in days:
+            part = self._load_partition(instrument, granularity, day)
+            lo = np.searchsorted(part['time'], start_ns) if start_ns is not None else 0
+            hi = np.searchsorted(part['time'], end_ns) if end_ns is not None else len(part)
+            parts.append(part[lo:hi])
+        return np.concatenate(parts)
+
+    def read(self, instrument, granularity, start=None, end=None):
+        """
+        Read a time range of a series as a DataFrame indexed by UTC time.
+
+        Parameters are as for `read_array`.
+
+        Returns:
+        - pd.DataFrame: Market data indexed by 'time'.
+        """
+        return to_frame(self.read_array(instrument, granularity, start, end))
+
+    def tail(self, instrument, granularity, n):
+        """
+        Read the last `n` rows of a series, touching only the newest partitions.
+
+        Returns:
+        - pd.DataFrame: Market data indexed by 'time'.
+        """
+        parts = []
+        remaining = n
+        for day in reversed(self.days(instrument, granularity)):
+            if remaining <= 0:
+                break
+            part = self._load_partition(instrument, granularity, day)
+            parts.append(part[max(len(part) - remaining, 0):])
+            remaining -= len(part)
+        if not parts:
+            return to_frame(np.empty(0, dtype=[('time', np.int64)]))
+        return to_frame(np.concatenate(parts[::-1]))
+
+    def last_timestamp(self, instrument, granularity):
+        """
+        Return the newest stored timestamp of a series, or None if it is empty.
+        """
+        days = self.days(instrument, granularity)
+        if not days:
+            return None
+        part = self._load_partition(instrument, granularity, days[-1])
+        return pd.Timestamp(int(part['time'][-1]), tz='UTC')
+
+    def series_mtime(self, instrument, granularity):
+        """
+        Return the newest modification time of a series' partitions (0 if empty).
+        """
+        series_dir = self._series_dir(instrument, granularity)
+        if not os.path.isdir(series_dir):
+            return 0
+        with os.scandir(series_dir) as entries:
+            return max((e.stat().st_mtime for e in entries if e.name.endswith('.npy')), default=0)
+
+    def price_array_path(self, instrument, granularity, with_features=True, cache_dir=PRICE_ARRAY_DIR):
+        """
+        Return the file path `load_price_array` exports a series to.
+        """
+        suffix = "_features" if with_features else ""
+        return os.path.join(cache_dir, f"{instrument}_{granularity}{suffix}.npy")
+
+    def load_price_array(self, instrument, granularity, with_features=True, cache_dir=PRICE_ARRAY_DIR):
+        """
+        Memory-map a whole series in the price array format consumed by ForexEnv.
+
+        The array file is exported from the store on first use and re-exported
+        whenever a partition of the series is newer than its last complete
+        export, including after an interrupted one. Every process
+        loading it maps the same file, so they share one copy of the data in
+        the OS page cache instead of each holding a private DataFrame.
+
+        Parameters:
+        - instrument (str): Instrument name.
+        - granularity (str): Candle granularity.
+        - with_features (bool, optional): Include technical-indicator columns. Defaults to True.
+        - cache_dir (str, optional): Directory of exported arrays. Defaults to PRICE_ARRAY_DIR.
+
+        Returns:
+        - PriceArray: Memory-mapped prices and times of the series.
+        """
+        path = self.price_array_path(instrument, granularity, with_features, cache_dir)
+        exported = saved_at(path)
+        if exported is None or exported < self.series_mtime(instrument, granularity):
+            data = self.read(instrument, granularity)
+            if with_features:
+                data = add_features(data)
+            save_price_array(data, path)
+        return load_price_array(path)
+
+def import_csv(csv_path, instrument, granularity, store=None, chunksize=1_000_000):
+    """
+    Import a legacy processed-data CSV into the store.
+
+    Parameters:
+    - csv_path (str): Path to a CSV with a 'time' column.
+    - instrument (str): Instrument name.
+    - granularity (str): Candle granularity.
+    - store (MarketDataStore, optional): Target store. Defaults to MarketDataStore().
+    - chunksize (int, optional): Rows parsed per chunk. Defaults to 1,000,000.
+    """
+    store = store or MarketDataStore()
+    for chunk in pd.read_csv(csv_path, parse_dates=['time'], chunksize=chunksize):
+        store.write(instrument, granularity, chunk)
+
+if __name__ == "__main__":
+    # Usage: python market_data_store.py <csv_path> <instrument> <granularity>
+    if len(sys.argv) != 4:
+        print("Usage: python market_data_store.py <csv_path> <instrument> <granularity>")
+        sys.exit(1)
+    import_csv(sys.argv[1], sys.argv[2], sys.argv[3])
+    print(f"Imported {sys.argv[1]} into {STORE_DIR}/{sys.argv[2]}/{sys.argv[3]}")
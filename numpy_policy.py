@@ -0,0 +1,154 @@
+import sys
+import numpy as np
+
+# Exported policy used by live trading
+POLICY_PATH = "ppo_forex_policy.npz"
+
+_ACTIVATIONS = {
+    'Identity': lambda x: x,
+    'Tanh': np.tanh,
+    'ReLU': lambda x: np.maximum(x, 0),
+    'LeakyReLU': lambda x: np.where(x > 0, x, 0.01 * x),
+    'ELU': lambda x: np.where(x > 0, x, np.expm1(np.minimum(x, 0))),
+}
+
+def export_policy(model, path=POLICY_PATH):
+    """
+    Save the actor of a stable-baselines3 PPO MlpPolicy to a plain NumPy archive.
+
+    Only the layers needed to choose actions are exported: the policy branch
+    of the MLP extractor and the action head. The archive can be loaded by
+    `NumpyPolicy` without torch or stable-baselines3.
+
+    Parameters:
+    - model (PPO or str): Trained model, or the path of a saved one.
+    - path (str, optional): Destination '.npz' path. Defaults to POLICY_PATH.
+    """
+    import torch
+    if isinstance(model, str):
+        from stable_baselines3 import PPO
+        model = PPO.load(model, device='cpu')
+    policy = model.policy
+
+    arrays = {}
+    activations = []
+    for module in policy.mlp_extractor.policy_net:
+        if isinstance(module, torch.nn.Linear):
+            i = len(activations)
+            arrays[f"weight_{i}"] = module.weight.detach().cpu().numpy().T
+            arrays[f"bias_{i}"] = module.bias.detach().cpu().numpy()
+            activations.append('Identity')
+        else:
+            name = type(module).__name__
+            if name not in _ACTIVATIONS or not activations:
+                raise ValueError(f"Unsupported policy layer: {module}")
+            activations[-1] = name
+    arrays['action_weight'] = policy.action_net.weight.detach().cpu().numpy().T
+    arrays['action_bias'] = policy.action_net.bias.detach().cpu().numpy()
+    np.savez(path, activations=np.array(activations), observation_shape=np.array(policy.observation_space.shape), **arrays)
+
+class NumpyPolicy:
+    """
+    Pure-NumPy inference for a PPO MlpPolicy exported by `export_policy`.
+
+    `predict` mirrors PPO.predict for a Box observation space and a Discrete
+    action space: deterministic actions are the argmax of the action logits,
+    computed in float32 like the torch policy.
+    """
+
+    def __init__(self, layers, action_weight, action_bias, observation_shape, seed=None):
+        self.layers = layers
+        self.action_weight = action_weight
+        self.action_bias = action_bias
+        self.observation_shape = tuple(observation_shape)
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def load(cls, path=POLICY_PATH, seed=None):
+        """
+        Load an exported policy.
+
+        Parameters:
+        - path (str, optional): Archive written by `export_policy`. Defaults to POLICY_PATH.
+        - seed (int, optional): Seed for stochastic actions. Defaults to None.
+        """
+        with np.load(path) as archive:
+            layers = [(archive[f"weight_{i}"], archive[f"bias_{i}"], _ACTIVATIONS[str(name)])
+                      for i, name in enumerate(archive['activations'])]
+            return cls(layers, archive['action_weight'], archive['action_bias'], archive['observation_shape'], seed)
+
+    def action_logits(self, obs):
+        """
+        Compute the action logits of a batch of observations.
+
+        Parameters:
+        - obs (np.ndarray): Observations of shape (batch, *observation_shape).
+
+        Returns:
+        - np.ndarray: Logits of shape (batch, actions).
+        """
+        x = np.asarray(obs, dtype=np.float32).reshape(len(obs), -1)
+        for weight, bias, activation in self.layers:
+            x = activation(x @ weight + bias)
+        return x @ self.action_weight + self.action_bias
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=False):
+        """
+        Choose actions, with the same call signature and return value as PPO.predict.
+
+        Parameters:
+        - observation (np.ndarray): One observation or a batch of observations.
+        - deterministic (bool, optional): Take the most likely action instead of sampling.
+
+        Returns:
+        - tuple: (actions, None); a single observation gives a 0-d action array.
+        """
+        observation = np.asarray(observation)
+        single = observation.shape == self.observation_shape
+        logits = self.action_logits(observation[None] if single else observation)
+        if deterministic:
+            actions = logits.argmax(axis=1)
+        else:
+            probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs /= probs.sum(axis=1, keepdims=True)
+            actions = (probs.cumsum(axis=1) < self._rng.random((len(probs), 1))).sum(axis=1)
+        return (actions[0] if single else actions), None
+
+def check_parity(model, policy, observations):
+    """
+    Compare the deterministic actions and logits of an exported policy with PPO.predict.
+
+    Parameters:
+    - model (PPO): Source model.
+    - policy (NumpyPolicy): Its exported counterpart.
+    - observations (np.ndarray): Batch of observations to compare on.
+
+    Returns:
+    - tuple: (fraction of identical actions, largest absolute logit difference)
+    """
+    import torch
+    expected, _ = model.predict(observations, deterministic=True)
+    actions, _ = policy.predict(observations, deterministic=True)
+    with torch.no_grad():
+        obs_tensor, _ = model.policy.obs_to_tensor(observations)
+        latent = model.policy.mlp_extractor.forward_actor(model.policy.extract_features(obs_tensor))
+        logits = model.policy.action_net(latent).cpu().numpy()
+    return float((actions == expected).mean()), float(np.abs(policy.action_logits(observations) - logits).max())
+
+if __name__ == "__main__":
+    # Usage: python numpy_policy.py <model_path> [policy_path]
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python numpy_policy.py <model_path> [policy_path]")
+        sys.exit(1)
+    from stable_baselines3 import PPO
+    model = PPO.load(sys.argv[1], device='cpu')
+    policy_path = sys.argv[2] if len(sys.argv) == 3 else POLICY_PATH
+    export_policy(model, policy_path)
+
+    # Parity check on random observations
+    rng = np.random.default_rng(0)
+    observations = (1 + rng.standard_normal((10000,) + model.observation_space.shape)).astype(np.float32)
+    match, logit_error = check_parity(model, NumpyPolicy.load(policy_path), observations)
+    print(f"Exported policy to {policy_path}: {match:.2%} identical actions, max logit error {logit_error:.2e}")
+    if match < 1:
+        sys.exit(1)
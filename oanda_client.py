@@ -1,37 +1,234 @@
-import oandapyV20
-from oandapyV20 import API
-from oandapyV20.endpoints.orders import OrderCreate
-from oandapyV20.endpoints.trades import TradeClose
-from oandapyV20.endpoints.accounts import AccountDetails
+import os
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utils.latency import LatencyHistogram
+
+# OANDA REST API (override with a local stub, e.g. http://127.0.0.1:8081, for testing)
+OANDA_API_URL = os.getenv("OANDA_API_URL", "https://api-fxpractice.oanda.com")
+OANDA_STREAM_URL = os.getenv("OANDA_STREAM_URL", "https://stream-fxpractice.oanda.com")
+REQUEST_TIMEOUT = 30   # Seconds
+STREAM_TIMEOUT = 20    # Seconds without data (OANDA sends a heartbeat every 5 s) before a stream is considered dead
+POOL_SIZE = 8          # Keep-alive connections per session
+MAX_RETRIES = 5        # Retries per GET request on rate limiting, server errors and dropped connections
+BACKOFF_FACTOR = 0.5   # Exponential backoff base in seconds (0.5, 1, 2, ...)
+
+# Calls whose latency OandaAPI records; 'order_fill' is the round trip of orders that filled
+LATENCY_CALLS = ('place_order', 'order_fill', 'get_open_trades', 'get_account', 'close_trade')
+
+logger = logging.getLogger(__name__)
+
+def create_session(access_token, pool_size=POOL_SIZE):
+    """
+    Create an HTTP session authenticated against the OANDA REST API.
+
+    The session keeps up to `pool_size` keep-alive connections, so it can be
+    shared by that many concurrent requests, and retries rate-limited (429)
+    and failed GET requests with exponential backoff, honouring Retry-After.
+    Orders are never retried, as a resent order could fill twice.
+
+    Parameters:
+    - access_token (str): OANDA API access token.
+    - pool_size (int, optional): Pooled connections. Defaults to POOL_SIZE.
+
+    Returns:
+    - requests.Session: Session reusing its connections across requests.
+    """
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        respect_retry_after_header=True,
+    )
+    # One connection pool each for the REST and the streaming host
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Authorization": f"Bearer {access_token}",
+        "Accept-Datetime-Format": "RFC3339",
+    })
+    return session
 
 class OandaAPI:
-    def __init__(self, access_token, account_id):
-        self.client = API(access_token=access_token)
+    """
+    Synchronous OANDA v3 trading client over a pooled keep-alive session.
+
+    Every call reuses an open connection instead of paying a new TCP and TLS
+    handshake, and its latency is recorded in `latency`, a dict of
+    LatencyHistogram per call name (see LATENCY_CALLS). The client is
+    thread-safe and can be shared by up to `pool_size` concurrent callers.
+    """
+
+    def __init__(self, access_token, account_id, base_url=OANDA_API_URL, pool_size=POOL_SIZE, stream_url=OANDA_STREAM_URL):
+        self.session = create_session(access_token, pool_size)
         self.account_id = account_id
+        self.account_url = f"{base_url}/v3/accounts/{account_id}"
+        self.stream_url = f"{stream_url}/v3/accounts/{account_id}/transactions/stream"
+        self.latency = {name: LatencyHistogram() for name in LATENCY_CALLS}
+        self.last_transaction_id = None  # Newest account transaction seen in a response
+
+    def _request(self, call, method, path, **kwargs):
+        with self.latency[call].time():
+            response = self.session.request(method, self.account_url + path, timeout=REQUEST_TIMEOUT, **kwargs)
+            response.raise_for_status()
+            payload = response.json()
+        self.last_transaction_id = payload.get('lastTransactionID', self.last_transaction_id)
+        return payload
 
     def place_order(self, order_request):
-        r = OrderCreate(accountID=self.account_id, data=order_request)
+        """
+        Submit an order.
+
+        Parameters:
+        - order_request (dict): Order specification, with or without the enclosing {"order": ...}.
+
+        Returns:
+        - dict or None: OANDA's response (with 'orderFillTransaction' if it filled), None on error.
+        """
+        body = order_request if 'order' in order_request else {'order': order_request}
+        start = time.perf_counter()
         try:
-            response = self.client.request(r)
-            return response
-        except Exception as e:
-            print(f"Error placing order: {e}")
+            response = self._request('place_order', 'POST', '/orders', json=body)
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Error placing order: {e}")
             return None
+        if response.get('orderFillTransaction'):
+            self.latency['order_fill'].record(time.perf_counter() - start)
+        return response
+
+    def fetch_open_trades(self):
+        """
+        List the account's open trades, without the rest of the account details.
+
+        Returns:
+        - tuple: (list of open trade dicts, newest first; ID of the last transaction they reflect)
+
+        Raises:
+        - requests.RequestException: If the request fails.
+        """
+        payload = self._request('get_open_trades', 'GET', '/openTrades')
+        return payload.get('trades', []), payload.get('lastTransactionID')
 
     def get_open_trades(self):
-        r = AccountDetails(accountID=self.account_id)
+        """
+        List the account's open trades, like `fetch_open_trades` but empty on error.
+        """
         try:
-            response = self.client.request(r)
-            return response.get('trades', [])
-        except Exception as e:
-            print(f"Error getting open trades: {e}")
+            return self.fetch_open_trades()[0]
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Error getting open trades: {e}")
             return []
 
+    def fetch_account(self):
+        """
+        Fetch the full account details: balance, open trades, positions and pending orders.
+
+        Everything comes from one response, so it is a consistent snapshot.
+
+        Returns:
+        - tuple: (account dict, with its open trades under 'trades'; ID of the last transaction it reflects)
+
+        Raises:
+        - requests.RequestException: If the request fails.
+        """
+        payload = self._request('get_account', 'GET', '')
+        return payload['account'], payload.get('lastTransactionID')
+
+    def stream_transactions(self):
+        """
+        Follow the account's transaction stream.
+
+        Yields every transaction from the time of connection on, in order;
+        heartbeats are dropped. The generator ends or raises when the stream
+        breaks, including after STREAM_TIMEOUT seconds of silence.
+
+        Raises:
+        - requests.RequestException: If the stream can't be opened or breaks.
+        """
+        with self.session.get(self.stream_url, stream=True, timeout=(REQUEST_TIMEOUT, STREAM_TIMEOUT)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    message = json.loads(line)
+                    if message.get('type') != 'HEARTBEAT':
+                        yield message
+
     def close_trade(self, trade_id):
-        r = TradeClose(accountID=self.account_id, tradeID=trade_id)
+        """
+        Close an open trade in full.
+
+        Returns:
+        - dict or None: OANDA's response (with 'orderFillTransaction' if it filled), None on error.
+        """
         try:
-            response = self.client.request(r)
-            return response
-        except Exception as e:
-            print(f"Error closing trade: {e}")
-            return None 
\ No newline at end of file
+            return self._request('close_trade', 'PUT', f"/trades/{trade_id}/close")
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Error closing trade: {e}")
+            return None
+
+    def latency_summary(self):
+        """
+        Returns:
+        - dict: LatencyHistogram.summary() of every call made at least once.
+        """
+        return {name: histogram.summary() for name, histogram in self.latency.items() if histogram.count}
+
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+
+class AsyncOandaAPI:
+    """
+    asyncio front end of OandaAPI.
+
+    Calls run on a thread pool as large as the connection pool, so up to
+    `pool_size` requests are in flight at once without blocking the event
+    loop; each still reuses a keep-alive connection and records its latency
+    in the shared `latency` histograms. Streaming isn't wrapped: follow
+    `api.stream_transactions()` on a thread of its own.
+    """
+
+    def __init__(self, access_token, account_id, base_url=OANDA_API_URL, pool_size=POOL_SIZE, stream_url=OANDA_STREAM_URL):
+        self.api = OandaAPI(access_token, account_id, base_url, pool_size, stream_url)
+        self.latency = self.api.latency
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='oanda')
+
+    async def _call(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    async def place_order(self, order_request):
+        return await self._call(self.api.place_order, order_request)
+
+    async def get_open_trades(self):
+        return await self._call(self.api.get_open_trades)
+
+    async def fetch_open_trades(self):
+        return await self._call(self.api.fetch_open_trades)
+
+    async def fetch_account(self):
+        return await self._call(self.api.fetch_account)
+
+    async def close_trade(self, trade_id):
+        return await self._call(self.api.close_trade, trade_id)
+
+    def latency_summary(self):
+        return self.api.latency_summary()
+
+    def close(self):
+        """Stop the worker threads and close the pooled connections."""
+        self._executor.shutdown(wait=True)
+        self.api.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,402 @@
+"""
+Local stub of the OANDA v3 REST API for testing the data fetchers and the trading client.
+
+Serves deterministic synthetic mid-price candles for any instrument from
+`start` up to a movable `now`; the candle containing `now` is returned as
+incomplete, like the live API. It honours the `from`, `to`, `count` and
+`includeFirst` parameters, counts requests and bytes served and can
+throttle requests with HTTP 429 to exercise client backoff.
+
+It also keeps one account: market orders fill immediately at the current
+mid price of their instrument and open a trade, which can be listed
+(`openTrades`, or the full account details) and closed, by a request or
+server-side with `trigger_close` (as a stop loss would). Every transaction
+is published on the account's transaction stream, with heartbeats in
+between. `delay` adds a fixed server-side processing time to every request.
+
+The pricing stream replays the M1 candles from `replay_start` on as four
+ticks per candle (open, high and low in candle order, close), at
+`replay_rate` ticks per second. All streams share one replay cursor, so a
+reconnecting client continues where the previous stream stopped, as it
+would against live prices.
+
+Usage:
+    python oanda_stub.py [port]
+    OANDA_API_URL=http://127.0.0.1:8081 python fetch_forex_data.py
+"""
+import sys
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+
+DEFAULT_PORT = 8081
+HEARTBEAT_SECONDS = 5   # Interval of stream heartbeats
+REPLAY_SPREAD = 0.0002  # Bid/ask spread of replayed prices
+MAX_CANDLES = 5000
+GRANULARITY_SECONDS = {
+    'S5': 5, 'S10': 10, 'S15': 15, 'S30': 30,
+    'M1': 60, 'M2': 120, 'M4': 240, 'M5': 300, 'M10': 600, 'M15': 900, 'M30': 1800,
+    'H1': 3600, 'H2': 7200, 'H3': 10800, 'H4': 14400, 'H6': 21600, 'H8': 28800, 'H12': 43200,
+    'D': 86400,
+}
+INSTRUMENTS = ["EUR_USD", "GBP_USD", "USD_JPY", "USD_CHF", "AUD_USD", "USD_CAD", "NZD_USD", "EUR_GBP"]
+
+def _parse_time(value):
+    """Parse an RFC3339 or UNIX-seconds time parameter into UTC epoch seconds."""
+    try:
+        return float(value)
+    except ValueError:
+        ts = pd.Timestamp(value)
+        return (ts.tz_convert('UTC') if ts.tzinfo else ts.tz_localize('UTC')).value / 1e9
+
+def _format_time(seconds):
+    return pd.Timestamp(int(seconds), unit='s', tz='UTC').strftime('%Y-%m-%dT%H:%M:%S.000000000Z')
+
+def _candle(instrument, granularity, i):
+    """Deterministic synthetic mid candle number `i` of a series: (open, high, low, close, volume)."""
+    # Per-candle noise is seeded by the series and index so repeated requests agree
+    rng = np.random.default_rng([zlib.crc32(f"{instrument}/{granularity}".encode()), i])
+    mid = 1.1 + 0.01 * np.sin(i / 1440) + 0.0005 * np.sin(i / 37)
+    o, c = mid + rng.normal(0, 0.0002, 2)
+    h = max(o, c) + abs(rng.normal(0, 0.0001))
+    l = min(o, c) - abs(rng.normal(0, 0.0001))
+    return o, h, l, c, int(rng.integers(1, 200))
+
+class CandleStub(ThreadingHTTPServer):
+    """
+    HTTP server holding the stub's clock and request counters.
+
+    Parameters:
+    - port (int, optional): Port to listen on; 0 picks a free port. Defaults to DEFAULT_PORT.
+    - start (str, optional): Time of the first candle of every series.
+    - now (str, optional): Current time of the stub's clock. Defaults to the wall clock.
+    - fail_every (int, optional): Answer every n-th request with HTTP 429. Defaults to 0 (never).
+    - delay (float, optional): Seconds every request is held before answering. Defaults to 0.
+    - heartbeat (float, optional): Seconds between stream heartbeats. Defaults to HEARTBEAT_SECONDS.
+    - replay_start (str, optional): Time of the first replayed candle. Defaults to `start`.
+    - replay_rate (float, optional): Replayed ticks per second. Defaults to 100.
+    """
+    daemon_threads = True
+
+    def __init__(self, port=DEFAULT_PORT, start="2024-01-01", now=None, fail_every=0, delay=0.0,
+                 heartbeat=HEARTBEAT_SECONDS, replay_start=None, replay_rate=100):
+        super().__init__(('127.0.0.1', port), CandleHandler)
+        self.start = pd.Timestamp(start, tz='UTC').value // 10**9
+        self.now = None if now is None else pd.Timestamp(now, tz='UTC').value // 10**9
+        self.fail_every = fail_every
+        self.delay = delay
+        self.heartbeat = heartbeat
+        self.trades = {}            # Open trades of the stub account, by id
+        self.closed_trades = 0
+        self.balance = 10000.0
+        self.transactions = []      # Every transaction, in order; published on the stream
+        self.transaction_id = 0
+        self.stream_generation = 0  # Bumped to disconnect every open stream
+        self.replay_rate = replay_rate
+        self.replay_tick = 0        # Replay cursor: ticks since `replay_start`, per instrument
+        self.replay_first = (pd.Timestamp(replay_start, tz='UTC').value // 10**9 - self.start) // 60 if replay_start else 0
+        self.requests = 0
+        self.throttled = 0
+        self.bytes_sent = 0
+        self.lock = threading.Condition()  # Also notified on each new transaction
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def clock(self):
+        return self.now if self.now is not None else pd.Timestamp.now(tz='UTC').value // 10**9
+
+    def advance(self, seconds):
+        """Move the stub's clock forward, making new candles available."""
+        self.now = self.clock() + seconds
+
+    def candles(self, instrument, granularity, params):
+        step = GRANULARITY_SECONDS[granularity]
+        now = self.clock()
+        count = int(params.get('count', 500))
+        if count > MAX_CANDLES:
+            raise ValueError("Maximum value for 'count' exceeded")
+
+        # Index of the first candle at or after 'from' (or before 'to' when only 'to' is given)
+        if 'from' in params:
+            begin = _parse_time(params['from'])
+            first = max(int(np.ceil((begin - self.start) / step)), 0)
+            if params.get('includeFirst', 'true') == 'false' and self.start + first * step == begin:
+                first += 1
+            last = first + count
+            if 'to' in params:
+                last = int(np.ceil((_parse_time(params['to']) - self.start) / step))
+        else:
+            end = _parse_time(params['to']) if 'to' in params else now
+            last = int(np.ceil((end - self.start) / step))
+            first = max(last - count, 0)
+        last = min(last, (now - self.start) // step + 1)
+
+        candles = []
+        for i in range(first, last):
+            t = self.start + i * step
+            o, h, l, c, volume = _candle(instrument, granularity, i)
+            candles.append({
+                'complete': t + step <= now,
+                'volume': volume,
+                'time': _format_time(t),
+                'mid': {'o': f"{o:.5f}", 'h': f"{h:.5f}", 'l': f"{l:.5f}", 'c': f"{c:.5f}"},
+            })
+        return {'instrument': instrument, 'granularity': granularity, 'candles': candles}
+
+    def replay(self, instruments, tick):
+        """
+        Return the pricing stream messages of replay tick `tick` for every instrument.
+        """
+        bar = self.replay_first + tick // 4
+        messages = []
+        for instrument in instruments:
+            o, h, l, c, _ = _candle(instrument, 'M1', bar)
+            path = (o, h, l, c) if c >= o else (o, l, h, c)
+            mid = path[tick % 4]
+            messages.append({
+                'type': 'PRICE', 'instrument': instrument, 'time': _format_time(self.start + bar * 60 + tick % 4 * 15),
+                'bids': [{'price': f"{mid - REPLAY_SPREAD / 2:.5f}", 'liquidity': 1000000}],
+                'asks': [{'price': f"{mid + REPLAY_SPREAD / 2:.5f}", 'liquidity': 1000000}],
+                'closeoutBid': f"{mid - REPLAY_SPREAD / 2:.5f}", 'closeoutAsk': f"{mid + REPLAY_SPREAD / 2:.5f}",
+                'status': 'tradeable', 'tradeable': True,
+            })
+        return messages
+
+    def price(self, instrument):
+        """Current mid price of an instrument, from the close of its newest M1 candle."""
+        step = GRANULARITY_SECONDS['M1']
+        now = self.clock()
+        candles = self.candles(instrument, 'M1', {'from': now - step, 'count': 1})['candles']
+        return candles[-1]['mid']['c'] if candles else "1.10000"
+
+    def _transaction(self, kind, **fields):
+        # Called with the lock held
+        self.transaction_id += 1
+        transaction = {'id': str(self.transaction_id), 'type': kind, 'time': _format_time(self.clock()), **fields}
+        self.transactions.append(transaction)
+        self.lock.notify_all()
+        return transaction
+
+    def drop_streams(self):
+        """Disconnect every open transaction stream, as a network failure would."""
+        with self.lock:
+            self.stream_generation += 1
+            self.lock.notify_all()
+
+    def shutdown(self):
+        self.drop_streams()
+        super().shutdown()
+
+    def create_order(self, body):
+        order = body.get('order', body)
+        instrument = order['instrument']
+        price = self.price(instrument)
+        with self.lock:
+            create = self._transaction('MARKET_ORDER', instrument=instrument, units=str(order['units']))
+            fill = self._transaction('ORDER_FILL', orderID=create['id'], instrument=instrument,
+                                     units=str(order['units']), price=price, pl="0.0000",
+                                     accountBalance=f"{self.balance:.4f}")
+            fill['tradeOpened'] = {'tradeID': fill['id'], 'units': str(order['units'])}
+            self.trades[fill['id']] = {
+                'id': fill['id'], 'instrument': instrument, 'price': price, 'openTime': fill['time'],
+                'initialUnits': str(order['units']), 'currentUnits': str(order['units']), 'state': 'OPEN',
+                'unrealizedPL': "0.0000",
+            }
+            return 201, {'orderCreateTransaction': create, 'orderFillTransaction': fill,
+                         'lastTransactionID': fill['id']}
+
+    def close(self, trade_id, reason='MARKET_ORDER_TRADE_CLOSE'):
+        with self.lock:
+            trade = self.trades.pop(trade_id, None)
+            if trade is None:
+                return 404, {'errorMessage': "The Trade specified does not exist"}
+            self.closed_trades += 1
+        price = self.price(trade['instrument'])
+        units = float(trade['currentUnits'])
+        pl = (float(price) - float(trade['price'])) * units
+        with self.lock:
+            self.balance += pl
+            fill = self._transaction('ORDER_FILL', instrument=trade['instrument'], units=f"{-units:g}", price=price,
+                                     reason=reason, pl=f"{pl:.4f}", accountBalance=f"{self.balance:.4f}",
+                                     tradesClosed=[{'tradeID': trade_id, 'units': f"{-units:g}", 'realizedPL': f"{pl:.4f}"}])
+            return 200, {'orderFillTransaction': fill, 'lastTransactionID': fill['id']}
+
+    def trigger_close(self, trade_id):
+        """Close a trade server-side, as its stop loss would, without a client request."""
+        return self.close(trade_id, reason='STOP_LOSS_ORDER')[0] == 200
+
+    def open_trades(self):
+        with self.lock:
+            trades = sorted(self.trades.values(), key=lambda t: -int(t['id']))
+            return {'trades': trades, 'lastTransactionID': str(self.transaction_id)}
+
+    def summary(self, account_id):
+        with self.lock:
+            return {'account': {'id': account_id, 'currency': 'USD', 'balance': f"{self.balance:.4f}",
+                                'NAV': f"{self.balance:.4f}", 'openTradeCount': len(self.trades),
+                                'lastTransactionID': str(self.transaction_id)},
+                    'lastTransactionID': str(self.transaction_id)}
+
+    def account(self, account_id):
+        # The full account details, which also list every position and pending order
+        payload = self.open_trades()
+        positions = [{'instrument': instrument, 'pl': "0.0000", 'unrealizedPL': "0.0000",
+                      'long': {'units': "0", 'pl': "0.0000", 'resettablePL': "0.0000", 'financing': "0.0000"},
+                      'short': {'units': "0", 'pl': "0.0000", 'resettablePL': "0.0000", 'financing': "0.0000"}}
+                     for instrument in INSTRUMENTS]
+        orders = [{'id': str(i), 'type': 'TAKE_PROFIT', 'state': 'PENDING', 'price': "1.20000"} for i in range(50)]
+        summary = self.summary(account_id)['account']
+        return {'account': {'id': account_id, 'currency': 'USD', 'balance': summary['balance'], 'NAV': summary['NAV'],
+                            'openTradeCount': len(payload['trades']), 'trades': payload['trades'],
+                            'positions': positions, 'orders': orders},
+                'lastTransactionID': payload['lastTransactionID']}
+
+class CandleHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API
+    disable_nagle_algorithm = True  # Headers and body are sent separately; don't hold the body for an ACK
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def _route(self, method, parts, params):
+        server = self.server
+        if method == 'GET' and len(parts) == 4 and parts[:2] == ['v3', 'instruments'] and parts[3] == 'candles':
+            return 200, server.candles(parts[2], params.get('granularity', 'S5'), params)
+        if len(parts) < 3 or parts[:2] != ['v3', 'accounts']:
+            return 404, {'errorMessage': "Not found"}
+        route = (method,) + tuple(parts[3:4]) + tuple(parts[5:])
+        if route == ('GET',):
+            return 200, server.account(parts[2])
+        if route == ('GET', 'summary'):
+            return 200, server.summary(parts[2])
+        if route == ('GET', 'openTrades'):
+            return 200, server.open_trades()
+        if route == ('POST', 'orders'):
+            length = int(self.headers.get('Content-Length', 0))
+            return server.create_order(json.loads(self.rfile.read(length)))
+        if route == ('PUT', 'trades', 'close') and len(parts) == 6:
+            return server.close(parts[4])
+        return 404, {'errorMessage': "Not found"}
+
+    def _handle(self, method):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            throttled = server.fail_every and server.requests % server.fail_every == 0
+            server.throttled += bool(throttled)
+        if server.delay:
+            time.sleep(server.delay)
+
+        url = urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if not throttled and method == 'GET' and parts[:2] == ['v3', 'accounts'] and parts[3:] == ['transactions', 'stream']:
+            return self._stream(self._transactions)
+        if not throttled and method == 'GET' and parts[:2] == ['v3', 'accounts'] and parts[3:] == ['pricing', 'stream']:
+            return self._stream(self._prices, params['instruments'].split(','))
+        if throttled:
+            status, payload = 429, {'errorMessage': "Requests per second exceeded"}
+        else:
+            try:
+                status, payload = self._route(method, parts, params)
+            except (KeyError, ValueError) as e:
+                status, payload = 400, {'errorMessage': str(e)}
+
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.end_headers()
+        self.wfile.write(body)
+        with server.lock:
+            server.bytes_sent += len(body)
+
+    def _stream(self, messages, *args):
+        # Newline-delimited JSON over chunked encoding, like the real streaming API
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for batch in messages(*args):
+                data = ''.join(json.dumps(m) + '\n' for m in batch).encode()
+                self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _heartbeat(self):
+        server = self.server
+        return {'type': 'HEARTBEAT', 'lastTransactionID': str(server.transaction_id), 'time': _format_time(server.clock())}
+
+    def _transactions(self):
+        # Yields batches of new transactions, or a heartbeat after `heartbeat` idle seconds
+        server = self.server
+        with server.lock:
+            sent = len(server.transactions)
+            generation = server.stream_generation
+        while True:
+            with server.lock:
+                server.lock.wait_for(lambda: len(server.transactions) > sent or server.stream_generation != generation,
+                                     timeout=server.heartbeat)
+                if server.stream_generation != generation:
+                    return
+                messages = server.transactions[sent:]
+                heartbeat = self._heartbeat()
+            sent += len(messages)
+            yield messages or [heartbeat]
+
+    def _prices(self, instruments):
+        # Yields the replayed prices at `replay_rate` ticks per second, with heartbeats in between
+        server = self.server
+        with server.lock:
+            generation = server.stream_generation
+        last_heartbeat = time.monotonic()
+        while True:
+            with server.lock:
+                if server.lock.wait_for(lambda: server.stream_generation != generation, timeout=1 / server.replay_rate):
+                    return
+                tick = server.replay_tick
+                server.replay_tick += 1
+            batch = server.replay(instruments, tick)
+            if time.monotonic() - last_heartbeat >= server.heartbeat:
+                batch.append({'type': 'HEARTBEAT', 'time': batch[-1]['time']})
+                last_heartbeat = time.monotonic()
+            yield batch
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(port=DEFAULT_PORT, **kwargs):
+    """
+    Start a stub server on a background thread.
+
+    Returns:
+    - CandleStub: The running server; call `shutdown()` to stop it.
+    """
+    server = CandleStub(port, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    server = CandleStub(port)
+    print(f"OANDA API stub listening on {server.url}")
+    server.serve_forever()
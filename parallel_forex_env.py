@@ -0,0 +1,229 @@
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+from forex_env import WINDOW_SIZE
+from price_array import PriceArray, load_price_array
+from vec_forex_env import VecForexEnv, stack_price_arrays
+
+def _attach_prices(shm_name, shape, columns, segment_lengths):
+    """
+    Attach to the price array shared by the parent process.
+
+    `shm_name` names either a shared-memory segment or, when `shape` is None,
+    a price array file to memory-map.
+
+    Returns:
+    - tuple: (SharedMemory handle or None, PriceArray viewing the shared data)
+    """
+    if shape is None:
+        price_array = load_price_array(shm_name)
+        return None, PriceArray(price_array.prices, columns, segment_lengths)
+    # Workers share the parent's resource tracker, which unlinks the segment if the parent dies
+    shm = shared_memory.SharedMemory(name=shm_name)
+    prices = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+    prices.flags.writeable = False
+    return shm, PriceArray(prices, columns, segment_lengths)
+
+def _worker(remote, parent_remote, price_spec, num_envs, window_size, seed, env_kwargs):
+    """
+    Run a VecForexEnv slice in a subprocess, serving commands sent over `remote`.
+    """
+    parent_remote.close()
+    shm, price_array = _attach_prices(*price_spec)
+    env = VecForexEnv(price_array, num_envs=num_envs, window_size=window_size, seed=seed, **env_kwargs)
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == 'step':
+                remote.send(env.step(data))
+            elif cmd == 'reset':
+                if data is not None:
+                    env.seed(data)
+                remote.send(env.reset())
+            elif cmd == 'get_attr':
+                remote.send(env.get_attr(*data))
+            elif cmd == 'set_attr':
+                remote.send(env.set_attr(*data))
+            elif cmd == 'env_method':
+                method_name, args, kwargs, indices = data
+                remote.send(env.env_method(method_name, *args, indices=indices, **kwargs))
+            elif cmd == 'close':
+                break
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del env, price_array
+        if shm is not None:
+            shm.close()
+        remote.close()
+
+class SubprocForexVecEnv(VecEnv):
+    """
+    VecForexEnv split across a pool of worker processes.
+
+    The stacked price array is copied once into shared memory and every worker
+    attaches to it by name, so market data is never pickled per worker. A
+    price array memory-mapped from a file is instead re-mapped by each worker,
+    sharing the OS page cache without any copy. Each worker steps a contiguous
+    slice of the episodes with its own VecForexEnv.
+
+    Seeding is deterministic: the episode start offsets of worker k are drawn
+    from the k-th child of `np.random.SeedSequence(seed)`, so a run is
+    reproducible for a given seed, `num_envs` and `workers`.
+    """
+
+    def __init__(self, historical_data, num_envs=8, workers=None, window_size=WINDOW_SIZE, seed=None, start_method=None, **env_kwargs):
+        """
+        Parameters:
+        - historical_data (pd.DataFrame, dict or PriceArray): Market data, a
+          mapping of instrument name to market data with identical numeric
+          columns, or a PriceArray (e.g. memory-mapped by `load_price_array`).
+        - num_envs (int, optional): Total number of parallel episodes. Defaults to 8.
+        - workers (int, optional): Number of worker processes. Defaults to the
+          number of CPU cores, capped at `num_envs`.
+        - window_size (int, optional): Bars per observation. Defaults to WINDOW_SIZE.
+        - seed (int, optional): Base seed for episode start offsets. Defaults to None.
+        - start_method (str, optional): Multiprocessing start method. Defaults to
+          'forkserver' where available, otherwise 'spawn'.
+        - env_kwargs: Simulated order parameters passed to each VecForexEnv.
+        """
+        workers = min(workers or mp.cpu_count(), num_envs)
+        price_array = stack_price_arrays(historical_data, window_size)
+
+        prices = price_array.prices
+        if isinstance(prices, np.memmap) and prices.filename and prices.offset + prices.nbytes == os.path.getsize(prices.filename):
+            # Whole price file: workers map it themselves
+            self._shm = None
+            price_spec = (prices.filename, None, price_array.columns, price_array.segment_lengths)
+        else:
+            self._shm = shared_memory.SharedMemory(create=True, size=max(prices.nbytes, 1))
+            shared_prices = np.ndarray(prices.shape, dtype=np.float32, buffer=self._shm.buf)
+            shared_prices[:] = prices
+            price_spec = (self._shm.name, prices.shape, price_array.columns, price_array.segment_lengths)
+
+        # Contiguous slices of episodes per worker
+        self._slices = np.array_split(np.arange(num_envs), workers)
+        self._offsets = [int(s[0]) for s in self._slices]
+        worker_seeds = np.random.SeedSequence(seed).spawn(workers)
+
+        if start_method is None:
+            start_method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+        ctx = mp.get_context(start_method)
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(workers)])
+        self.processes = []
+        for work_remote, remote, env_slice, worker_seed in zip(self.work_remotes, self.remotes, self._slices, worker_seeds):
+            args = (work_remote, remote, price_spec, len(env_slice), window_size, worker_seed, env_kwargs)
+            process = ctx.Process(target=_worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        self.window_size = window_size
+        self.columns = price_array.columns
+        self.waiting = False
+        self.closed = False
+
+        probe = VecForexEnv(price_array, num_envs=1, window_size=window_size)
+        self.render_mode = None
+        super().__init__(num_envs, probe.observation_space, probe.action_space)
+
+    def reset(self):
+        for remote, offset in zip(self.remotes, self._offsets):
+            remote.send(('reset', self._seeds[offset]))
+        obs = np.concatenate([remote.recv() for remote in self.remotes])
+        self._reset_seeds()
+        return obs
+
+    def step_async(self, actions):
+        actions = np.asarray(actions)
+        for remote, env_slice in zip(self.remotes, self._slices):
+            remote.send(('step', actions[env_slice]))
+        self.waiting = True
+
+    def step_wait(self):
+        results = [remote.recv() for remote in self.remotes]
+        self.waiting = False
+        obs, rewards, dones, infos = zip(*results)
+        return np.concatenate(obs), np.concatenate(rewards), np.concatenate(dones), [i for worker_infos in infos for i in worker_infos]
+
+    def close(self):
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv()
+        for remote in self.remotes:
+            remote.send(('close', None))
+        for process in self.processes:
+            process.join()
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+        self.closed = True
+
+    def _worker_indices(self, indices):
+        """
+        Group global environment indices by worker.
+
+        Returns:
+        - list: (remote, local indices) pairs for every worker with selected environments.
+        """
+        selected = set(self._get_indices(indices))
+        groups = []
+        for remote, env_slice, offset in zip(self.remotes, self._slices, self._offsets):
+            local = [int(i) - offset for i in env_slice if int(i) in selected]
+            if local:
+                groups.append((remote, local))
+        return groups
+
+    def get_attr(self, attr_name, indices=None):
+        groups = self._worker_indices(indices)
+        for remote, local in groups:
+            remote.send(('get_attr', (attr_name, local)))
+        return [value for remote, _ in groups for value in remote.recv()]
+
+    def set_attr(self, attr_name, value, indices=None):
+        groups = self._worker_indices(indices)
+        for remote, local in groups:
+            remote.send(('set_attr', (attr_name, value, local)))
+        for remote, _ in groups:
+            remote.recv()
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        # A worker's VecForexEnv runs a method for all of its environments at once
+        groups = self._worker_indices(indices)
+        sizes = {remote: len(env_slice) for remote, env_slice in zip(self.remotes, self._slices)}
+        if any(len(local) != sizes[remote] for remote, local in groups):
+            raise ValueError(f"{method_name} acts on every environment of a worker; call env_method with indices "
+                             f"covering whole workers, or indices=None")
+        for remote, local in groups:
+            remote.send(('env_method', (method_name, method_args, method_kwargs, local)))
+        return [value for remote, _ in groups for value in remote.recv()]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
+
+def make_forex_vec_env(historical_data, num_envs=8, workers=1, window_size=WINDOW_SIZE, seed=None, **env_kwargs):
+    """
+    Create the vectorized training environment for the requested parallelism.
+
+    Parameters:
+    - historical_data (pd.DataFrame or dict): Market data for the episodes.
+    - num_envs (int, optional): Total number of parallel episodes. Defaults to 8.
+    - workers (int, optional): Worker processes; 1 steps every episode in this
+      process, 0 uses every CPU core. Defaults to 1.
+    - window_size (int, optional): Bars per observation. Defaults to WINDOW_SIZE.
+    - seed (int, optional): Seed for episode start offsets. Defaults to None.
+    - env_kwargs: Simulated order parameters passed to VecForexEnv.
+
+    Returns:
+    - VecEnv: A VecForexEnv or SubprocForexVecEnv.
+    """
+    if workers == 1:
+        return VecForexEnv(historical_data, num_envs=num_envs, window_size=window_size, seed=seed, **env_kwargs)
+    return SubprocForexVecEnv(historical_data, num_envs=num_envs, workers=workers or None, window_size=window_size, seed=seed, **env_kwargs)
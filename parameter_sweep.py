@@ -0,0 +1,227 @@
+import os
+import csv
+import argparse
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from backtest_engine import BacktestEngine, summarize
+from market_data_store import MarketDataStore
+from price_array import load_price_array
+from trading_strategy import should_enter_trade, should_exit_trade
+
+# Series to evaluate
+INSTRUMENT = "EUR_USD"
+GRANULARITY = "M1"
+
+# Default parameter grid (stop loss and take profit in price units from the fill)
+STOP_LOSS_GRID = [0.0005, 0.001, 0.002]
+TAKE_PROFIT_GRID = [0.001, 0.002, 0.004]
+RISK_PERCENTAGE_GRID = [0.01, 0.02, 0.03]
+ACCOUNT_BALANCE = 10000       # Balance that risk_percentage is taken of
+
+# Walk-forward windows, in bars
+TRAIN_BARS = 30 * 1440        # 30 days of M1 bars
+TEST_BARS = 7 * 1440          # 7 days of M1 bars
+
+RESULTS_PATH = "sweep_results.csv"
+PARAMETERS = ['stop_loss', 'take_profit', 'risk_percentage']
+METRICS = ['trades', 'total_pnl', 'win_rate', 'max_drawdown']
+RESULT_COLUMNS = (['instrument', 'granularity', 'fold', 'train_start', 'test_start', 'test_end'] + PARAMETERS
+                  + [f"{phase}_{m}" for phase in ('train', 'test') for m in METRICS])
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def position_units(account_balance, risk_percentage, stop_loss):
+    """
+    Size a position so that hitting the stop loss loses `risk_percentage` of the balance.
+    """
+    return account_balance * risk_percentage / stop_loss
+
+def parameter_grid(stop_loss=STOP_LOSS_GRID, take_profit=TAKE_PROFIT_GRID, risk_percentage=RISK_PERCENTAGE_GRID):
+    """
+    Return every combination of the given parameter values as a list of dicts.
+    """
+    return [dict(zip(PARAMETERS, values)) for values in itertools.product(stop_loss, take_profit, risk_percentage)]
+
+def walk_forward_windows(bars, train_bars=TRAIN_BARS, test_bars=TEST_BARS):
+    """
+    Split `bars` rows into rolling walk-forward folds.
+
+    Each fold trains on `train_bars` rows and tests on the `test_bars` rows
+    that follow; consecutive folds are `test_bars` apart, so the test windows
+    tile the history after the first training window.
+
+    Returns:
+    - list of tuple: (train_start, test_start, test_end) row indices per fold.
+    """
+    return [(start, start + train_bars, start + train_bars + test_bars)
+            for start in range(0, bars - train_bars - test_bars + 1, test_bars)]
+
+# Per-process state of the sweep workers
+_price_array = None
+_engines = {}
+
+def _init_worker(price_path):
+    global _price_array
+    _price_array = load_price_array(price_path)
+
+def _engine(start, end):
+    # Workers keep one engine per window, so its entry signals are computed once for the whole grid
+    key = (start, end)
+    if key not in _engines:
+        prices = _price_array.prices[start:end]
+        _engines[key] = BacktestEngine({name: prices[:, i] for i, name in enumerate(_price_array.columns)})
+    return _engines[key]
+
+def evaluate(window, params):
+    """
+    Backtest one parameter set on one walk-forward fold (runs in a worker).
+
+    Parameters:
+    - window (tuple): (train_start, test_start, test_end) row indices.
+    - params (dict): Values of PARAMETERS.
+
+    Returns:
+    - dict: Train and test metrics, keyed as in RESULT_COLUMNS.
+    """
+    units = position_units(ACCOUNT_BALANCE, params['risk_percentage'], params['stop_loss'])
+    row = {}
+    for phase, (start, end) in (('train', window[:2]), ('test', window[1:])):
+        trades = _engine(start, end).run(should_enter_trade, should_exit_trade, stop_loss=params['stop_loss'],
+                                         take_profit=params['take_profit'], units=units)
+        metrics = summarize(trades)
+        row.update({f"{phase}_{m}": metrics[m] for m in METRICS})
+    return row
+
+def _task_key(row):
+    return ((row['instrument'], row['granularity'], row['train_start'], row['test_end'])
+            + tuple(repr(float(row[p])) for p in PARAMETERS))
+
+def load_results(results_path=RESULTS_PATH):
+    """
+    Read the rows a previous (possibly interrupted) sweep already wrote.
+
+    A sweep killed while writing leaves a partial last line; it is cut from
+    the file so the next rows are appended after the last complete one.
+    Rows with missing or extra fields are skipped (their tasks run again).
+
+    Raises:
+    - ValueError: If the file's columns aren't RESULT_COLUMNS (e.g. it was written by an older version).
+    """
+    if not os.path.exists(results_path):
+        return []
+    with open(results_path, 'r+b') as f:
+        data = f.read()
+        complete = data.rfind(b'\n') + 1
+        if complete < len(data):
+            logging.warning(f"Dropping a partial last line from {results_path}.")
+            f.truncate(complete)
+    with open(results_path, newline='') as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is not None and reader.fieldnames != RESULT_COLUMNS:
+            raise ValueError(f"{results_path} has columns {reader.fieldnames}, expected {RESULT_COLUMNS}; "
+                             f"pass another results file.")
+        return [row for row in reader if None not in row and None not in row.values()]
+
+def run_sweep(price_path, grid, windows, results_path=RESULTS_PATH, workers=0,
+              instrument=INSTRUMENT, granularity=GRANULARITY):
+    """
+    Evaluate every parameter set on every walk-forward fold on a process pool.
+
+    Workers memory-map the price array, so they share one read-only copy of
+    the data. Each result is appended to `results_path` as soon as it
+    completes; rerunning an interrupted sweep skips the rows already there.
+    Rows are labelled with the instrument and granularity, so sweeps of
+    several series can share one results file.
+
+    Parameters:
+    - price_path (str): Price array file saved by `save_price_array`.
+    - grid (list of dict): Parameter sets, e.g. from `parameter_grid`.
+    - windows (list of tuple): Folds from `walk_forward_windows`.
+    - results_path (str, optional): CSV results table. Defaults to RESULTS_PATH.
+    - workers (int, optional): Worker processes, 0 for all cores. Defaults to 0.
+    - instrument (str, optional): Instrument the price array holds. Defaults to INSTRUMENT.
+    - granularity (str, optional): Granularity of the price array. Defaults to GRANULARITY.
+
+    Returns:
+    - pd.DataFrame: The full results table, every series included.
+    """
+    times = pd.DatetimeIndex(load_price_array(price_path).times.astype('datetime64[ns]')).tz_localize('UTC')
+    done = {_task_key(row) for row in load_results(results_path)}
+
+    tasks = []
+    for fold, (train_start, test_start, test_end) in enumerate(windows):
+        labels = {
+            'instrument': instrument,
+            'granularity': granularity,
+            'fold': fold,
+            'train_start': times[train_start].isoformat(),
+            'test_start': times[test_start].isoformat(),
+            'test_end': times[test_end - 1].isoformat(),
+        }
+        for params in grid:
+            row = {**labels, **params}
+            if _task_key(row) not in done:
+                tasks.append(((train_start, test_start, test_end), row))
+    logging.info(f"{len(tasks)} of {len(windows) * len(grid)} evaluations left to run.")
+
+    write_header = not os.path.exists(results_path) or os.path.getsize(results_path) == 0
+    with open(results_path, 'a', newline='') as f, \
+            ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                                initargs=(price_path,)) as executor:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        if write_header:
+            writer.writeheader()
+        futures = {executor.submit(evaluate, window, {p: row[p] for p in PARAMETERS}): row for window, row in tasks}
+        for completed, future in enumerate(as_completed(futures), 1):
+            writer.writerow({**futures[future], **future.result()})
+            f.flush()
+            if completed % 100 == 0:
+                logging.info(f"Completed {completed}/{len(tasks)} evaluations.")
+    return pd.read_csv(results_path)
+
+def select_walk_forward(results, instrument=INSTRUMENT, granularity=GRANULARITY, metric='train_total_pnl'):
+    """
+    Pick the best parameter set of each fold of one series on its training window.
+
+    Returns:
+    - pd.DataFrame: One row per fold with the chosen parameters and their
+      out-of-sample test metrics.
+    """
+    results = results[(results['instrument'] == instrument) & (results['granularity'] == granularity)]
+    best = results.loc[results.groupby('fold')[metric].idxmax()]
+    return best[['fold', 'test_start', 'test_end'] + PARAMETERS + [f"test_{m}" for m in METRICS]].reset_index(drop=True)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Walk-forward parameter sweep of the rule-based strategy.")
+    parser.add_argument('--instrument', default=INSTRUMENT, help="Instrument to evaluate")
+    parser.add_argument('--granularity', default=GRANULARITY, help="Candle granularity")
+    parser.add_argument('--stop-loss', type=float, nargs='+', default=STOP_LOSS_GRID, help="Stop loss distances")
+    parser.add_argument('--take-profit', type=float, nargs='+', default=TAKE_PROFIT_GRID, help="Take profit distances")
+    parser.add_argument('--risk', type=float, nargs='+', default=RISK_PERCENTAGE_GRID, help="Risk per trade (fraction of balance)")
+    parser.add_argument('--train-bars', type=int, default=TRAIN_BARS, help="Bars per training window")
+    parser.add_argument('--test-bars', type=int, default=TEST_BARS, help="Bars per test window")
+    parser.add_argument('--workers', type=int, default=0, help="Worker processes, 0 for all cores")
+    parser.add_argument('--results', default=RESULTS_PATH, help="Results CSV, resumed if it exists")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    store = MarketDataStore()
+    price_array = store.load_price_array(args.instrument, args.granularity, with_features=False)
+    price_path = store.price_array_path(args.instrument, args.granularity, with_features=False)
+
+    windows = walk_forward_windows(len(price_array.prices), args.train_bars, args.test_bars)
+    if not windows:
+        logging.error(f"Not enough {args.instrument} {args.granularity} data for one walk-forward fold.")
+        return
+    grid = parameter_grid(args.stop_loss, args.take_profit, args.risk)
+
+    results = run_sweep(price_path, grid, windows, args.results, args.workers, args.instrument, args.granularity)
+    selected = select_walk_forward(results, args.instrument, args.granularity)
+    print(selected.to_string(index=False))
+    print(f"Walk-forward out-of-sample PnL: {selected['test_total_pnl'].sum():.2f}")
+
+if __name__ == "__main__":
+    main()
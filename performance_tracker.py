@@ -1,22 +1,233 @@
-class PerformanceTracker:
+import math
+import time
+from collections import deque
+
+WINDOW_TRADES = 100        # Trades in the rolling trade-count window
+WINDOW_SECONDS = 3600      # Seconds in the rolling time window
+TRADE_HISTORY = 1000       # Recent trade results kept in `trades`; None keeps all
+
+class RunningStats:
+    """
+    Running sums of trade results from which the metrics are computed in O(1).
+
+    Results can be removed as well as added, for rolling windows.
+    """
+    __slots__ = ('count', 'wins', 'gross_profit', 'gross_loss', 'sum_sq', 'down_sq')
+
     def __init__(self):
-        self.trades = []
-        self.total_profit = 0
-        self.total_loss = 0
+        self.reset()
 
-    def log_trade(self, profit):
-        self.trades.append(profit)
+    def reset(self):
+        self.count = self.wins = 0
+        self.gross_profit = self.gross_loss = self.sum_sq = self.down_sq = 0.0
+
+    def add(self, profit):
+        self.count += 1
+        self.sum_sq += profit * profit
+        if profit > 0:
+            self.wins += 1
+            self.gross_profit += profit
+        else:
+            self.gross_loss += profit
+            self.down_sq += profit * profit
+
+    def remove(self, profit):
+        self.count -= 1
+        self.sum_sq -= profit * profit
         if profit > 0:
-            self.total_profit += profit
+            self.wins -= 1
+            self.gross_profit -= profit
         else:
-            self.total_loss += profit
+            self.gross_loss -= profit
+            self.down_sq -= profit * profit
 
-    def calculate_metrics(self):
-        win_rate = sum(1 for p in self.trades if p > 0) / len(self.trades) if self.trades else 0
-        average_profit = self.total_profit / len(self.trades) if self.trades else 0
-        average_loss = self.total_loss / len(self.trades) if self.trades else 0
+    def metrics(self, max_drawdown):
+        """
+        Compute the metrics of the results added.
+
+        Parameters:
+        - max_drawdown (float): Largest peak-to-trough fall of cumulative profit, tracked by the caller.
+
+        Returns:
+        - dict: 'trades', 'win_rate', 'average_profit' and 'average_loss' (gross profit and loss per
+          trade), 'total_pnl', 'profit_factor', per-trade 'sharpe' and 'sortino' ratios, and 'max_drawdown'.
+        """
+        n = self.count
+        if n == 0:
+            return {"trades": 0, "win_rate": 0, "average_profit": 0, "average_loss": 0, "total_pnl": 0.0,
+                    "profit_factor": 0.0, "sharpe": 0.0, "sortino": 0.0, "max_drawdown": 0.0}
+        total = self.gross_profit + self.gross_loss
+        mean = total / n
+        variance = max(self.sum_sq - total * mean, 0.0) / (n - 1) if n > 1 else 0.0
+        downside = math.sqrt(max(self.down_sq, 0.0) / n)
+        if self.gross_loss < 0:
+            profit_factor = self.gross_profit / -self.gross_loss
+        else:
+            profit_factor = math.inf if self.gross_profit > 0 else 0.0
         return {
-            "win_rate": win_rate,
-            "average_profit": average_profit,
-            "average_loss": average_loss
-        } 
\ No newline at end of file
+            "trades": n,
+            "win_rate": self.wins / n,
+            "average_profit": self.gross_profit / n,
+            "average_loss": self.gross_loss / n,
+            "total_pnl": total,
+            "profit_factor": profit_factor,
+            "sharpe": mean / math.sqrt(variance) if variance > 0 else 0.0,
+            "sortino": mean / downside if downside > 0 else 0.0,
+            "max_drawdown": max_drawdown,
+        }
+
+# Drawdown summary of a run of consecutive trades, relative to the equity before it:
+# (total profit, highest equity, lowest equity, max drawdown), the extremes including the start.
+NO_TRADES = (0.0, 0.0, 0.0, 0.0)
+
+def combine_drawdown(a, b):
+    """Drawdown summary of run `a` followed by run `b`."""
+    total_a, high_a, low_a, drawdown_a = a
+    total_b, high_b, low_b, drawdown_b = b
+    return (total_a + total_b, max(high_a, total_a + high_b), min(low_a, total_a + low_b),
+            max(drawdown_a, drawdown_b, high_a - total_a - low_b))
+
+def trade_drawdown(profit):
+    return (profit, profit if profit > 0 else 0.0, profit if profit < 0 else 0.0, -profit if profit < 0 else 0.0)
+
+class DrawdownWindow:
+    """
+    Metrics of the last `max_trades` trades and/or the trades of the last `max_seconds`.
+
+    Adding a trade and evicting old ones is amortized O(1). The sums are
+    updated on both, and recomputed from the window after as many evictions
+    as it holds trades so rounding errors can't accumulate. The max
+    drawdown, which can't be un-done on eviction, is aggregated with two
+    stacks: new trades are pushed on the back stack, whose summary is kept
+    up to date, and evictions pop from the front stack, refilled from the
+    back one with the summary of each trade and the newer trades after it in
+    the front stack.
+    """
+
+    def __init__(self, max_trades=None, max_seconds=None):
+        self.max_trades = max_trades
+        self.max_seconds = max_seconds
+        self.stats = RunningStats()
+        self._trades = deque()       # (time, profit), oldest first
+        self._evictions = 0
+        self._back = []              # Newest trades' drawdown summaries
+        self._back_summary = NO_TRADES
+        self._front = []             # Summaries from each trade to the newest of the stack, oldest trade last
+
+    def __len__(self):
+        return len(self._trades)
+
+    def add(self, profit, timestamp):
+        self._trades.append((timestamp, profit))
+        self.stats.add(profit)
+        summary = trade_drawdown(profit)
+        self._back.append(summary)
+        self._back_summary = combine_drawdown(self._back_summary, summary)
+        self.evict(timestamp)
+
+    def evict(self, now):
+        """Drop the trades outside the window ending at `now`."""
+        trades = self._trades
+        while trades and ((self.max_trades is not None and len(trades) > self.max_trades) or
+                          (self.max_seconds is not None and trades[0][0] <= now - self.max_seconds)):
+            _, profit = trades.popleft()
+            self.stats.remove(profit)
+            if not self._front:
+                summary = NO_TRADES
+                for trade_summary in reversed(self._back):
+                    summary = combine_drawdown(trade_summary, summary)
+                    self._front.append(summary)
+                self._back.clear()
+                self._back_summary = NO_TRADES
+            self._front.pop()
+            self._evictions += 1
+            if self._evictions >= len(trades):
+                self._evictions = 0
+                self.stats.reset()
+                for _, profit in trades:
+                    self.stats.add(profit)
+
+    def max_drawdown(self):
+        front = self._front[-1] if self._front else NO_TRADES
+        return combine_drawdown(front, self._back_summary)[3]
+
+    def metrics(self):
+        return self.stats.metrics(self.max_drawdown())
+
+class PerformanceTracker:
+    """
+    Streaming trade performance metrics.
+
+    Each logged trade updates running all-time sums and two rolling windows
+    (the last `window_trades` trades and the trades of the last
+    `window_seconds`), so logging a trade and computing the metrics cost
+    O(1) whatever the number of trades. Only the last `history` results are
+    kept in `trades`; the windows keep the trades they cover.
+    """
+
+    def __init__(self, window_trades=WINDOW_TRADES, window_seconds=WINDOW_SECONDS, history=TRADE_HISTORY):
+        """
+        Parameters:
+        - window_trades (int, optional): Trades in the trade-count window. Defaults to WINDOW_TRADES.
+        - window_seconds (float, optional): Seconds in the time window. Defaults to WINDOW_SECONDS.
+        - history (int, optional): Recent results kept in `trades` (None for all). Defaults to TRADE_HISTORY.
+        """
+        self.trades = deque(maxlen=history)
+        self.all_time = RunningStats()
+        self.equity = 0.0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+        self.last_trades = DrawdownWindow(max_trades=window_trades)
+        self.last_period = DrawdownWindow(max_seconds=window_seconds)
+
+    def log_trade(self, profit, timestamp=None):
+        """
+        Record the result of a closed trade.
+
+        Parameters:
+        - profit (float): Profit (negative for a loss).
+        - timestamp (float, optional): Close time in UNIX seconds. Defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self.trades.append(profit)
+        self.all_time.add(profit)
+        self.equity += profit
+        if self.equity > self.peak:
+            self.peak = self.equity
+        elif self.peak - self.equity > self.max_drawdown:
+            self.max_drawdown = self.peak - self.equity
+        self.last_trades.add(profit, timestamp)
+        self.last_period.add(profit, timestamp)
+
+    @property
+    def count(self):
+        """Trades logged so far."""
+        return self.all_time.count
+
+    @property
+    def total_profit(self):
+        return self.all_time.gross_profit
+
+    @property
+    def total_loss(self):
+        return self.all_time.gross_loss
+
+    def calculate_metrics(self, now=None):
+        """
+        Compute the performance metrics.
+
+        Parameters:
+        - now (float, optional): End of the time window in UNIX seconds. Defaults to the last trade's time.
+
+        Returns:
+        - dict: The all-time metrics of `RunningStats.metrics` (including 'win_rate', 'average_profit'
+          and 'average_loss'), plus the same metrics of the rolling windows under 'last_trades' and
+          'last_period'.
+        """
+        if now is not None:
+            self.last_period.evict(now)
+        metrics = self.all_time.metrics(self.max_drawdown)
+        metrics["last_trades"] = self.last_trades.metrics()
+        metrics["last_period"] = self.last_period.metrics()
+        return metrics
@@ -0,0 +1,180 @@
+import threading
+import logging
+import requests
+
+# Seconds between full reconciliations with the REST API
+RECONCILE_INTERVAL = 60
+# Seconds to wait before reopening a broken transaction stream
+STREAM_RETRY_DELAY = 1
+
+logger = logging.getLogger(__name__)
+
+class PositionCache:
+    """
+    In-memory copy of an OANDA account's open trades and balance.
+
+    The trading loop reads positions from memory instead of polling the REST
+    API. The copy is kept current from three sources:
+    - the transactions in our own order and close responses (`apply_response`),
+    - the account's transaction stream, which also reports fills we didn't
+      request, such as stop losses and take profits, and
+    - periodic reconciliation against the account details endpoint,
+      which repairs anything missed while the stream was down.
+
+    A transaction may arrive twice (in a response and on the stream) and
+    either before or after a reconciliation snapshot; it is applied once, and
+    transactions newer than a snapshot are replayed on top of it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._trades = {}           # Open trades by id
+        self._applied = {}          # Transactions applied since the last snapshot, by id
+        self.balance = None
+        self.snapshot_id = 0        # Last transaction reflected in the last snapshot
+        self.reconciliations = 0
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _apply(self, transaction):
+        # Called with the lock held
+        balance = transaction.get('accountBalance')
+        if balance is not None:
+            self.balance = float(balance)
+        if transaction.get('type') != 'ORDER_FILL':
+            return
+        opened = transaction.get('tradeOpened')
+        if opened:
+            self._trades[opened['tradeID']] = {
+                'id': opened['tradeID'],
+                'instrument': transaction['instrument'],
+                'price': transaction['price'],
+                'openTime': transaction['time'],
+                'initialUnits': opened['units'],
+                'currentUnits': opened['units'],
+                'state': 'OPEN',
+            }
+        for closed in transaction.get('tradesClosed', []):
+            self._trades.pop(closed['tradeID'], None)
+        reduced = transaction.get('tradeReduced')
+        if reduced and reduced['tradeID'] in self._trades:
+            trade = self._trades[reduced['tradeID']]
+            trade['currentUnits'] = f"{float(trade['currentUnits']) + float(reduced['units']):g}"
+
+    def apply(self, transaction):
+        """
+        Apply one account transaction; repeated and already-snapshotted ones are ignored.
+
+        Parameters:
+        - transaction (dict): Transaction as returned by the REST or streaming API.
+        """
+        transaction_id = int(transaction['id'])
+        with self._lock:
+            if transaction_id <= self.snapshot_id or transaction_id in self._applied:
+                return
+            self._applied[transaction_id] = transaction
+            self._apply(transaction)
+
+    def apply_response(self, response):
+        """
+        Apply the transactions of an order or trade close response (None is ignored).
+        """
+        if not response:
+            return
+        for key in ('orderCreateTransaction', 'orderFillTransaction', 'orderCancelTransaction'):
+            if response.get(key):
+                self.apply(response[key])
+
+    def reconcile(self, api):
+        """
+        Replace the cached state with a fresh snapshot from the REST API.
+
+        Trades, balance and the last transaction ID come from one account
+        details response, so they describe the same moment. Transactions
+        newer than the snapshot that were already applied are replayed on
+        top of it, so a fill racing the snapshot isn't lost.
+
+        Parameters:
+        - api (OandaAPI): Client of the account.
+
+        Raises:
+        - requests.RequestException: If a request fails; the cache is left unchanged.
+        """
+        account, last_transaction_id = api.fetch_account()
+        snapshot_id = int(last_transaction_id or 0)
+        with self._lock:
+            self._trades = {trade['id']: trade for trade in account.get('trades', [])}
+            self.balance = float(account['balance'])
+            self.snapshot_id = max(self.snapshot_id, snapshot_id)
+            self._applied = {i: t for i, t in self._applied.items() if i > self.snapshot_id}
+            for transaction_id in sorted(self._applied):
+                self._apply(self._applied[transaction_id])
+            self.reconciliations += 1
+
+    def open_trades(self, instrument=None):
+        """
+        List the open trades, newest first, without a network round trip.
+
+        Parameters:
+        - instrument (str, optional): Only list trades of this instrument.
+
+        Returns:
+        - list of dict: Copies of the open trades, in the openTrades endpoint's format.
+        """
+        with self._lock:
+            trades = [dict(trade) for trade in self._trades.values()
+                      if instrument is None or trade['instrument'] == instrument]
+        return sorted(trades, key=lambda trade: -int(trade['id']))
+
+    def position(self, instrument):
+        """
+        Net open units of an instrument (positive long, negative short).
+        """
+        return sum(float(trade['currentUnits']) for trade in self.open_trades(instrument))
+
+    def start(self, api, interval=RECONCILE_INTERVAL, stream=True):
+        """
+        Take a first snapshot and keep the cache current on background threads.
+
+        Parameters:
+        - api (OandaAPI): Client of the account.
+        - interval (float, optional): Seconds between reconciliations. Defaults to RECONCILE_INTERVAL.
+        - stream (bool, optional): Also follow the transaction stream. Defaults to True.
+        """
+        try:
+            self.reconcile(api)
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Initial position reconciliation failed: {e}")
+        targets = [self._reconcile_periodically] + ([self._follow_stream] if stream else [])
+        for target in targets:
+            thread = threading.Thread(target=target, args=(api, interval), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop the background threads (an open stream is left to time out)."""
+        self._stop.set()
+
+    def _reconcile_periodically(self, api, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.reconcile(api)
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(f"Position reconciliation failed: {e}")
+
+    def _follow_stream(self, api, interval):
+        while not self._stop.is_set():
+            try:
+                for transaction in api.stream_transactions():
+                    self.apply(transaction)
+                    if self._stop.is_set():
+                        return
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(f"Transaction stream broke: {e}")
+            if self._stop.wait(STREAM_RETRY_DELAY):
+                return
+            # Catch up on anything missed while disconnected
+            try:
+                self.reconcile(api)
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(f"Position reconciliation failed: {e}")
@@ -0,0 +1,209 @@
+import numpy as np
+
+# Ledger configuration
+PIP_SIZE = 0.0001           # Price increment of one pip for the major pairs
+MAX_POSITIONS = 32          # Open position slots per account
+DEFAULT_SPREAD = 0.00015    # Bid/ask spread in price units (1.5 pips)
+DEFAULT_COMMISSION = 0.0    # Commission per unit traded, charged on open and on close
+
+class PositionLedger:
+    """
+    Fixed-size position ledger for one or more simulated trading accounts.
+
+    Open positions live in preallocated (accounts, capacity) NumPy arrays of
+    entry price, signed units, stop loss and take profit. Each account also
+    keeps running aggregates (net units and cost basis) so mark-to-market PnL
+    is O(1) per step regardless of how many positions are open, and the
+    tightest stop loss / take profit levels on each side, so the per-position
+    exit scan only runs on bars that actually cross one of them.
+
+    Market orders fill at the mid price plus or minus half the spread; stop
+    loss and take profit orders fill at their level. When a bar touches both
+    levels of a position the stop loss is assumed to fill first.
+    """
+
+    def __init__(self, num_accounts=1, capacity=MAX_POSITIONS, spread=DEFAULT_SPREAD, commission=DEFAULT_COMMISSION):
+        """
+        Parameters:
+        - num_accounts (int, optional): Independent accounts tracked. Defaults to 1.
+        - capacity (int, optional): Maximum open positions per account. Defaults to MAX_POSITIONS.
+        - spread (float, optional): Bid/ask spread in price units. Defaults to DEFAULT_SPREAD.
+        - commission (float, optional): Commission per unit traded. Defaults to DEFAULT_COMMISSION.
+        """
+        self.num_accounts = num_accounts
+        self.capacity = capacity
+        self.spread = spread
+        self.commission = commission
+
+        shape = (num_accounts, capacity)
+        self.active = np.zeros(shape, dtype=bool)
+        self.units = np.zeros(shape)
+        self.entry_price = np.zeros(shape)
+        self.stop_loss = np.full(shape, np.nan)
+        self.take_profit = np.full(shape, np.nan)
+
+        self.open_count = np.zeros(num_accounts, dtype=np.int64)
+        self.net_units = np.zeros(num_accounts)
+        self.cost_basis = np.zeros(num_accounts)  # Sum of units * entry price over open positions
+        self.realized_pnl = np.zeros(num_accounts)  # Closed-trade PnL net of commission
+        self.closed_trades = np.zeros(num_accounts, dtype=np.int64)
+
+        # Tightest exit levels per account
+        self._long_stop = np.full(num_accounts, -np.inf)   # Highest long stop loss
+        self._long_take = np.full(num_accounts, np.inf)    # Lowest long take profit
+        self._short_stop = np.full(num_accounts, np.inf)   # Lowest short stop loss
+        self._short_take = np.full(num_accounts, -np.inf)  # Highest short take profit
+
+    def reset(self, mask=None):
+        """
+        Clear all positions and PnL of the accounts selected by `mask` (all if None).
+        """
+        if mask is None:
+            mask = slice(None)
+        self.active[mask] = False
+        self.units[mask] = 0
+        self.stop_loss[mask] = np.nan
+        self.take_profit[mask] = np.nan
+        self.open_count[mask] = 0
+        self.net_units[mask] = 0
+        self.cost_basis[mask] = 0
+        self.realized_pnl[mask] = 0
+        self.closed_trades[mask] = 0
+        self._long_stop[mask] = -np.inf
+        self._long_take[mask] = np.inf
+        self._short_stop[mask] = np.inf
+        self._short_take[mask] = -np.inf
+
+    def open(self, mask, units, price, stop_loss_distance=None, take_profit_distance=None):
+        """
+        Open a market position in every account selected by `mask` that has a free slot.
+
+        Parameters:
+        - mask (np.ndarray): Boolean array of accounts placing the order.
+        - units (float): Signed position size; positive buys, negative sells.
+        - price (np.ndarray): Current mid price per account.
+        - stop_loss_distance (float, optional): Stop loss distance from the fill price.
+        - take_profit_distance (float, optional): Take profit distance from the fill price.
+
+        Returns:
+        - np.ndarray: Indices of the accounts that opened a position.
+        """
+        accounts = np.flatnonzero(mask & (self.open_count < self.capacity))
+        if accounts.size == 0:
+            return accounts
+
+        direction = np.sign(units)
+        slots = np.argmin(self.active[accounts], axis=1)  # First free slot
+        fill = price[accounts] + direction * self.spread / 2
+        stop_loss = fill - direction * stop_loss_distance if stop_loss_distance else np.full(accounts.size, np.nan)
+        take_profit = fill + direction * take_profit_distance if take_profit_distance else np.full(accounts.size, np.nan)
+
+        self.active[accounts, slots] = True
+        self.units[accounts, slots] = units
+        self.entry_price[accounts, slots] = fill
+        self.stop_loss[accounts, slots] = stop_loss
+        self.take_profit[accounts, slots] = take_profit
+        self.open_count[accounts] += 1
+        self.net_units[accounts] += units
+        self.cost_basis[accounts] += units * fill
+        self.realized_pnl[accounts] -= self.commission * abs(units)
+
+        if direction > 0:
+            self._long_stop[accounts] = np.fmax(self._long_stop[accounts], stop_loss)
+            self._long_take[accounts] = np.fmin(self._long_take[accounts], take_profit)
+        else:
+            self._short_stop[accounts] = np.fmin(self._short_stop[accounts], stop_loss)
+            self._short_take[accounts] = np.fmax(self._short_take[accounts], take_profit)
+        return accounts
+
+    def _close(self, accounts, closing, exit_price):
+        """
+        Close the positions flagged in `closing` (rows of `accounts`) at `exit_price`.
+        """
+        units = np.where(closing, self.units[accounts], 0)
+        entry = self.entry_price[accounts]
+        pnl = units * (exit_price - entry) - self.commission * np.abs(units)
+
+        self.realized_pnl[accounts] += pnl.sum(axis=1)
+        self.net_units[accounts] -= units.sum(axis=1)
+        self.cost_basis[accounts] -= (units * entry).sum(axis=1)
+        closed = closing.sum(axis=1)
+        self.open_count[accounts] -= closed
+        self.closed_trades[accounts] += closed
+
+        rows = self.active[accounts]
+        rows[closing] = False
+        self.active[accounts] = rows
+        self._refresh_exit_levels(accounts)
+
+    def _refresh_exit_levels(self, accounts):
+        """
+        Recompute the tightest exit levels of `accounts` from their open positions.
+        """
+        active = self.active[accounts]
+        long = active & (self.units[accounts] > 0)
+        short = active & (self.units[accounts] < 0)
+        stop_loss = self.stop_loss[accounts]
+        take_profit = self.take_profit[accounts]
+        self._long_stop[accounts] = np.where(long & ~np.isnan(stop_loss), stop_loss, -np.inf).max(axis=1)
+        self._long_take[accounts] = np.where(long & ~np.isnan(take_profit), take_profit, np.inf).min(axis=1)
+        self._short_stop[accounts] = np.where(short & ~np.isnan(stop_loss), stop_loss, np.inf).min(axis=1)
+        self._short_take[accounts] = np.where(short & ~np.isnan(take_profit), take_profit, -np.inf).max(axis=1)
+
+    def check_exits(self, high, low):
+        """
+        Fill the stop loss and take profit orders touched by the latest bar.
+
+        Parameters:
+        - high (np.ndarray): Bar high per account.
+        - low (np.ndarray): Bar low per account.
+
+        Returns:
+        - np.ndarray: Indices of the accounts that closed at least one position.
+        """
+        hit = (low <= self._long_stop) | (high >= self._long_take) | (high >= self._short_stop) | (low <= self._short_take)
+        accounts = np.flatnonzero(hit)
+        if accounts.size == 0:
+            return accounts
+
+        active = self.active[accounts]
+        units = self.units[accounts]
+        stop_loss = self.stop_loss[accounts]
+        take_profit = self.take_profit[accounts]
+        bar_high = high[accounts, None]
+        bar_low = low[accounts, None]
+
+        long = active & (units > 0)
+        short = active & (units < 0)
+        stopped = (long & (bar_low <= stop_loss)) | (short & (bar_high >= stop_loss))
+        taken = ~stopped & ((long & (bar_high >= take_profit)) | (short & (bar_low <= take_profit)))
+        exit_price = np.where(stopped, stop_loss, take_profit)
+        self._close(accounts, stopped | taken, np.nan_to_num(exit_price))
+        return accounts
+
+    def close_all(self, mask, price):
+        """
+        Close every open position of the accounts selected by `mask` at market.
+
+        Parameters:
+        - mask (np.ndarray): Boolean array of accounts to flatten.
+        - price (np.ndarray): Current mid price per account.
+        """
+        accounts = np.flatnonzero(mask & (self.open_count > 0))
+        if accounts.size == 0:
+            return
+        # Longs sell at the bid, shorts buy back at the ask
+        exit_price = price[accounts, None] - np.sign(self.units[accounts]) * self.spread / 2
+        self._close(accounts, self.active[accounts], exit_price)
+
+    def unrealized_pnl(self, price):
+        """
+        Mark every account's open positions to `price` in O(1) per account.
+
+        Parameters:
+        - price (np.ndarray): Current mid price per account.
+
+        Returns:
+        - np.ndarray: Unrealized PnL per account.
+        """
+        return self.net_units * price - self.cost_basis
@@ -0,0 +1,114 @@
+import os
+import json
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+# Market data as consumed by the trading environments: a read-only float32
+# (rows, columns) array, its column names, the rows contributed by each
+# instrument segment and, optionally, the int64 UTC nanosecond time of each row
+PriceArray = namedtuple('PriceArray', ['prices', 'columns', 'segment_lengths', 'times'], defaults=(None,))
+
+def to_utc_ns(timestamp):
+    """
+    Convert a timestamp-like value (str, datetime, pd.Timestamp) to int64 UTC nanoseconds.
+    """
+    ts = pd.Timestamp(timestamp)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return ts.value
+
+def to_price_array(data):
+    """
+    Convert market data into a contiguous, read-only float32 array.
+
+    Parameters:
+    - data (pd.DataFrame): Market data; only numeric columns are kept.
+
+    Returns:
+    - tuple: (np.ndarray of shape (rows, columns), list of column names)
+    """
+    numeric = data.select_dtypes(include=[np.number])
+    prices = np.ascontiguousarray(numeric.to_numpy(dtype=np.float32))
+    # Observations are views into this array, so guard it against writes
+    prices.flags.writeable = False
+    return prices, list(numeric.columns)
+
+def _sidecar_paths(path):
+    stem = path[:-4] if path.endswith('.npy') else path
+    return f"{stem}.time.npy", f"{stem}.json"
+
+def save_price_array(data, path):
+    """
+    Save market data in the memory-mappable price array format.
+
+    Writes `path` (float32 prices), `<stem>.time.npy` (int64 UTC nanoseconds)
+    and `<stem>.json` (column names). All three are written to temporary
+    files first and then renamed over the old ones, the '.json' last: it
+    marks a complete save (see `saved_at`), so an interrupted save leaves
+    an older '.json' behind and is detected as stale.
+
+    Parameters:
+    - data (pd.DataFrame): Market data indexed by time.
+    - path (str): Destination '.npy' path.
+    """
+    prices, columns = to_price_array(data)
+    times = pd.DatetimeIndex(pd.to_datetime(data.index, utc=True)).as_unit('ns').asi8
+    time_path, meta_path = _sidecar_paths(path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    tmp_paths = {target: f"{target}.{os.getpid()}.tmp" for target in (path, time_path, meta_path)}
+    for target, array in ((path, prices), (time_path, times)):
+        with open(tmp_paths[target], 'wb') as f:
+            np.save(f, array)
+    with open(tmp_paths[meta_path], 'w') as f:
+        json.dump({'columns': columns}, f)
+    for target in (path, time_path, meta_path):
+        os.replace(tmp_paths[target], target)
+
+def saved_at(path):
+    """
+    Return when the last complete `save_price_array` to `path` finished, as a
+    modification time in seconds, or None if it was never saved.
+    """
+    try:
+        return os.path.getmtime(_sidecar_paths(path)[1])
+    except FileNotFoundError:
+        return None
+
+def load_price_array(path):
+    """
+    Memory-map a price array saved by `save_price_array`.
+
+    The arrays are read-only views of the file, so every process loading the
+    same file shares one copy of the data through the OS page cache.
+
+    Parameters:
+    - path (str): Path of the '.npy' price file.
+
+    Returns:
+    - PriceArray: Memory-mapped prices and times with their column names.
+    """
+    time_path, meta_path = _sidecar_paths(path)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    prices = np.load(path, mmap_mode='r')
+    times = np.load(time_path, mmap_mode='r') if os.path.exists(time_path) else None
+    return PriceArray(prices, meta['columns'], [len(prices)], times)
+
+def slice_price_array(price_array, start=None, end=None):
+    """
+    Restrict a single-segment price array to a time range without copying.
+
+    Parameters:
+    - price_array (PriceArray): Price array with times.
+    - start (optional): Inclusive start time.
+    - end (optional): Exclusive end time.
+
+    Returns:
+    - PriceArray: Views of the rows in [start, end).
+    """
+    times = price_array.times
+    lo = np.searchsorted(times, to_utc_ns(start)) if start is not None else 0
+    hi = np.searchsorted(times, to_utc_ns(end)) if end is not None else len(times)
+    return PriceArray(price_array.prices[lo:hi], price_array.columns, [hi - lo], times[lo:hi])
@@ -0,0 +1,100 @@
+import json
+import time
+import random
+import logging
+import threading
+import numpy as np
+import requests
+from oanda_client import OANDA_STREAM_URL, REQUEST_TIMEOUT
+
+HEARTBEAT_TIMEOUT = 10     # Seconds without a price or heartbeat (sent every 5 s) before reconnecting
+RECONNECT_DELAY = 0.5      # First reconnection delay in seconds, doubled after each failed attempt
+MAX_RECONNECT_DELAY = 30   # Longest reconnection delay in seconds
+
+logger = logging.getLogger(__name__)
+
+def parse_time(value):
+    """
+    Convert an RFC3339 time string from the streaming API to int64 UTC nanoseconds.
+    """
+    return int(np.datetime64(value.rstrip('Z'), 'ns').astype(np.int64))
+
+def parse_price(message):
+    """
+    Convert a PRICE message of the pricing stream into a tick.
+
+    Returns:
+    - dict: 'type', 'instrument', 'time' (UTC nanoseconds) and the top-of-book 'bid' and 'ask'.
+    """
+    return {
+        'type': 'PRICE',
+        'instrument': message['instrument'],
+        'time': parse_time(message['time']),
+        'bid': float(message['bids'][0]['price'] if message.get('bids') else message['closeoutBid']),
+        'ask': float(message['asks'][0]['price'] if message.get('asks') else message['closeoutAsk']),
+    }
+
+class PriceStream:
+    """
+    Subscriber to the OANDA pricing stream of a set of instruments.
+
+    Iterating over the stream yields ticks as they arrive, plus heartbeats
+    ({'type': 'HEARTBEAT', 'time': ns}) that let consumers close bars in quiet
+    markets. A broken stream, or one silent for HEARTBEAT_TIMEOUT seconds, is
+    reopened after an exponential backoff with jitter; the delay resets once
+    a reconnected stream delivers data. Iteration ends only after `stop()`.
+    """
+
+    def __init__(self, session, account_id, instruments, stream_url=OANDA_STREAM_URL):
+        """
+        Parameters:
+        - session (requests.Session): Authenticated session, e.g. from `oanda_client.create_session`.
+        - account_id (str): OANDA account ID.
+        - instruments (list of str): Instruments to subscribe to.
+        - stream_url (str, optional): Streaming API root. Defaults to OANDA_STREAM_URL.
+        """
+        self.session = session
+        self.url = f"{stream_url}/v3/accounts/{account_id}/pricing/stream"
+        self.instruments = list(instruments)
+        self.reconnects = 0
+        self.last_message = None  # Monotonic time of the last price or heartbeat
+        self._response = None
+        self._stop = threading.Event()
+
+    def _messages(self):
+        params = {'instruments': ','.join(self.instruments)}
+        with self.session.get(self.url, params=params, stream=True, timeout=(REQUEST_TIMEOUT, HEARTBEAT_TIMEOUT)) as response:
+            response.raise_for_status()
+            self._response = response
+            for line in response.iter_lines():
+                if line:
+                    self.last_message = time.monotonic()
+                    yield json.loads(line)
+
+    def __iter__(self):
+        delay = RECONNECT_DELAY
+        while not self._stop.is_set():
+            try:
+                for message in self._messages():
+                    delay = RECONNECT_DELAY
+                    if message.get('type') == 'PRICE':
+                        yield parse_price(message)
+                    elif message.get('type') == 'HEARTBEAT':
+                        yield {'type': 'HEARTBEAT', 'time': parse_time(message['time'])}
+                    if self._stop.is_set():
+                        return
+                logger.warning("Pricing stream closed by the server.")
+            except (requests.RequestException, ValueError, KeyError, AttributeError) as e:
+                if self._stop.is_set():
+                    return
+                logger.warning(f"Pricing stream broke: {e}")
+            self.reconnects += 1
+            if self._stop.wait(delay * random.uniform(0.5, 1)):
+                return
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def stop(self):
+        """End the iteration, also from another thread."""
+        self._stop.set()
+        if self._response is not None:
+            self._response.close()
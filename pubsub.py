@@ -0,0 +1,106 @@
+import threading
+from collections import deque
+
+HISTORY_SIZE = 1000          # Recent events kept for subscribers resuming after a disconnect
+SUBSCRIBER_QUEUE_SIZE = 256  # Undelivered events kept per subscriber; the oldest are dropped beyond this
+
+class Channel:
+    """
+    In-process publish/subscribe channel with numbered events.
+
+    Publishing is O(subscribers) appends to bounded per-subscriber queues, so
+    a slow subscriber loses its oldest undelivered events instead of blocking
+    the publisher or growing without limit. The last `history` events are
+    kept so a subscriber reconnecting with the id of the last event it got
+    (e.g. an SSE Last-Event-ID) receives the ones it missed.
+    """
+
+    def __init__(self, history=HISTORY_SIZE, max_queue=SUBSCRIBER_QUEUE_SIZE, encoder=None):
+        """
+        Parameters:
+        - history (int, optional): Events kept for resuming. Defaults to HISTORY_SIZE.
+        - max_queue (int, optional): Undelivered events kept per subscriber. Defaults to SUBSCRIBER_QUEUE_SIZE.
+        - encoder (callable, optional): Applied once per event on publish (e.g. json.dumps), so
+          subscribers share the encoded form instead of encoding it each.
+        """
+        self.max_queue = max_queue
+        self.encoder = encoder
+        self.last_id = 0
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+        self._condition = threading.Condition()
+
+    def publish(self, data):
+        """
+        Publish one event to every subscriber.
+
+        Returns:
+        - int: The event id.
+        """
+        if self.encoder is not None:
+            data = self.encoder(data)
+        with self._condition:
+            self.last_id += 1
+            event = (self.last_id, data)
+            self._history.append(event)
+            for subscription in self._subscribers:
+                if len(subscription.queue) == self.max_queue:
+                    subscription.dropped += 1
+                subscription.queue.append(event)
+            self._condition.notify_all()
+        return self.last_id
+
+    def subscribe(self, last_event_id=None):
+        """
+        Start receiving events.
+
+        Parameters:
+        - last_event_id (int or str, optional): Id of the last event already received. The kept
+          events after it are delivered first; unknown or future ids (e.g. from before a restart)
+          resume from the next published event.
+
+        Returns:
+        - Subscription: Call `close()` (or use it as a context manager) when done.
+        """
+        subscription = Subscription(self)
+        with self._condition:
+            try:
+                last_event_id = int(last_event_id)
+            except (TypeError, ValueError):
+                last_event_id = None
+            if last_event_id is not None and last_event_id < self.last_id:
+                subscription.queue.extend(event for event in self._history if event[0] > last_event_id)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def subscribers(self):
+        """Number of current subscribers."""
+        with self._condition:
+            return len(self._subscribers)
+
+class Subscription:
+    """A subscriber's bounded queue of (event id, data) pairs; created by `Channel.subscribe`."""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.queue = deque(maxlen=channel.max_queue)
+        self.dropped = 0   # Events lost because the queue was full
+
+    def get(self, timeout=None):
+        """
+        Return the next (event id, data) pair, waiting up to `timeout` seconds; None on timeout.
+        """
+        with self.channel._condition:
+            if not self.queue and not self.channel._condition.wait_for(lambda: self.queue, timeout):
+                return None
+            return self.queue.popleft()
+
+    def close(self):
+        with self.channel._condition:
+            self.channel._subscribers.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
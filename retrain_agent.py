@@ -1,16 +1,23 @@
 import os
 import sys
+import argparse
 import logging
 from datetime import datetime
-import pandas as pd
 from stable_baselines3 import PPO
-from forex_env import ForexEnv  # Ensure ForexEnv can handle incremental training
+from stable_baselines3.common.vec_env import VecMonitor
+from parallel_forex_env import make_forex_vec_env
+from market_data_store import MarketDataStore
+from price_array import slice_price_array
+from numpy_policy import export_policy
 
 # Configuration
 MODEL_PATH = "ppo_forex_agent.zip"       # Path to the existing trained PPO model
 NEW_MODEL_PATH_TEMPLATE = "ppo_forex_agent_{date}.zip"  # Template for saving updated models
-DATA_DIR = "data"                         # Directory where new data is stored
-TRAINING_DATA_FILE = os.path.join(DATA_DIR, "processed_forex_data.csv")  # Path to training data
+NEW_POLICY_PATH_TEMPLATE = "ppo_forex_policy_{date}.npz"  # Template for their NumPy policy exports
+INSTRUMENT = "EUR_USD"                    # Instrument to train on
+GRANULARITY = "M1"                        # Candle granularity to train on
+NUM_ENVS = 8                              # Parallel training episodes
+WORKERS = 1                               # Environment worker processes (0 = all cores)
 LOG_DIR = "logs"
 os.makedirs(LOG_DIR, exist_ok=True)
 
@@ -21,57 +28,69 @@ logging.basicConfig(
     format='%(asctime)s:%(levelname)s:%(message)s'
 )
 
-def load_data(file_path):
+def load_data(instrument=INSTRUMENT, granularity=GRANULARITY, start=None, end=None, store=None):
     """
-    Load and preprocess the training data.
+    Memory-map the training data, with technical indicators, from the market data store.
 
     Parameters:
-    - file_path (str): Path to the CSV file containing training data.
+    - instrument (str, optional): Instrument name. Defaults to INSTRUMENT.
+    - granularity (str, optional): Candle granularity. Defaults to GRANULARITY.
+    - start (optional): Inclusive start time. Defaults to the first stored candle.
+    - end (optional): Exclusive end time. Defaults to the last stored candle.
+    - store (MarketDataStore, optional): Store to read from. Defaults to MarketDataStore().
 
     Returns:
-    - pd.DataFrame: Preprocessed training data.
+    - PriceArray: Memory-mapped training data, or None if the store has no data.
     """
     try:
-        data = pd.read_csv(file_path, parse_dates=['time'])
-        data.set_index('time', inplace=True)
-        logging.info(f"Loaded training data from {file_path}.")
+        store = store or MarketDataStore()
+        if not store.days(instrument, granularity):
+            return None
+        data = slice_price_array(store.load_price_array(instrument, granularity), start, end)
+        logging.info(f"Loaded {len(data.prices)} {instrument} {granularity} candles from {store.root}.")
         return data
     except Exception as e:
         logging.error(f"Error loading training data: {e}")
         sys.exit(1)
 
-def create_environment(data):
+def create_environment(data, num_envs=NUM_ENVS, workers=WORKERS, seed=None):
     """
-    Create the Forex trading environment using the provided data.
+    Create the vectorized Forex trading environment using the provided data.
 
     Parameters:
-    - data (pd.DataFrame): Preprocessed market data with technical indicators.
+    - data (PriceArray): Preprocessed market data with technical indicators.
+    - num_envs (int, optional): Parallel training episodes. Defaults to NUM_ENVS.
+    - workers (int, optional): Environment worker processes, 0 for all cores. Defaults to WORKERS.
+    - seed (int, optional): Seed for reproducible episode sampling. Defaults to None.
 
     Returns:
-    - ForexEnv: An instance of the custom Forex trading environment.
+    - VecEnv: The vectorized Forex trading environment.
     """
     try:
-        env = ForexEnv(historical_data=data)
-        logging.info("Initialized ForexEnv for training.")
+        env = VecMonitor(make_forex_vec_env(data, num_envs=num_envs, workers=workers, seed=seed))
+        logging.info(f"Initialized {num_envs} Forex environments across {workers or os.cpu_count()} worker(s).")
         return env
     except Exception as e:
         logging.error(f"Error initializing ForexEnv: {e}")
         sys.exit(1)
 
-def fine_tune_model(model_path, env, total_timesteps=50000):
+def fine_tune_model(model_path, env, total_timesteps=50000, seed=None):
     """
     Fine-tune the existing PPO model with new data.
 
     Parameters:
     - model_path (str): Path to the existing trained PPO model.
-    - env (ForexEnv): The trading environment for training.
+    - env (VecEnv): The trading environment for training.
     - total_timesteps (int): Number of timesteps for fine-tuning.
+    - seed (int, optional): Seed for reproducible fine-tuning. Defaults to None.
 
     Returns:
     - PPO: The fine-tuned PPO model.
     """
     try:
         model = PPO.load(model_path, env=env)
+        if seed is not None:
+            model.set_random_seed(seed)
         logging.info(f"Loaded existing model from {model_path}.")
     except Exception as e:
         logging.error(f"Error loading model: {e}")
@@ -98,25 +117,37 @@ def save_model(model, date_str):
         new_model_path = NEW_MODEL_PATH_TEMPLATE.format(date=date_str)
         model.save(new_model_path)
         logging.info(f"Saved fine-tuned model to {new_model_path}.")
+        new_policy_path = NEW_POLICY_PATH_TEMPLATE.format(date=date_str)
+        export_policy(model, new_policy_path)
+        logging.info(f"Exported fine-tuned policy to {new_policy_path}.")
     except Exception as e:
         logging.error(f"Error saving model: {e}")
         sys.exit(1)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fine-tune the PPO Forex agent on the latest data.")
+    parser.add_argument('--num-envs', type=int, default=NUM_ENVS, help="Parallel training episodes")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="Environment worker processes (0 = all cores)")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible runs")
+    parser.add_argument('--timesteps', type=int, default=50000, help="Fine-tuning timesteps")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     logging.info("Retraining process started.")
     
     # Step 1: Load the latest training data
-    if not os.path.exists(TRAINING_DATA_FILE):
-        logging.error(f"Training data file {TRAINING_DATA_FILE} does not exist.")
+    data = load_data()
+    if data is None:
+        logging.error(f"No {INSTRUMENT} {GRANULARITY} training data in the market data store.")
         sys.exit(1)
     
-    data = load_data(TRAINING_DATA_FILE)
-    
     # Step 2: Initialize the trading environment
-    env = create_environment(data)
+    env = create_environment(data, num_envs=args.num_envs, workers=args.workers, seed=args.seed)
     
     # Step 3: Fine-tune the existing model
-    fine_tuned_model = fine_tune_model(MODEL_PATH, env, total_timesteps=50000)  # Adjust timesteps as needed
+    fine_tuned_model = fine_tune_model(MODEL_PATH, env, total_timesteps=args.timesteps, seed=args.seed)
+    env.close()
     
     # Step 4: Save the updated model with a timestamp
     date_str = datetime.now().strftime("%Y%m%d_%H%M%S")
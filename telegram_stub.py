@@ -0,0 +1,101 @@
+"""
+Local stub of the Telegram Bot API sendMessage method for testing notifications.
+
+Records every message it receives and can answer with HTTP 429 (with
+`parameters.retry_after`, like Telegram) when more than `max_per_second`
+messages arrive within a second, or hold each request for `delay` seconds
+to simulate a slow or stalled API.
+
+Usage:
+    python telegram_stub.py [port]
+    TELEGRAM_API_URL=http://127.0.0.1:8082 python app.py
+"""
+import sys
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+DEFAULT_PORT = 8082
+
+class TelegramStub(ThreadingHTTPServer):
+    """
+    HTTP server holding the received messages and request counters.
+
+    Parameters:
+    - port (int, optional): Port to listen on; 0 picks a free port. Defaults to DEFAULT_PORT.
+    - max_per_second (float, optional): Messages accepted per second before answering 429. Defaults to 0 (no limit).
+    - retry_after (int, optional): Seconds asked for in 429 answers. Defaults to 1.
+    - delay (float, optional): Seconds every request is held before answering. Defaults to 0.
+    """
+    daemon_threads = True
+
+    def __init__(self, port=DEFAULT_PORT, max_per_second=0, retry_after=1, delay=0.0):
+        super().__init__(('127.0.0.1', port), TelegramHandler)
+        self.max_per_second = max_per_second
+        self.retry_after = retry_after
+        self.delay = delay
+        self.messages = []     # (time, chat_id, text, parse_mode) of accepted messages
+        self.requests = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def accept(self, fields):
+        with self.lock:
+            self.requests += 1
+            now = time.monotonic()
+            recent = sum(1 for t, *_ in self.messages if now - t < 1)
+            if self.max_per_second and recent >= self.max_per_second:
+                self.throttled += 1
+                return 429, {'ok': False, 'error_code': 429, 'description': "Too Many Requests",
+                             'parameters': {'retry_after': self.retry_after}}
+            self.messages.append((now, fields.get('chat_id'), fields.get('text'), fields.get('parse_mode')))
+            return 200, {'ok': True, 'result': {'message_id': len(self.messages), 'text': fields.get('text')}}
+
+class TelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        length = int(self.headers.get('Content-Length', 0))
+        fields = {k: v[-1] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+        if self.path.startswith('/bot') and self.path.endswith('/sendMessage'):
+            status, payload = self.server.accept(fields)
+        else:
+            status, payload = 404, {'ok': False, 'error_code': 404, 'description': "Not Found"}
+
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 429:
+            self.send_header('Retry-After', str(self.server.retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(port=DEFAULT_PORT, **kwargs):
+    """
+    Start a stub server on a background thread.
+
+    Returns:
+    - TelegramStub: The running server; call `shutdown()` to stop it.
+    """
+    server = TelegramStub(port, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    server = TelegramStub(port)
+    print(f"Telegram API stub listening on {server.url}")
+    server.serve_forever()
@@ -0,0 +1,66 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from backtest_engine import BacktestEngine, summarize, EXIT_END_OF_DATA
+from performance_tracker import PerformanceTracker
+from trading_strategy import should_enter_trade
+
+# Prices move in steps of 2**-10, and the exit levels are whole steps away, so
+# the arithmetic is exact and a bar that crosses a level lands on it
+STEP = 2.0 ** -10
+STOP_LOSS = 1 * STEP
+TAKE_PROFIT = 2 * STEP
+
+def make_bids(n=20000, seed=0):
+    steps = np.random.default_rng(seed).choice([-1, 1], n)
+    # Around 1.15, so should_enter_trade (bid < 1.15) switches on and off
+    return pd.DataFrame({'bid': 1.0 + (147 + np.cumsum(steps)) * STEP})
+
+def old_backtest_loop(historical_data):
+    """
+    The per-row loop backtest.py ran before BacktestEngine, with the order
+    placement and closing of trade_executor reduced to their price rules.
+    """
+    performance_tracker = PerformanceTracker(history=None)
+    trades = []
+    entry_price, stop_loss, take_profit = None, None, None
+    for index, market_data in historical_data.iterrows():
+        if entry_price is None:
+            if should_enter_trade(market_data):  # execute_trade
+                entry_bar, entry_price = index, market_data['bid']
+                stop_loss, take_profit = entry_price - STOP_LOSS, entry_price + TAKE_PROFIT
+        elif market_data['bid'] <= stop_loss or market_data['bid'] >= take_profit:  # close_trade
+            profit = market_data['bid'] - entry_price
+            performance_tracker.log_trade(profit, timestamp=index)
+            trades.append((entry_bar, index, entry_price, market_data['bid']))
+            entry_price, stop_loss, take_profit = None, None, None
+    return trades, performance_tracker.calculate_metrics()
+
+def test_run_matches_the_old_loop():
+    data = make_bids()
+    expected, expected_metrics = old_backtest_loop(data)
+    trades = BacktestEngine(data).run(should_enter_trade, stop_loss=STOP_LOSS, take_profit=TAKE_PROFIT, spread=0.0)
+
+    # The old loop left a trade still open at the end out of its results
+    closed = trades[trades['reason'] != EXIT_END_OF_DATA]
+    assert len(expected) > 100
+    assert [tuple(t) for t in closed[['entry_bar', 'exit_bar', 'entry_price', 'exit_price']].tolist()] == expected
+
+    metrics = summarize(closed)
+    for key, value in metrics.items():
+        assert expected_metrics[key] == pytest.approx(value, rel=1e-9, abs=1e-12), key
+
+def test_summarize_reports_the_performance_tracker_metrics():
+    pnl = np.random.default_rng(1).normal(0.0001, 0.001, 500)
+    trades = np.zeros(len(pnl), dtype=[('pnl', np.float64)])
+    trades['pnl'] = pnl
+    tracker = PerformanceTracker()
+    for profit in pnl:
+        tracker.log_trade(profit, timestamp=0)
+    expected = {k: v for k, v in tracker.calculate_metrics().items() if k not in ('last_trades', 'last_period')}
+    metrics = summarize(trades)
+    assert metrics.keys() == expected.keys()
+    for key in metrics:
+        assert metrics[key] == pytest.approx(expected[key], rel=1e-9), key
+    assert summarize(trades[:0])['trades'] == 0 and not math.isnan(summarize(trades[:0])['sharpe'])
@@ -0,0 +1,87 @@
+import json
+import numpy as np
+import pytest
+from candle_parser import CANDLE_DTYPE, parse_candles
+
+CANDLES = [
+    {"complete": True, "volume": 146, "time": "2024-01-01T00:00:00.000000000Z",
+     "mid": {"o": "1.10412", "h": "1.10420", "l": "1.10401", "c": "1.10415"}},
+    {"complete": True, "volume": 7, "time": "2024-01-01T00:01:00.000000000Z",
+     "mid": {"o": "1.10415", "h": "1.10431", "l": "1.10409", "c": "1.10430"}},
+    {"complete": False, "volume": 12345, "time": "2024-01-01T00:02:00.000000000Z",
+     "mid": {"o": "1.10430", "h": "1.10433", "l": "1.10428", "c": "1.10429"}},
+]
+
+def response(candles, **dumps):
+    return json.dumps({"instrument": "EUR_USD", "granularity": "M1", "candles": candles}, **dumps).encode()
+
+def reference(candles):
+    """Records and completeness decoded with `json`, one candle at a time."""
+    records = np.empty(len(candles), dtype=CANDLE_DTYPE)
+    for i, candle in enumerate(candles):
+        prices = candle['mid']
+        records[i] = (np.datetime64(candle['time'][:-1], 'ns').astype(np.int64), prices['o'], prices['h'],
+                      prices['l'], prices['c'], candle['volume'])
+    return records, np.array([candle['complete'] for candle in candles])
+
+def parse(body, split=None):
+    chunks = [body] if split is None else [body[:split], body[split:]]
+    blocks = list(parse_candles(chunks))
+    if not blocks:
+        return np.empty(0, dtype=CANDLE_DTYPE), np.empty(0, dtype=bool)
+    return np.concatenate([b[0] for b in blocks]), np.concatenate([b[1] for b in blocks])
+
+def assert_parsed(body, candles, split=None):
+    records, complete = parse(body, split)
+    expected, expected_complete = reference(candles)
+    np.testing.assert_array_equal(records, expected)
+    np.testing.assert_array_equal(complete, expected_complete)
+
+@pytest.mark.parametrize("order", [
+    ["complete", "volume", "time", "mid"],
+    ["time", "mid", "complete", "volume"],   # 'volume' is the last key of each candle
+    ["mid", "volume", "time", "complete"],   # 'complete' is the last key of each candle
+])
+def test_matches_json_for_any_key_order(order):
+    candles = [{key: candle[key] for key in order} for candle in CANDLES]
+    assert_parsed(response(candles), candles)
+    assert_parsed(response(candles, indent=2), candles)
+
+def test_every_chunk_split():
+    # Includes splits inside the numbers of 'volume' and of the prices
+    candles = [{key: c[key] for key in ["time", "mid", "complete", "volume"]} for c in CANDLES]
+    body = response(candles)
+    for split in range(1, len(body)):
+        assert_parsed(body, candles, split)
+
+def test_one_byte_chunks():
+    body = response(CANDLES)
+    blocks = list(parse_candles(body[i:i + 1] for i in range(len(body))))
+    records = np.concatenate([b[0] for b in blocks])
+    np.testing.assert_array_equal(records, reference(CANDLES)[0])
+
+def test_bid_and_ask_blocks_fall_back_to_json():
+    candles = [{**c, "bid": c["mid"], "ask": c["mid"]} for c in CANDLES]
+    assert_parsed(response(candles), candles)
+    for split in range(1, len(response(candles)), 37):
+        assert_parsed(response(candles), candles, split)
+
+def test_a_later_unhandled_candle_falls_back_for_the_rest():
+    candles = CANDLES[:1] + [{**CANDLES[1], "bid": CANDLES[1]["mid"]}] + CANDLES[2:]
+    body = response(candles)
+    split = body.index(b'},') + 2  # The first chunk ends after the first candle
+    assert_parsed(body, candles, split)
+
+def test_unix_times_fall_back_to_json():
+    candles = [{**c, "time": "1704067200.000000000"} for c in CANDLES[:1]]
+    records, _ = parse(response(candles))
+    assert records['time'][0] == np.datetime64("2024-01-01T00:00:00", 'ns').astype(np.int64)
+
+def test_candles_without_mid_prices_raise():
+    candles = [{key: c[key] for key in ("complete", "volume", "time")} | {"bid": c["mid"]} for c in CANDLES]
+    with pytest.raises(ValueError):
+        parse(response(candles))
+
+def test_empty_response():
+    records, complete = parse(response([]))
+    assert len(records) == 0 and len(complete) == 0
@@ -0,0 +1,74 @@
+import os
+import json
+import pytest
+from csv_cache import CsvCache
+
+HEADER = "time,price,label\n"
+
+def rows(start, count, label='a'):
+    return "".join(f"{i},{1 + i / 100},{label}\n" for i in range(start, start + count))
+
+def expected(start, count, label='a'):
+    return [{'time': i, 'price': 1 + i / 100, 'label': label} for i in range(start, start + count)]
+
+def write(path, text, mode='w'):
+    with open(path, mode) as f:
+        f.write(text)
+
+def bump_mtime(path):
+    # Changes within one mtime tick must still be seen
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+def body(cache):
+    return json.loads(cache.get()[0])
+
+@pytest.mark.parametrize('max_rows', [None, 5])
+def test_append_parses_only_the_new_rows(tmp_path, max_rows):
+    path = tmp_path / "data.csv"
+    write(path, HEADER + rows(0, 3))
+    cache = CsvCache(str(path), max_rows=max_rows)
+    assert body(cache) == expected(0, 3)
+
+    write(path, rows(3, 4), mode='a')
+    assert body(cache) == expected(0, 7)[-(max_rows or 7):]
+    assert cache.loads == 2
+
+    # A partial line is left for the next read
+    write(path, "7,1.07,", mode='a')
+    assert body(cache) == expected(0, 7)[-(max_rows or 7):]
+    write(path, "a\n", mode='a')
+    assert body(cache) == expected(0, 8)[-(max_rows or 8):]
+
+def test_truncated_file_is_loaded_again(tmp_path):
+    path = tmp_path / "data.csv"
+    write(path, HEADER + rows(0, 5))
+    cache = CsvCache(str(path))
+    assert body(cache) == expected(0, 5)
+
+    with open(path, 'r+') as f:
+        f.truncate(len(HEADER) + len(rows(0, 2)))
+    assert body(cache) == expected(0, 2)
+    write(path, rows(2, 1, 'b'), mode='a')
+    assert body(cache) == expected(0, 2) + expected(2, 1, 'b')
+
+@pytest.mark.parametrize('max_rows', [None, 5])
+def test_file_rewritten_in_place_is_loaded_again(tmp_path, max_rows):
+    path = tmp_path / "data.csv"
+    write(path, HEADER + rows(0, 3))
+    cache = CsvCache(str(path), max_rows=max_rows)
+    assert body(cache) == expected(0, 3)
+    inode = os.stat(path).st_ino
+
+    # Rewritten through the same inode and left larger: not an append
+    with open(path, 'r+') as f:
+        f.write(HEADER + rows(0, 4, 'rewritten'))
+    bump_mtime(path)
+    assert os.stat(path).st_ino == inode
+    assert body(cache) == expected(0, 4, 'rewritten')[-(max_rows or 4):]
+
+    # Rewritten with the same size
+    with open(path, 'r+') as f:
+        f.write(HEADER + rows(0, 4, 'rewrote__'))
+    bump_mtime(path)
+    assert body(cache) == expected(0, 4, 'rewrote__')[-(max_rows or 4):]
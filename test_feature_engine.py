@@ -0,0 +1,60 @@
+import os
+import numpy as np
+import pandas as pd
+from feature_engine import (FEATURE_CONFIG, IncrementalFeatures, compute_features, feature_columns,
+                            load_or_compute_features)
+
+def make_bars(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0005, n))
+    # A flat and a steadily rising stretch
+    close[200:230] = close[199]
+    close[300:330] = close[299] + 0.0001 * np.arange(1, 31)
+    high = close + np.abs(rng.normal(0, 0.0003, n))
+    low = close - np.abs(rng.normal(0, 0.0003, n))
+    index = pd.date_range("2024-01-01", periods=n, freq="min", tz="UTC")
+    return pd.DataFrame({'open': close, 'high': high, 'low': low, 'close': close, 'volume': 100}, index=index)
+
+def test_warm_up_rows_are_nan():
+    features = compute_features(make_bars())
+    for column in features.columns:
+        name, period = column.rsplit('_', 1)
+        first = {'sma': int(period) - 1, 'ema': 0}.get(name, int(period))
+        assert features[column].iloc[:first].isna().all(), column
+        assert features[column].iloc[first:200].notna().all(), column
+
+def test_incremental_features_match_compute_features():
+    data = make_bars()
+    expected = compute_features(data).to_numpy()
+    incremental = IncrementalFeatures()
+    got = np.array([incremental.update(bar.high, bar.low, bar.close) for bar in data.itertuples()])
+    assert incremental.columns == feature_columns(FEATURE_CONFIG)
+    np.testing.assert_array_equal(np.isnan(got), np.isnan(expected))
+    np.testing.assert_allclose(got, expected, rtol=0, atol=1e-9, equal_nan=True)
+    assert incremental.ready
+
+def test_cache_key_follows_data_and_config(tmp_path):
+    data = make_bars()
+    cache_dir = str(tmp_path)
+    first = load_or_compute_features(data, cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(first, compute_features(data))
+    assert len(os.listdir(cache_dir)) == 1
+
+    # Same data and config: served from the cache
+    pd.testing.assert_frame_equal(load_or_compute_features(data.copy(), cache_dir=cache_dir), first)
+    assert len(os.listdir(cache_dir)) == 1
+
+    changed = data.copy()
+    changed.iloc[-1, changed.columns.get_loc('close')] += 0.001
+    pd.testing.assert_frame_equal(load_or_compute_features(changed, cache_dir=cache_dir), compute_features(changed))
+    assert len(os.listdir(cache_dir)) == 2
+
+    shifted = data.set_axis(data.index + pd.Timedelta(minutes=1))
+    load_or_compute_features(shifted, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 3
+
+    config = {**FEATURE_CONFIG, 'sma': [10]}
+    features = load_or_compute_features(data, config, cache_dir=cache_dir)
+    assert list(features.columns) == feature_columns(config)
+    pd.testing.assert_frame_equal(features, compute_features(data, config))
+    assert len(os.listdir(cache_dir)) == 4
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+import oanda_stub
+from oanda_client import create_session
+from market_data_store import MarketDataStore
+from fetch_forex_data import fetch_candles, sync_all
+
+START = "2024-01-01"
+
+@pytest.fixture
+def session():
+    return create_session("test-token")
+
+def serve(**kwargs):
+    return oanda_stub.serve(port=0, start=kwargs.pop('start', START), **kwargs)
+
+def expected_candles(instrument, granularity, first, last):
+    """Stub candles number `first` to `last` - 1, as the stub formats them."""
+    step = oanda_stub.GRANULARITY_SECONDS[granularity]
+    ohlc = np.array([[float(f"{p:.5f}") for p in oanda_stub._candle(instrument, granularity, i)[:4]]
+                     for i in range(first, last)])
+    times = (pd.Timestamp(START, tz='UTC').value // 10**9 + np.arange(first, last) * step) * 10**9
+    return times, ohlc
+
+def fetch_all(session, stub, since, **kwargs):
+    pages = list(fetch_candles(session, 'EUR_USD', 'M1', since, base_url=stub.url, **kwargs))
+    return np.concatenate(pages) if pages else np.empty(0)
+
+def test_pages_through_complete_candles(session):
+    # 600 complete candles; the one at 10:00 is still forming
+    stub = serve(now="2024-01-01T10:00:30")
+    try:
+        records = fetch_all(session, stub, pd.Timestamp(START, tz='UTC'), include_first=True, page_size=100)
+        assert stub.requests == 7  # Six full pages and the one that reached the forming candle
+    finally:
+        stub.shutdown()
+    times, ohlc = expected_candles('EUR_USD', 'M1', 0, 600)
+    np.testing.assert_array_equal(records['time'], times)
+    np.testing.assert_array_equal(np.column_stack([records[f] for f in ('open', 'high', 'low', 'close')]), ohlc)
+
+def test_since_is_excluded_unless_include_first(session):
+    stub = serve(now="2024-01-01T00:10:00")
+    try:
+        since = pd.Timestamp("2024-01-01T00:05:00", tz='UTC')
+        excluded = fetch_all(session, stub, since)
+        included = fetch_all(session, stub, since, include_first=True)
+    finally:
+        stub.shutdown()
+    np.testing.assert_array_equal(excluded['time'], expected_candles('EUR_USD', 'M1', 6, 10)[0])
+    np.testing.assert_array_equal(included['time'], expected_candles('EUR_USD', 'M1', 5, 10)[0])
+
+def test_rate_limited_requests_are_retried(session):
+    stub = serve(now="2024-01-01T05:00:00", fail_every=2)
+    try:
+        records = fetch_all(session, stub, pd.Timestamp(START, tz='UTC'), include_first=True, page_size=50)
+        assert stub.throttled > 0
+    finally:
+        stub.shutdown()
+    np.testing.assert_array_equal(records['time'], expected_candles('EUR_USD', 'M1', 0, 300)[0])
+
+def test_sync_resumes_after_the_clock_advances(session, tmp_path):
+    # The first sync backfills BACKFILL_DAYS of hourly candles up to the stub's clock
+    now = pd.Timestamp.now(tz='UTC').floor('h') + pd.Timedelta(minutes=30)
+    start = now.floor('D') - pd.Timedelta(days=40)
+    stub = oanda_stub.serve(port=0, start=start.isoformat(), now=now.isoformat())
+    store = MarketDataStore(root=str(tmp_path))
+    instruments = ['EUR_USD', 'GBP_USD']
+    try:
+        written, failed = sync_all(session, store, instruments, ['H1'], base_url=stub.url)
+        assert written and not failed
+        backfilled = {i: len(store.read_array(i, 'H1')) for i in instruments}
+        requests = stub.requests
+
+        stub.advance(5 * 3600)
+        written, failed = sync_all(session, store, instruments, ['H1'], base_url=stub.url)
+        assert written and not failed
+        assert stub.requests - requests == len(instruments)  # One page each, from the stored cursor
+    finally:
+        stub.shutdown()
+
+    for instrument in instruments:
+        times = store.read_array(instrument, 'H1')['time']
+        assert len(times) == backfilled[instrument] + 5
+        np.testing.assert_array_equal(np.diff(times), 3600 * 10**9)  # No duplicate or missing candle
+        assert pd.Timestamp(int(times[-1]), tz='UTC') == now.floor('h') + pd.Timedelta(hours=4)
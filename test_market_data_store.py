@@ -0,0 +1,88 @@
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from market_data_store import MarketDataStore, to_records
+
+def bars(start, periods, freq='h', value=0.0):
+    index = pd.date_range(start, periods=periods, freq=freq, tz='UTC', name='time').as_unit('ns')
+    close = value + np.arange(periods, dtype=np.float64)
+    return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close,
+                         'volume': np.arange(periods)}, index=index)
+
+def test_write_merges_across_partitions_keeping_the_newest_row(tmp_path):
+    store = MarketDataStore(root=str(tmp_path))
+    # 2024-01-01 20:00 to 2024-01-03 03:00 spans three daily partitions
+    first = bars("2024-01-01T20:00", 32)
+    assert len(store.write('EUR_USD', 'H1', first)) == 3
+    assert len(store.days('EUR_USD', 'H1')) == 3
+
+    # Overlaps the last two partitions, adds rows to them and starts a fourth
+    second = bars("2024-01-02T22:00", 36, value=1000.0)
+    assert len(store.write('EUR_USD', 'H1', to_records(second))) == 3
+
+    stored = store.read('EUR_USD', 'H1')
+    expected = pd.concat([first, second])
+    expected = expected[~expected.index.duplicated(keep='last')].sort_index()
+    pd.testing.assert_frame_equal(stored, expected, check_freq=False)
+    assert stored.index.is_unique and stored.index.is_monotonic_increasing
+    assert store.read('EUR_USD', 'H1').loc["2024-01-02T22:00", 'close'] == 1000.0
+
+def test_write_keeps_the_last_of_duplicates_within_a_batch(tmp_path):
+    store = MarketDataStore(root=str(tmp_path))
+    data = pd.concat([bars("2024-01-01", 3), bars("2024-01-01T01:00", 1, value=50.0)])
+    store.write('EUR_USD', 'H1', data)
+    np.testing.assert_array_equal(store.read('EUR_USD', 'H1')['close'], [0.0, 50.0, 2.0])
+
+def test_read_array_range_is_start_inclusive_end_exclusive(tmp_path):
+    store = MarketDataStore(root=str(tmp_path))
+    data = bars("2024-01-01", 24 * 5)
+    store.write('EUR_USD', 'H1', data)
+    times = data.index.as_unit('ns').asi8
+
+    for start, end in [("2024-01-02T05:00", "2024-01-04T07:00"),   # Across partitions
+                       ("2024-01-02T00:00", "2024-01-03T00:00"),   # Exactly one partition
+                       ("2024-01-02T05:30", "2024-01-02T06:30"),   # Between rows
+                       (None, "2024-01-01T03:00"),
+                       ("2024-01-05T20:00", None)]:
+        records = store.read_array('EUR_USD', 'H1', start, end)
+        lo = times >= pd.Timestamp(start, tz='UTC').value if start else True
+        hi = times < pd.Timestamp(end, tz='UTC').value if end else True
+        np.testing.assert_array_equal(records['time'], times[lo & hi])
+        np.testing.assert_array_equal(records['close'], data['close'].to_numpy()[lo & hi])
+
+    assert len(store.read_array('EUR_USD', 'H1', "2025-01-01")) == 0
+    assert len(store.read_array('GBP_USD', 'H1')) == 0
+
+def test_tail_and_last_timestamp(tmp_path):
+    store = MarketDataStore(root=str(tmp_path))
+    assert store.last_timestamp('EUR_USD', 'H1') is None
+    assert store.tail('EUR_USD', 'H1', 5).empty
+
+    data = bars("2024-01-01T12:00", 60)
+    store.write('EUR_USD', 'H1', data)
+    assert store.last_timestamp('EUR_USD', 'H1') == data.index[-1]
+    for n in (1, 12, 30, 60, 100):  # Within the newest partition, across several, and more than stored
+        pd.testing.assert_frame_equal(store.tail('EUR_USD', 'H1', n), data.tail(n), check_freq=False)
+
+def test_interrupted_price_array_export_is_redone(tmp_path, monkeypatch):
+    store = MarketDataStore(root=str(tmp_path / "store"))
+    cache_dir = str(tmp_path / "arrays")
+    store.write('EUR_USD', 'H1', bars("2024-01-01", 24))
+    assert len(store.load_price_array('EUR_USD', 'H1', with_features=False, cache_dir=cache_dir).prices) == 24
+
+    # Crash after replacing the prices but before the times and the '.json' commit marker
+    store.write('EUR_USD', 'H1', bars("2024-01-02", 24))
+    real_replace = os.replace
+    def replace(source, target):
+        if target.endswith('.time.npy'):
+            raise OSError("interrupted")
+        real_replace(source, target)
+    monkeypatch.setattr(os, 'replace', replace)
+    with pytest.raises(OSError):
+        store.load_price_array('EUR_USD', 'H1', with_features=False, cache_dir=cache_dir)
+    monkeypatch.undo()
+
+    loaded = store.load_price_array('EUR_USD', 'H1', with_features=False, cache_dir=cache_dir)
+    assert len(loaded.prices) == len(loaded.times) == 48
+    np.testing.assert_array_equal(loaded.times, bars("2024-01-01", 48).index.asi8)
@@ -0,0 +1,33 @@
+import numpy as np
+import gymnasium as gym
+from gymnasium import spaces
+from stable_baselines3 import PPO
+from numpy_policy import NumpyPolicy, export_policy, check_parity
+
+class TinyEnv(gym.Env):
+    """Smallest env with the live policy's spaces: a Box observation and three discrete actions."""
+    observation_space = spaces.Box(-np.inf, np.inf, shape=(12,), dtype=np.float32)
+    action_space = spaces.Discrete(3)
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        return np.zeros(12, dtype=np.float32), {}
+
+    def step(self, action):
+        return np.zeros(12, dtype=np.float32), 0.0, True, False, {}
+
+def test_exported_policy_matches_ppo_predict(tmp_path):
+    model = PPO('MlpPolicy', TinyEnv(), seed=0, device='cpu')
+    path = str(tmp_path / 'policy.npz')
+    export_policy(model, path)
+    policy = NumpyPolicy.load(path)
+
+    observations = np.random.default_rng(0).standard_normal((2000, 12)).astype(np.float32)
+    match, logit_error = check_parity(model, policy, observations)
+    assert match == 1.0
+    assert logit_error < 1e-5
+
+    # A single observation gives a single action, like PPO.predict
+    action, _ = policy.predict(observations[0], deterministic=True)
+    expected, _ = model.predict(observations[0], deterministic=True)
+    assert action.shape == () and action == expected
@@ -0,0 +1,72 @@
+import math
+import numpy as np
+import pytest
+from performance_tracker import PerformanceTracker, DrawdownWindow
+
+def expected_metrics(profits):
+    """Metrics of a run of trade results computed directly with numpy (ratios undefined on it are 0)."""
+    n = len(profits)
+    wins, losses = profits[profits > 0], profits[profits <= 0]
+    equity = np.concatenate([[0.0], np.cumsum(profits)])
+    std = profits.std(ddof=1) if n > 1 else 0.0
+    downside = math.sqrt((losses ** 2).sum() / n)
+    if losses.sum() < 0:
+        profit_factor = wins.sum() / -losses.sum()
+    else:
+        profit_factor = math.inf if wins.sum() > 0 else 0.0
+    return {
+        "trades": n,
+        "win_rate": len(wins) / n,
+        "average_profit": wins.sum() / n,
+        "average_loss": losses.sum() / n,
+        "total_pnl": profits.sum(),
+        "profit_factor": profit_factor,
+        "sharpe": profits.mean() / std if std > 0 else 0.0,
+        "sortino": profits.mean() / downside if downside > 0 else 0.0,
+        "max_drawdown": (np.maximum.accumulate(equity) - equity).max(),
+    }
+
+def assert_metrics(metrics, profits):
+    expected = expected_metrics(profits)
+    for key, value in expected.items():
+        assert metrics[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+
+def make_trades(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    profits = rng.normal(0.0, 1.0, n) + 0.05
+    profits[rng.random(n) < 0.05] = 0.0  # Break-even trades count as losses, as in the tracker
+    times = np.cumsum(rng.exponential(5.0, n))
+    return profits, times
+
+def test_all_time_and_rolling_metrics_match_numpy():
+    profits, times = make_trades()
+    tracker = PerformanceTracker(window_trades=100, window_seconds=600)
+    for i, (profit, timestamp) in enumerate(zip(profits, times)):
+        tracker.log_trade(float(profit), float(timestamp))
+        if i % 997 == 0 or i == len(profits) - 1:
+            metrics = tracker.calculate_metrics()
+            assert_metrics(metrics, profits[:i + 1])
+            assert_metrics(metrics["last_trades"], profits[max(i - 99, 0):i + 1])
+            in_period = (times[:i + 1] > timestamp - 600)
+            assert_metrics(metrics["last_period"], profits[:i + 1][in_period])
+    assert tracker.count == len(profits)
+
+def test_time_window_evicts_on_calculate_metrics():
+    tracker = PerformanceTracker(window_seconds=60)
+    for t, profit in enumerate([1.0, -2.0, 3.0, -0.5]):
+        tracker.log_trade(profit, timestamp=t * 30)
+    metrics = tracker.calculate_metrics(now=100)
+    assert_metrics(metrics["last_period"], np.array([3.0, -0.5]))  # Trades at or before now - 60 are dropped
+    assert_metrics(metrics, np.array([1.0, -2.0, 3.0, -0.5]))
+    assert tracker.calculate_metrics(now=1000)["last_period"]["trades"] == 0
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64])
+def test_drawdown_window_matches_numpy(size):
+    profits, times = make_trades(2000, seed=size)
+    window = DrawdownWindow(max_trades=size)
+    for i, (profit, timestamp) in enumerate(zip(profits, times)):
+        window.add(float(profit), float(timestamp))
+        recent = profits[max(i - size + 1, 0):i + 1]
+        equity = np.concatenate([[0.0], np.cumsum(recent)])
+        assert len(window) == len(recent)
+        assert window.max_drawdown() == pytest.approx((np.maximum.accumulate(equity) - equity).max(), abs=1e-9)
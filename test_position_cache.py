@@ -0,0 +1,98 @@
+import time
+import pytest
+import oanda_stub
+import position_cache
+from oanda_client import OandaAPI
+from position_cache import PositionCache
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+@pytest.fixture
+def stub():
+    server = oanda_stub.serve(port=0, heartbeat=0.2)
+    yield server
+    server.shutdown()
+
+@pytest.fixture
+def api(stub):
+    client = OandaAPI("test-token", "test-account", base_url=stub.url, stream_url=stub.url)
+    yield client
+    client.close()
+
+def open_trade(api, cache, instrument, units=1000):
+    response = api.place_order({"instrument": instrument, "units": units, "type": "MARKET"})
+    cache.apply_response(response)
+    return response['orderFillTransaction']['tradeOpened']['tradeID']
+
+def server_trade_ids(api):
+    return sorted(trade['id'] for trade in api.fetch_open_trades()[0])
+
+def test_apply_response_tracks_our_orders(stub, api):
+    cache = PositionCache()
+    cache.reconcile(api)
+    first = open_trade(api, cache, "EUR_USD")
+    second = open_trade(api, cache, "GBP_USD", -500)
+    third = open_trade(api, cache, "EUR_USD", 250)
+    assert [trade['id'] for trade in cache.open_trades()] == [third, second, first]
+    assert cache.position("EUR_USD") == 1250 and cache.position("GBP_USD") == -500
+
+    response = api.close_trade(first)
+    cache.apply_response(response)
+    cache.apply_response(response)  # A repeated transaction is applied once
+    cache.apply_response(None)
+    assert sorted(trade['id'] for trade in cache.open_trades()) == server_trade_ids(api)
+    assert cache.balance == pytest.approx(stub.balance)
+
+def test_stream_closes_and_reconcile_after_a_dropped_stream(stub, api, monkeypatch):
+    monkeypatch.setattr(position_cache, 'STREAM_RETRY_DELAY', 0.1)
+    cache = PositionCache()
+    cache.start(api, interval=3600)  # Only the initial and the reconnect reconciliations
+    try:
+        # Orders placed by another client only reach the cache on the stream; retry until it is connected
+        def order_seen_on_stream():
+            _, response = stub.create_order({"instrument": "USD_CHF", "units": 100})
+            trade_id = response['orderFillTransaction']['tradeOpened']['tradeID']
+            seen = wait_until(lambda: any(trade['id'] == trade_id for trade in cache.open_trades()), timeout=0.5)
+            stub.trigger_close(trade_id)
+            return seen
+        assert wait_until(order_seen_on_stream)
+        assert wait_until(lambda: cache.position("USD_CHF") == 0)
+
+        ids = [open_trade(api, cache, instrument) for instrument in ("EUR_USD", "GBP_USD", "USD_JPY")]
+
+        # A stop loss filled server-side arrives on the transaction stream
+        stub.trigger_close(ids[0])
+        assert wait_until(lambda: [trade['id'] for trade in cache.open_trades()] == [ids[2], ids[1]])
+        assert cache.balance == pytest.approx(stub.balance)
+
+        # A fill while the stream is down is repaired by the reconciliation after it reconnects
+        stub.drop_streams()
+        stub.trigger_close(ids[1])
+        assert wait_until(lambda: cache.reconciliations >= 2)
+        assert wait_until(lambda: [trade['id'] for trade in cache.open_trades()] == [ids[2]])
+        assert cache.balance == pytest.approx(stub.balance)
+
+        cache.apply_response(api.close_trade(ids[2]))
+        assert cache.open_trades() == [] and server_trade_ids(api) == []
+        assert cache.balance == pytest.approx(stub.balance)
+    finally:
+        cache.stop()
+
+def test_reconcile_replays_transactions_newer_than_the_snapshot(stub, api):
+    cache = PositionCache()
+    cache.reconcile(api)
+    trade_id = open_trade(api, cache, "EUR_USD")
+    snapshot = api.fetch_account()
+
+    # An order filling between the snapshot and its processing must survive it
+    newer = open_trade(api, cache, "GBP_USD")
+    api.fetch_account = lambda: snapshot
+    cache.reconcile(api)
+    assert sorted(trade['id'] for trade in cache.open_trades()) == sorted([trade_id, newer])
+    assert cache.snapshot_id == int(snapshot[1])
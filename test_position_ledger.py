@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from position_ledger import PositionLedger
+
+SPREAD = 0.0002
+
+def brute_unrealized(ledger, price):
+    """Mark every open position to `price` one by one."""
+    pnl = np.zeros(ledger.num_accounts)
+    for account in range(ledger.num_accounts):
+        for slot in np.flatnonzero(ledger.active[account]):
+            pnl[account] += ledger.units[account, slot] * (price[account] - ledger.entry_price[account, slot])
+    return pnl
+
+def test_open_fills_at_the_spread_and_respects_capacity():
+    ledger = PositionLedger(num_accounts=3, capacity=2, spread=SPREAD, commission=0.01)
+    price = np.array([1.1, 1.2, 1.3])
+    opened = ledger.open(np.array([True, True, False]), 1000, price, stop_loss_distance=0.001, take_profit_distance=0.002)
+    np.testing.assert_array_equal(opened, [0, 1])
+    np.testing.assert_allclose(ledger.entry_price[[0, 1], 0], price[:2] + SPREAD / 2)
+    np.testing.assert_allclose(ledger.stop_loss[[0, 1], 0], price[:2] + SPREAD / 2 - 0.001)
+    np.testing.assert_allclose(ledger.take_profit[[0, 1], 0], price[:2] + SPREAD / 2 + 0.002)
+    np.testing.assert_allclose(ledger.realized_pnl, [-10, -10, 0])  # Commission on open
+
+    ledger.open(np.ones(3, dtype=bool), -500, price)
+    np.testing.assert_allclose(ledger.entry_price[[0, 1], 1], price[:2] - SPREAD / 2)
+    assert np.isnan(ledger.stop_loss[0, 1]) and np.isnan(ledger.take_profit[0, 1])
+    np.testing.assert_array_equal(ledger.open_count, [2, 2, 1])
+    np.testing.assert_allclose(ledger.net_units, [500, 500, -500])
+
+    # Full accounts are skipped
+    np.testing.assert_array_equal(ledger.open(np.ones(3, dtype=bool), 100, price), [2])
+
+@pytest.mark.parametrize("units, high, low, exit_price", [
+    (1000, 1.1005, 1.0980, 1.0990),    # Long stopped out
+    (1000, 1.1025, 1.1000, 1.1020),    # Long takes profit
+    (1000, 1.1025, 1.0980, 1.0990),    # Both touched: the stop loss fills first
+    (-1000, 1.1015, 1.0995, 1.1010),   # Short stopped out
+    (-1000, 1.1005, 1.0975, 1.0980),   # Short takes profit
+])
+def test_check_exits_fills_at_the_exit_level(units, high, low, exit_price):
+    ledger = PositionLedger(spread=0.0)
+    ledger.open(np.array([True]), units, np.array([1.1]), stop_loss_distance=0.001, take_profit_distance=0.002)
+    np.testing.assert_array_equal(ledger.check_exits(np.array([high]), np.array([low])), [0])
+    assert ledger.open_count[0] == 0 and ledger.closed_trades[0] == 1
+    assert ledger.realized_pnl[0] == pytest.approx(units * (exit_price - 1.1))
+    assert ledger.unrealized_pnl(np.array([1.2]))[0] == pytest.approx(0)
+
+def test_check_exits_closes_only_the_positions_touched():
+    ledger = PositionLedger(num_accounts=2, spread=0.0)
+    both = np.ones(2, dtype=bool)
+    ledger.open(both, 1000, np.array([1.1, 1.1]), stop_loss_distance=0.001)
+    ledger.open(both, -1000, np.array([1.1, 1.1]), stop_loss_distance=0.003)
+    closed = ledger.check_exits(np.array([1.1010, 1.1040]), np.array([1.0985, 1.1000]))
+    np.testing.assert_array_equal(closed, [0, 1])
+    np.testing.assert_array_equal(ledger.open_count, [1, 1])  # Account 0 lost its long, account 1 its short
+    assert ledger.units[0, 1] == -1000 and ledger.units[1, 0] == 1000
+    np.testing.assert_allclose(ledger.realized_pnl, [1000 * -0.001, -1000 * 0.003])
+
+    # The exit levels were refreshed from the remaining positions
+    assert ledger.check_exits(np.array([1.1010, 1.1010]), np.array([1.0995, 1.0995])).size == 0
+    np.testing.assert_array_equal(ledger.check_exits(np.array([1.1030, 1.1]), np.array([1.1, 1.0990])), [0, 1])
+
+def test_close_all_and_unrealized_pnl_with_mixed_positions():
+    ledger = PositionLedger(num_accounts=3, spread=SPREAD, commission=0.001)
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        mask = rng.random(3) < 0.7
+        ledger.open(mask, float(rng.choice([-1, 1]) * rng.integers(100, 5000)), 1.1 + rng.normal(0, 0.01, 3))
+    price = 1.1 + rng.normal(0, 0.01, 3)
+    np.testing.assert_allclose(ledger.unrealized_pnl(price), brute_unrealized(ledger, price), atol=1e-9)
+
+    # Longs sell at the bid and shorts buy back at the ask, paying commission again
+    units = ledger.units.copy()
+    realized = ledger.realized_pnl.copy()
+    flatten = np.array([True, True, False])
+    ledger.close_all(flatten, price)
+    expected = (units * (price[:, None] - np.sign(units) * SPREAD / 2 - ledger.entry_price)
+                - 0.001 * np.abs(units)).sum(axis=1)
+    np.testing.assert_allclose(ledger.realized_pnl[:2], realized[:2] + expected[:2])
+    np.testing.assert_array_equal(ledger.open_count[:2], 0)
+    np.testing.assert_allclose(ledger.unrealized_pnl(price)[:2], 0, atol=1e-9)
+    np.testing.assert_allclose(ledger.unrealized_pnl(price)[2], brute_unrealized(ledger, price)[2])
@@ -0,0 +1,72 @@
+import json
+import threading
+from pubsub import Channel
+
+def drain(subscription):
+    events = []
+    while (event := subscription.get(timeout=0)) is not None:
+        events.append(event)
+    return events
+
+def test_full_queue_drops_the_oldest_events():
+    channel = Channel(max_queue=3)
+    fast, slow = channel.subscribe(), channel.subscribe()
+    channel.publish('a')
+    assert fast.get(timeout=0) == (1, 'a')
+    for data in 'bcde':
+        channel.publish(data)
+
+    # The publisher never blocks; the slow subscriber keeps the newest events and counts the rest
+    assert drain(slow) == [(3, 'c'), (4, 'd'), (5, 'e')]
+    assert slow.dropped == 2
+    assert drain(fast) == [(3, 'c'), (4, 'd'), (5, 'e')]
+    assert fast.dropped == 1
+    assert slow.get(timeout=0.01) is None
+
+def test_resume_from_last_event_id():
+    channel = Channel(history=5, max_queue=10)
+    for i in range(8):
+        channel.publish(i)
+
+    # Header values are strings; the kept events after the id are replayed, then live ones follow
+    with channel.subscribe(last_event_id='5') as subscription:
+        channel.publish(8)
+        assert drain(subscription) == [(6, 5), (7, 6), (8, 7), (9, 8)]
+    assert channel.subscribers() == 0
+
+    # Only the last `history` events can be replayed
+    with channel.subscribe(last_event_id=1) as subscription:
+        assert [event_id for event_id, _ in drain(subscription)] == [5, 6, 7, 8, 9]
+
+    # Up to date, unknown and future ids resume from the next published event
+    for last_event_id in (9, None, 'x', 100):
+        with channel.subscribe(last_event_id=last_event_id) as subscription:
+            assert drain(subscription) == []
+            channel.publish('next')
+            assert drain(subscription) == [(channel.last_id, 'next')]
+
+def test_replay_is_bounded_by_the_queue():
+    channel = Channel(history=10, max_queue=3)
+    for i in range(6):
+        channel.publish(i)
+    with channel.subscribe(last_event_id=0) as subscription:
+        assert drain(subscription) == [(4, 3), (5, 4), (6, 5)]
+
+def test_encoder_runs_once_per_event():
+    calls = []
+    def encoder(data):
+        calls.append(data)
+        return json.dumps(data)
+    channel = Channel(encoder=encoder)
+    first, second = channel.subscribe(), channel.subscribe()
+    channel.publish({'price': 1.1})
+    assert first.get(timeout=0) == second.get(timeout=0) == (1, '{"price": 1.1}')
+    assert calls == [{'price': 1.1}]
+
+def test_get_waits_for_a_publish():
+    channel = Channel()
+    subscription = channel.subscribe()
+    timer = threading.Timer(0.05, channel.publish, args=('late',))
+    timer.start()
+    assert subscription.get(timeout=5) == (1, 'late')
+    timer.join()
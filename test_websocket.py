@@ -10,9 +10,10 @@ def connect():
 def disconnect():
     print('Disconnected from server')
 
-@sio.on('market_data')
-def on_market_data(data):
-    print(f"Received: {data['pair']} - Bid: {data['bid']}, Ask: {data['ask']}")
+@sio.on('market_data_batch')
+def on_market_data_batch(ticks):
+    for tick in ticks:
+        print(f"Received: {tick['instrument']} - Bid: {tick['bid']}, Ask: {tick['ask']}")
 
 try:
     sio.connect('http://localhost:5001')
@@ -1,15 +1,24 @@
 from trading_strategy import should_enter_trade, should_exit_trade
-from utils.telegram_notifications import TelegramNotifier, TelegramBot
 from utils.secrets import read_secret
-from oanda_client import OandaAPI
+from utils.lazy import lazy_singleton
+from utils.telegram_notifications import get_notifier
 import logging
 
 logger = logging.getLogger(__name__)
 
-notifier = TelegramNotifier()
+@lazy_singleton
+def get_oanda_api():
+    """OANDA API client, created (and its secrets read) on first use."""
+    from oanda_client import OandaAPI
+    return OandaAPI(access_token=read_secret('oanda_access_token'), account_id=read_secret('oanda_account_id'))
 
-# Initialize the OANDA API client
-oanda_api = OandaAPI(access_token=read_secret('oanda_access_token'), account_id=read_secret('oanda_account_id'))
+@lazy_singleton
+def get_position_cache():
+    """Open trades and balance of the account, kept in memory and reconciled in the background."""
+    from position_cache import PositionCache
+    cache = PositionCache()
+    cache.start(get_oanda_api())
+    return cache
 
 def execute_trade(market_data, account_balance, risk_percentage=0.02):
     """
@@ -37,12 +46,13 @@ def execute_trade(market_data, account_balance, risk_percentage=0.02):
         }
         
         # Place order through OANDA API
-        response = oanda_api.place_order(order_request)
+        response = get_oanda_api().place_order(order_request)
+        get_position_cache().apply_response(response)
         
         if response and response.get('orderFillTransaction'):
             filled_price = float(response['orderFillTransaction']['price'])
             logger.info(f"Trade executed at {filled_price}")
-            notifier.send_trade_alert('BUY', market_data['instrument'], filled_price, stop_loss, take_profit)
+            get_notifier().send_trade_alert('BUY', market_data['instrument'], filled_price, stop_loss, take_profit)
             return filled_price, stop_loss, take_profit
         else:
             logger.error(f"Failed to execute trade: {response}")
@@ -55,13 +65,14 @@ def close_trade(market_data, entry_price, stop_loss, take_profit, account_balanc
     Close an existing OANDA trade based on stop loss or take profit levels
     """
     if market_data['bid'] <= stop_loss or market_data['bid'] >= take_profit:
-        # Get open trade ID from OANDA
-        open_trades = oanda_api.get_open_trades()
+        # Get open trade ID from the local position cache (no REST round trip)
+        open_trades = get_position_cache().open_trades(market_data['instrument'])
         if open_trades:
             trade_id = open_trades[0]['id']  # Assuming single trade management
             
             # Close the trade through OANDA API
-            response = oanda_api.close_trade(trade_id)
+            response = get_oanda_api().close_trade(trade_id)
+            get_position_cache().apply_response(response)
             
             if response and response.get('orderFillTransaction'):
                 exit_price = float(response['orderFillTransaction']['price'])
@@ -69,7 +80,7 @@ def close_trade(market_data, entry_price, stop_loss, take_profit, account_balanc
                 account_balance += profit
                 
                 logger.info(f"Trade closed at {exit_price} with profit {profit}")
-                notifier.send_trade_result('SELL', market_data['instrument'], entry_price, exit_price, profit, 0)
+                get_notifier().send_trade_result('SELL', market_data['instrument'], entry_price, exit_price, profit, 0)
                 return True, account_balance
                 
         logger.error("Failed to close trade")
@@ -120,10 +131,12 @@ class TradeExecutor:
             logging.error(f"Configuration error: {e}")
             raise
 
+        from oanda_client import OandaAPI
         self.api = OandaAPI(access_token=access_token, account_id=account_id)
         self.account_id = account_id
         
         self.telegram_bot = None
         if config.get('telegram'):
+            from utils.telegram_notifications import TelegramBot
             self.telegram_bot = TelegramBot(telegram_token, 
                                           config['telegram']['chat_id'])
\ No newline at end of file
@@ -0,0 +1,249 @@
+import os
+import csv
+import queue
+import sqlite3
+import logging
+import threading
+from utils.lazy import lazy_singleton
+
+JOURNAL_FILE = os.path.join('data', 'trades.db')
+LEGACY_TRADES_FILE = os.path.join('data', 'trades.csv')  # Imported once into an empty journal
+MAX_QUEUE = 100000        # Trades waiting to be written before `append` refuses more
+COMMIT_BATCH = 1000       # Most trades written per transaction (group commit)
+SYNCHRONOUS = 'FULL'      # SQLite synchronous mode: FULL syncs the WAL to disk on every commit
+TRADE_FIELDS = ['trade_id', 'instrument', 'units', 'type', 'price', 'timestamp']
+NUMERIC_FIELDS = ('units', 'price')
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    seq INTEGER PRIMARY KEY,
+    trade_id TEXT,
+    instrument TEXT,
+    units REAL,
+    type TEXT,
+    price REAL,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS trades_trade_id ON trades (trade_id);
+CREATE INDEX IF NOT EXISTS trades_timestamp ON trades (timestamp);
+"""
+INSERT = f"INSERT INTO trades ({', '.join(TRADE_FIELDS)}) VALUES ({', '.join('?' * len(TRADE_FIELDS))})"
+
+def trade_row(trade):
+    """
+    Convert a trade to a journal row, checking every field is a scalar SQLite can store.
+
+    Parameters:
+    - trade (dict): Trade with the TRADE_FIELDS keys; missing ones are stored as null.
+
+    Returns:
+    - tuple: Field values in TRADE_FIELDS order, 'units' and 'price' as floats and the others as strings.
+
+    Raises:
+    - ValueError: If the trade isn't a dict, a field isn't a string or number, or
+      'units' or 'price' isn't numeric.
+    """
+    if not isinstance(trade, dict):
+        raise ValueError(f"Trade must be an object, got {type(trade).__name__}")
+    row = []
+    for field in TRADE_FIELDS:
+        value = trade.get(field)
+        if value is not None:
+            if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+                raise ValueError(f"Trade {field} must be a string or number, got {type(value).__name__}")
+            if field in NUMERIC_FIELDS:
+                try:
+                    value = float(value)
+                except (ValueError, OverflowError):
+                    raise ValueError(f"Trade {field} must be numeric, got {value!r}") from None
+            else:
+                value = str(value)
+        row.append(value)
+    return tuple(row)
+
+class TradeJournal:
+    """
+    Append-only journal of trades in an SQLite database in WAL mode.
+
+    `append` only queues the trade, so callers such as Socket.IO handlers
+    never wait for the disk; when the queue is full it refuses the trade
+    instead of blocking. A single writer thread drains the queue and
+    writes everything pending, up to COMMIT_BATCH trades, in one
+    transaction, so a burst costs one sync per batch rather than one per
+    trade. Readers use their own connections and aren't blocked by the
+    writer. Committed trades survive a crash of the process (and, with
+    SYNCHRONOUS = 'FULL', of the machine); SQLite rolls back a transaction
+    interrupted by a crash when the journal is next opened.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, max_queue=MAX_QUEUE, legacy_csv=LEGACY_TRADES_FILE):
+        """
+        Parameters:
+        - path (str, optional): Database file. Defaults to JOURNAL_FILE.
+        - max_queue (int, optional): Trades waiting to be written before `append` refuses more. Defaults to MAX_QUEUE.
+        - legacy_csv (str, optional): trades.csv imported if the journal is empty. Defaults to LEGACY_TRADES_FILE.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        self.last_seq = connection.execute("SELECT COALESCE(MAX(seq), 0) FROM trades").fetchone()[0]
+        if self.last_seq == 0 and legacy_csv and os.path.exists(legacy_csv):
+            self.last_seq = self._import_csv(connection, legacy_csv)
+        self._writer_connection = connection
+        self.stats = {'written': 0, 'commits': 0, 'largest_commit': 0}
+        self._queue = queue.Queue(max_queue)
+        self._submitted = 0
+        self._committed = 0
+        self._committed_changed = threading.Condition()
+        self._closed = False
+        self._local = threading.local()
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+        return connection
+
+    @staticmethod
+    def _import_csv(connection, path):
+        with open(path, newline='') as f:
+            rows = [tuple(row.get(field) or None for field in TRADE_FIELDS) for row in csv.DictReader(f)]
+        connection.execute("BEGIN")
+        connection.executemany(INSERT, rows)
+        connection.execute("COMMIT")
+        logger.info(f"Imported {len(rows)} trades from {path}")
+        return len(rows)
+
+    def append(self, trade):
+        """
+        Queue a trade for writing and return at once.
+
+        Parameters:
+        - trade (dict): Trade with the TRADE_FIELDS keys; missing ones are stored as null.
+
+        Raises:
+        - ValueError: If the trade can't be stored (see `trade_row`); nothing is queued.
+        - RuntimeError: If the journal is closed or `max_queue` trades are already waiting.
+        """
+        row = trade_row(trade)
+        with self._committed_changed:
+            if self._closed:
+                raise RuntimeError("Trade journal is closed")
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                raise RuntimeError("Trade journal is busy, try again later") from None
+            self._submitted += 1
+
+    def _write(self):
+        connection = self._writer_connection
+        while True:
+            rows = [self._queue.get()]
+            while len(rows) < COMMIT_BATCH:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in rows  # close() was called; no trade is queued after its sentinel
+            rows = [row for row in rows if row is not None]
+            if rows:
+                written = self._commit(connection, rows)
+                if not written and len(rows) > 1:
+                    # Don't let one bad row lose the batch: write the rows one by one
+                    written = sum(self._commit(connection, [row]) for row in rows)
+                with self._committed_changed:
+                    if written:
+                        self.last_seq = connection.execute("SELECT MAX(seq) FROM trades").fetchone()[0]
+                        self.stats['written'] += written
+                        self.stats['commits'] += 1
+                        self.stats['largest_commit'] = max(self.stats['largest_commit'], written)
+                    self._committed += len(rows)
+                    self._committed_changed.notify_all()
+            if stop:
+                return
+
+    @staticmethod
+    def _commit(connection, rows):
+        # Write rows in one transaction; returns how many were written (all or none)
+        try:
+            connection.execute("BEGIN")
+            connection.executemany(INSERT, rows)
+            connection.execute("COMMIT")
+            return len(rows)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write {len(rows)} trade(s) to the journal: {e}")
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            return 0
+
+    def flush(self, timeout=None):
+        """
+        Wait until every trade appended so far is committed (or failed).
+
+        Returns:
+        - bool: True if they were, False on timeout.
+        """
+        with self._committed_changed:
+            target = self._submitted
+            return self._committed_changed.wait_for(lambda: self._committed >= target, timeout)
+
+    def close(self):
+        """Write the queued trades and stop the writer thread; later appends raise RuntimeError."""
+        with self._committed_changed:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._writer_connection.close()
+
+    def _reader(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+        return connection
+
+    def query(self, trade_id=None, start=None, end=None, limit=None):
+        """
+        Read committed trades, oldest first.
+
+        Parameters:
+        - trade_id (str, optional): Only the entries of this trade.
+        - start (str, optional): Only trades at or after this ISO timestamp.
+        - end (str, optional): Only trades before this ISO timestamp.
+        - limit (int, optional): Only the newest `limit` matching trades.
+
+        Returns:
+        - list of dict: Trades with the TRADE_FIELDS keys.
+        """
+        conditions, parameters = [], []
+        if trade_id is not None:
+            conditions.append("trade_id = ?")
+            parameters.append(str(trade_id))
+        if start is not None:
+            conditions.append("timestamp >= ?")
+            parameters.append(start)
+        if end is not None:
+            conditions.append("timestamp < ?")
+            parameters.append(end)
+        columns = ', '.join(TRADE_FIELDS)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        if limit is not None:
+            sql = (f"SELECT {columns} FROM (SELECT seq, {columns} FROM trades{where} ORDER BY seq DESC LIMIT ?) "
+                   f"ORDER BY seq")
+            parameters.append(int(limit))
+        else:
+            sql = f"SELECT {columns} FROM trades{where} ORDER BY seq"
+        return [dict(row) for row in self._reader().execute(sql, parameters)]
+
+@lazy_singleton
+def get_trade_journal():
+    return TradeJournal()
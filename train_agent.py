@@ -1,23 +1,36 @@
+import argparse
 import gym
 import numpy as np
 from stable_baselines3 import PPO
-from stable_baselines3.common.env_checker import check_env
-from forex_env import ForexEnv  # Replace with the actual path to your custom environment
+from stable_baselines3.common.vec_env import VecMonitor
+from parallel_forex_env import make_forex_vec_env
+from market_data_store import MarketDataStore
+from numpy_policy import export_policy, POLICY_PATH
 
 # Configuration
 MODEL_SAVE_PATH = "ppo_forex_agent"
+INSTRUMENT = "EUR_USD"
+GRANULARITY = "M1"
 TOTAL_TIMESTEPS = 100000  # Adjust as needed
+NUM_ENVS = 8  # Episodes stepped together in one NumPy call
+WORKERS = 1  # Processes the episodes are split across (0 = all cores)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the PPO Forex agent.")
+    parser.add_argument('--num-envs', type=int, default=NUM_ENVS, help="Parallel training episodes")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="Environment worker processes (0 = all cores)")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible runs")
+    parser.add_argument('--timesteps', type=int, default=TOTAL_TIMESTEPS, help="Total training timesteps")
+    return parser.parse_args()
 
 def main():
-    # Initialize the custom Forex trading environment
-    env = ForexEnv()
-    
-    # Optional: Check the environment for any issues
-    check_env(env, warn=True)
-    
-    # Optionally, wrap the environment for better performance
-    # from stable_baselines3.common.sb2_vec_env import DummyVecEnv
-    # env = DummyVecEnv([lambda: env])
+    args = parse_args()
+
+    # Memory-map the historical data (with technical indicators) the environments replay
+    data = MarketDataStore().load_price_array(INSTRUMENT, GRANULARITY)
+
+    # Initialize the vectorized Forex trading environment
+    env = VecMonitor(make_forex_vec_env(data, num_envs=args.num_envs, workers=args.workers, seed=args.seed))
     
     # Initialize the PPO agent
     model = PPO(
@@ -26,23 +39,28 @@ def main():
         verbose=1,
         tensorboard_log="./ppo_forex_tensorboard/",
         learning_rate=3e-4,
-        n_steps=2048,
+        n_steps=max(2048 // args.num_envs, 1),  # Keep the rollout size independent of --num-envs
         batch_size=64,
         n_epochs=10,
         gamma=0.99,
         gae_lambda=0.95,
         clip_range=0.2,
         ent_coef=0.0,
+        seed=args.seed,
     )
     
     # Train the agent
     print("Starting training...")
-    model.learn(total_timesteps=TOTAL_TIMESTEPS)
+    model.learn(total_timesteps=args.timesteps)
     print("Training completed.")
     
     # Save the trained model
     model.save(MODEL_SAVE_PATH)
     print(f"Model saved to {MODEL_SAVE_PATH}.zip")
+
+    # Export the policy for torch-free inference in live trading
+    export_policy(model, POLICY_PATH)
+    print(f"Policy exported to {POLICY_PATH}")
     
     # Optional: Save the environment (if needed)
     env.close()
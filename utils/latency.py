@@ -0,0 +1,86 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Bucket upper bounds in seconds: 100 µs to ~100 s, 10 buckets per decade
+BUCKET_BOUNDS = [1e-4 * 10 ** (i / 10) for i in range(61)]
+
+class LatencyHistogram:
+    """
+    Thread-safe histogram of call latencies with logarithmic buckets.
+
+    Recording is O(1) memory and O(log buckets) time, so it can stay enabled
+    in production. Percentiles are resolved to the upper bound of their
+    bucket, i.e. within about 26% of the true value.
+    """
+
+    def __init__(self, bounds=BUCKET_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last bucket holds everything above bounds[-1]
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """
+        Add one latency sample.
+
+        Args:
+            seconds (float): Measured latency in seconds
+        """
+        i = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    @contextmanager
+    def time(self):
+        """Record the wall-clock duration of the `with` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - start)
+
+    def percentile(self, q):
+        """
+        Estimate a latency percentile.
+
+        Args:
+            q (float): Percentile between 0 and 100
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile, in seconds (0 if empty)
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q / 100 * self.count
+            seen = 0
+            for i, n in enumerate(self.counts):
+                seen += n
+                if n and seen >= rank:
+                    return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+            return self.max
+
+    def summary(self):
+        """
+        Summarize the recorded latencies.
+
+        Returns:
+            dict: count, and mean, p50, p90, p99 and max in milliseconds
+        """
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            'count': self.count,
+            'mean_ms': mean * 1000,
+            'p50_ms': self.percentile(50) * 1000,
+            'p90_ms': self.percentile(90) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': self.max * 1000,
+        }
@@ -0,0 +1,30 @@
+import threading
+import functools
+
+def lazy_singleton(factory):
+    """
+    Turn a zero-argument factory into an accessor that builds its object on first call.
+
+    The object is created once, under a lock, and shared by every later call,
+    so modules can expose clients (API sessions, notifiers) without reading
+    secrets or importing heavy dependencies at import time.
+
+    Args:
+        factory: Function creating the object
+
+    Returns:
+        callable: Accessor returning the shared object
+    """
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(factory)
+    def get():
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    get.initialized = lambda: bool(instance)
+    return get
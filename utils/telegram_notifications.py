@@ -1,12 +1,256 @@
 import os
 import requests
 import logging
+import threading
+from collections import deque
 from typing import Optional
+from requests.adapters import HTTPAdapter
 from utils.secrets import read_secret
+from utils.lazy import lazy_singleton
 import time
 
 logger = logging.getLogger(__name__)
 
+# Telegram Bot API (override with a local stub, e.g. http://127.0.0.1:8082, for testing)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+REQUEST_TIMEOUT = 10        # Seconds per sendMessage request
+MAX_QUEUE = 100             # Messages waiting to be sent before the overflow policy applies
+OVERFLOW_POLICY = 'drop_oldest'  # Or 'drop_newest': what to discard when the queue is full
+COALESCE_SECONDS = 0.5      # Time to wait for more messages to merge into one
+MAX_MESSAGE_LENGTH = 4096   # Telegram's limit on the length of one message
+RATE_PER_SECOND = 1.0       # Sustained messages per second (Telegram allows about 1 per chat)
+BURST = 3                   # Messages that may be sent back to back after a quiet period
+MAX_ATTEMPTS = 3            # Sends of one message on network and server errors before dropping it
+MAX_RATE_LIMITED = 5        # 429 answers to one message before dropping it
+
+def split_message(text, limit=MAX_MESSAGE_LENGTH):
+    """
+    Split a message into parts of at most `limit` characters, at line breaks.
+
+    Only a single line longer than `limit` is cut inside the line.
+
+    Returns:
+        list: The parts, in order
+    """
+    parts = []
+    current = None
+    for line in text.split('\n'):
+        while len(line) > limit:
+            if current is not None:
+                parts.append(current)
+                current = None
+            parts.append(line[:limit])
+            line = line[limit:]
+        if current is not None and len(current) + 1 + len(line) <= limit:
+            current += '\n' + line
+        else:
+            if current is not None:
+                parts.append(current)
+            current = line
+    parts.append(current)
+    return parts
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter: `rate` tokens per second, holding at most `capacity`.
+    """
+
+    def __init__(self, rate=RATE_PER_SECOND, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def delay(self):
+        """
+        Take a token if one is available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds to wait before trying again
+        """
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def pause(self, seconds):
+        """Hand out no tokens for `seconds`, e.g. after a 429 with retry_after."""
+        self.paused_until = time.monotonic() + seconds
+        self.tokens = 0.0
+
+class TelegramDispatcher:
+    """
+    Background sender of Telegram messages.
+
+    `submit` only appends to a bounded in-memory queue and returns at once,
+    so callers on the trading path never wait on Telegram. A worker thread
+    merges the messages queued within COALESCE_SECONDS into one (up to
+    MAX_MESSAGE_LENGTH, joining whole messages only; a longer message is
+    sent in parts split at line breaks), sends it over a pooled keep-alive
+    session at the pace of a token bucket, and honours 429 retry_after by
+    pausing the bucket, dropping a message after MAX_RATE_LIMITED 429s.
+    When the queue is full, the overflow policy drops the oldest or
+    the newest message; counters of what was sent and dropped are kept in
+    `stats`.
+    """
+
+    def __init__(self, bot_token, chat_id, base_url=TELEGRAM_API_URL, max_queue=MAX_QUEUE,
+                 overflow=OVERFLOW_POLICY, coalesce_seconds=COALESCE_SECONDS,
+                 rate=RATE_PER_SECOND, burst=BURST):
+        if overflow not in ('drop_oldest', 'drop_newest'):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.url = f"{base_url}/bot{bot_token}/sendMessage"
+        self.chat_id = chat_id
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.coalesce_seconds = coalesce_seconds
+        self.bucket = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=1))
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=1))
+        self.stats = {'submitted': 0, 'sent': 0, 'requests': 0, 'dropped': 0, 'failed': 0, 'rate_limited': 0}
+        self._queue = deque()        # (message, parse_mode)
+        self._cond = threading.Condition()
+        self._busy = False           # A batch has been taken from the queue and is being sent
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='telegram-dispatcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, message: str, parse_mode: Optional[str] = 'HTML') -> bool:
+        """
+        Queue a message for sending, without blocking.
+
+        Args:
+            message: The message to send
+            parse_mode: Message format ('HTML' or 'Markdown')
+
+        Returns:
+            bool: False if the message was dropped because the queue is full (with 'drop_newest') or closed
+        """
+        with self._cond:
+            if self._closed:
+                return False
+            self.stats['submitted'] += 1
+            if len(self._queue) >= self.max_queue:
+                self.stats['dropped'] += 1
+                if self.overflow == 'drop_newest':
+                    return False
+                self._queue.popleft()
+            self._queue.append((message, parse_mode))
+            self._cond.notify()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued message has been sent or dropped.
+
+        Returns:
+            bool: True if the queue drained within `timeout` seconds
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop accepting messages, send what is queued and stop the worker."""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout)
+        self.session.close()
+
+    def _take_batch(self):
+        # Wait for a message, give a burst COALESCE_SECONDS to arrive, then merge the whole messages that fit
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue or self._closed)
+            if not self._queue:
+                return None
+        time.sleep(self.coalesce_seconds)
+        with self._cond:
+            parts = []
+            length = 0
+            parse_mode = self._queue[0][1]
+            while self._queue and self._queue[0][1] == parse_mode:
+                message = self._queue[0][0]
+                added = len(message) + (2 if parts else 0)
+                if parts and length + added > MAX_MESSAGE_LENGTH:
+                    break
+                self._queue.popleft()
+                parts.append(message)
+                length += added
+            self._busy = True
+        # Only a single message can exceed the limit; it is sent in several parts
+        return split_message("\n\n".join(parts)), parse_mode, len(parts)
+
+    def _done(self):
+        with self._cond:
+            self._busy = False
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            texts, parse_mode, count = batch
+            try:
+                if all([self._send(text, parse_mode) for text in texts]):
+                    self.stats['sent'] += count
+                else:
+                    self.stats['failed'] += count
+            finally:
+                self._done()
+
+    def _send(self, text, parse_mode):
+        data = {"chat_id": self.chat_id, "text": text}
+        if parse_mode:
+            data["parse_mode"] = parse_mode
+        attempts = 0
+        rate_limited = 0
+        while attempts < MAX_ATTEMPTS:
+            wait = self.bucket.delay()
+            if wait:
+                time.sleep(wait)
+                continue
+            self.stats['requests'] += 1
+            try:
+                response = self.session.post(self.url, data=data, timeout=REQUEST_TIMEOUT)
+            except requests.RequestException as e:
+                logger.warning(f"Telegram request failed: {e}")
+                attempts += 1
+                time.sleep(2 ** attempts)
+                continue
+            if response.status_code == 429:
+                # Rate limiting doesn't count as a failed attempt; wait as long as Telegram asks, up to a point
+                self.stats['rate_limited'] += 1
+                rate_limited += 1
+                try:
+                    retry_after = response.json().get('parameters', {}).get('retry_after')
+                except ValueError:
+                    retry_after = None
+                self.bucket.pause(float(retry_after or response.headers.get('Retry-After', 30)))
+                if rate_limited >= MAX_RATE_LIMITED:
+                    logger.error(f"Dropping Telegram notification after {rate_limited} rate-limited attempts")
+                    return False
+                continue
+            if response.status_code >= 500:
+                logger.warning(f"Telegram server error {response.status_code}")
+                attempts += 1
+                time.sleep(2 ** attempts)
+                continue
+            if not response.ok:
+                logger.error(f"Telegram rejected message: {response.status_code} {response.text[:200]}")
+                return False
+            return True
+        logger.error("Failed to send Telegram notification after retries")
+        return False
+
 class TelegramBot:
     def __init__(self, token, chat_id):
         self.token = token
@@ -24,52 +268,28 @@ class TelegramBot:
         return response.json()
 
 class TelegramNotifier:
-    def __init__(self):
+    def __init__(self, base_url=TELEGRAM_API_URL):
         self.bot_token = read_secret('telegram_bot_token')
         self.chat_id = read_secret('telegram_chat_id')
-        self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
-        self.last_sent = 0
-        self.min_interval = 1  # Minimum 1 second between messages
 
         if not self.bot_token or not self.chat_id:
             raise ValueError("Telegram credentials not properly configured")
 
+        # Messages are sent by a background worker, so callers never wait on Telegram
+        self.dispatcher = TelegramDispatcher(self.bot_token, self.chat_id, base_url)
+
     def send_message(self, message: str, parse_mode: Optional[str] = 'HTML') -> bool:
         """
-        Send a message through Telegram.
+        Queue a message for sending through Telegram; returns immediately.
         
         Args:
             message: The message to send
             parse_mode: Message format ('HTML' or 'Markdown')
         
         Returns:
-            bool: True if message was sent successfully
+            bool: True if the message was queued (see TelegramDispatcher for delivery)
         """
-        # Ensure we don't exceed rate limits
-        current_time = time.time()
-        if current_time - self.last_sent < self.min_interval:
-            time.sleep(self.min_interval)
-        
-        try:
-            url = f"{self.base_url}/sendMessage"
-            data = {
-                "chat_id": self.chat_id,
-                "text": message,
-                "parse_mode": parse_mode
-            }
-            
-            response = requests.post(url, data=data)
-            if response.status_code == 429:  # Too Many Requests
-                retry_after = int(response.headers.get('Retry-After', 30))
-                time.sleep(retry_after)
-                return self.send_message(message)  # Retry after waiting
-            
-            self.last_sent = time.time()
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send Telegram notification: {str(e)}")
-            return False
+        return self.dispatcher.submit(message, parse_mode)
 
     def send_trade_alert(self, trade_type: str, symbol: str, price: float, 
                         stop_loss: float, take_profit: float) -> bool:
@@ -143,4 +363,14 @@ class TelegramNotifier:
             f"📈 {symbol}\n"
             f"💵 Profit: {profit:.2f}"
         )
-        return self.send_message(message) 
\ No newline at end of file
+        return self.send_message(message) 
+
+@lazy_singleton
+def get_notifier():
+    """
+    The process's shared TelegramNotifier, created (and its secrets read) on first use.
+
+    Every module sends through this one notifier, so all messages share one
+    dispatcher: one rate limit, one coalescing queue and one connection pool.
+    """
+    return TelegramNotifier()
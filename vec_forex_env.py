@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+from forex_env import WINDOW_SIZE, TRADE_UNITS, STOP_LOSS_PIPS, TAKE_PROFIT_PIPS
+from price_array import PriceArray, to_price_array
+from position_ledger import PositionLedger, PIP_SIZE, MAX_POSITIONS, DEFAULT_SPREAD, DEFAULT_COMMISSION
+
+def stack_price_arrays(historical_data, window_size=WINDOW_SIZE):
+    """
+    Concatenate the market data of one or more instruments into a single price array.
+
+    Parameters:
+    - historical_data (pd.DataFrame, dict or PriceArray): Market data, or a
+      mapping of instrument name to market data (DataFrames or PriceArrays)
+      with identical numeric columns. A PriceArray is returned unchanged.
+    - window_size (int, optional): Bars per observation. Defaults to WINDOW_SIZE.
+
+    Returns:
+    - PriceArray: The read-only stacked prices, their column names and the
+      number of rows contributed by each instrument, in order.
+    """
+    if isinstance(historical_data, PriceArray):
+        return historical_data
+    if isinstance(historical_data, pd.DataFrame):
+        historical_data = {None: historical_data}
+
+    arrays = []
+    columns = None
+    for data in historical_data.values():
+        prices, data_columns = data[:2] if isinstance(data, PriceArray) else to_price_array(data)
+        if len(prices) <= window_size:
+            raise ValueError(f"Need more than {window_size} rows of market data per instrument")
+        if columns is not None and data_columns != columns:
+            raise ValueError("All instruments must share the same numeric columns")
+        columns = data_columns
+        arrays.append(prices)
+
+    prices = np.concatenate(arrays) if len(arrays) > 1 else arrays[0]
+    prices.flags.writeable = False
+    return PriceArray(prices, columns, [len(a) for a in arrays])
+
+class VecForexEnv(VecEnv):
+    """
+    Vectorized Forex trading environment following the stable-baselines3 VecEnv interface.
+
+    Steps `num_envs` independent episodes over one shared price array with a
+    single NumPy call per step instead of one Python `ForexEnv.step` per episode.
+    Each episode runs over one instrument segment of the shared array and starts
+    at a random offset within it. Finished episodes are reset automatically and
+    their last observation is returned in `info['terminal_observation']`.
+
+    Trading and rewards follow ForexEnv.step, with one PositionLedger account
+    per episode.
+
+    For evaluation, `episode_bounds` pins each environment to a fixed row range
+    instead: every episode (and every automatic reset) starts at the beginning
+    of its range and runs to its end, so a backtest can step many instruments
+    or slices of history in lockstep.
+    """
+
+    def __init__(self, historical_data, num_envs=8, window_size=WINDOW_SIZE, seed=None, trade_units=TRADE_UNITS,
+                 stop_loss_pips=STOP_LOSS_PIPS, take_profit_pips=TAKE_PROFIT_PIPS,
+                 spread=DEFAULT_SPREAD, commission=DEFAULT_COMMISSION, max_positions=MAX_POSITIONS,
+                 episode_bounds=None):
+        """
+        Parameters:
+        - historical_data (pd.DataFrame, dict or PriceArray): Market data, a
+          mapping of instrument name to market data with identical numeric
+          columns, or a PriceArray (e.g. memory-mapped by `load_price_array`).
+        - num_envs (int, optional): Number of parallel episodes. Defaults to 8.
+        - window_size (int, optional): Bars per observation. Defaults to WINDOW_SIZE.
+        - seed (int or np.random.SeedSequence, optional): Seed for episode start
+          offsets. Defaults to None.
+        - trade_units, stop_loss_pips, take_profit_pips, spread, commission,
+          max_positions: Simulated order parameters, as for ForexEnv.
+        - episode_bounds (array-like, optional): (start, end) row range of each
+          environment's episodes, overriding `num_envs` and random starts.
+          Ranges may overlap but must not cross instrument segments.
+        """
+        historical_data = stack_price_arrays(historical_data, window_size)
+
+        self.window_size = window_size
+        self.prices = historical_data.prices
+        self.columns = historical_data.columns
+        self._close_idx = self.columns.index('close') if 'close' in self.columns else None
+        self._high_idx = self.columns.index('high') if 'high' in self.columns else self._close_idx
+        self._low_idx = self.columns.index('low') if 'low' in self.columns else self._close_idx
+        lengths = np.asarray(historical_data.segment_lengths)
+        segment_ends = np.cumsum(lengths)
+        segment_starts = segment_ends - lengths
+
+        self.fixed_starts = episode_bounds is not None
+        if self.fixed_starts:
+            bounds = np.asarray(episode_bounds, dtype=np.int64).reshape(-1, 2)
+            if (bounds[:, 1] - bounds[:, 0] <= window_size).any():
+                raise ValueError(f"Every episode needs more than {window_size} rows")
+            num_envs = len(bounds)
+            self.instrument_idx = np.searchsorted(segment_ends, bounds[:, 0], side='right')
+            self._segment_start = bounds[:, 0].copy()
+            self._segment_end = bounds[:, 1].copy()
+        else:
+            # Episodes are spread round-robin over the instrument segments
+            self.instrument_idx = np.arange(num_envs) % len(lengths)
+            self._segment_start = segment_starts[self.instrument_idx]
+            self._segment_end = segment_ends[self.instrument_idx]
+        self._window_offsets = np.arange(window_size)
+
+        observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(window_size * len(self.columns),), dtype=np.float32)
+        action_space = spaces.Discrete(3)
+        self.render_mode = None
+        super().__init__(num_envs, observation_space, action_space)
+
+        self._rng = np.random.default_rng(seed)
+        self._actions = np.zeros(num_envs, dtype=np.int64)
+        self.current_step = self._segment_start.copy()
+        self.initial_balance = 10000
+        self.balance = np.full(num_envs, self.initial_balance, dtype=np.float64)
+        self.equity = self.balance.copy()
+        self.profit_pool = np.zeros(num_envs, dtype=np.float64)
+        self.trade_units = trade_units
+        self.stop_loss_distance = stop_loss_pips * PIP_SIZE
+        self.take_profit_distance = take_profit_pips * PIP_SIZE
+        self.positions = PositionLedger(num_envs, capacity=max_positions, spread=spread, commission=commission)
+
+    def _reset_envs(self, mask):
+        """
+        Start new episodes for the environments selected by `mask`.
+
+        Parameters:
+        - mask (np.ndarray): Boolean array of environments to reset.
+        """
+        if self.fixed_starts:
+            self.current_step[mask] = self._segment_start[mask]
+        else:
+            # Random start anywhere that leaves at least one step before the episode ends
+            last_start = self._segment_end[mask] - self.window_size - 1
+            self.current_step[mask] = self._rng.integers(self._segment_start[mask], last_start, endpoint=True)
+        self.balance[mask] = self.initial_balance
+        self.equity[mask] = self.initial_balance
+        self.profit_pool[mask] = 0
+        self.positions.reset(mask)
+
+    def _observe(self):
+        """
+        Gather the observation window of every environment in one fancy-indexing call.
+
+        Returns:
+        - np.ndarray: Observations of shape (num_envs, window_size * columns).
+        """
+        idx = self.current_step[:, None] + self._window_offsets
+        valid = idx < self._segment_end[:, None]
+        obs = self.prices[np.minimum(idx, len(self.prices) - 1)]
+        obs[~valid] = 0  # Zero-pad windows that run past the end of their segment
+        return obs.reshape(self.num_envs, -1)
+
+    def reset(self):
+        if self._seeds[0] is not None:
+            self._rng = np.random.default_rng(self._seeds[0])
+        self._reset_seeds()
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self._observe()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions).reshape(self.num_envs)
+
+    def step_wait(self):
+        # Trading logic mirrors ForexEnv.step
+        bars = self.current_step + self.window_size - 1
+        current_price = self.prices[bars, self._close_idx]
+        realized_before = self.positions.realized_pnl.copy()
+        self.positions.open(self._actions == 1, self.trade_units, current_price,
+                            self.stop_loss_distance, self.take_profit_distance)
+        self.positions.open(self._actions == 2, -self.trade_units, current_price,
+                            self.stop_loss_distance, self.take_profit_distance)
+
+        self.current_step += 1
+        dones = self.current_step >= self._segment_end - self.window_size
+
+        bars += 1
+        self.positions.check_exits(self.prices[bars, self._high_idx], self.prices[bars, self._low_idx])
+        unrealized = self.positions.unrealized_pnl(self.prices[bars, self._close_idx])
+
+        self.profit_pool = self.positions.realized_pnl.copy()
+        previous_equity = self.equity
+        self.equity = self.balance + self.profit_pool + unrealized
+        rewards = (self.equity - previous_equity).astype(np.float32)
+        dones |= self.equity <= 0
+        trade_profit = self.profit_pool - realized_before
+
+        infos = [{'current_equity': self.equity[i], 'trade_profit': trade_profit[i]} for i in range(self.num_envs)]
+        if dones.any():
+            terminal_obs = self._observe()
+            for i in np.flatnonzero(dones):
+                infos[i]['terminal_observation'] = terminal_obs[i]
+            self._reset_envs(dones)
+        return self._observe(), rewards, dones, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        value = getattr(self, attr_name)
+        if isinstance(value, np.ndarray) and value.shape[:1] == (self.num_envs,):
+            return [value[i] for i in self._get_indices(indices)]
+        return [value for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        current = getattr(self, attr_name, None)
+        if isinstance(current, np.ndarray) and current.shape[:1] == (self.num_envs,):
+            current[list(self._get_indices(indices))] = value
+        else:
+            setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        # All episodes share this object, so the method is invoked once and can't target some of them
+        indices = list(self._get_indices(indices))
+        if set(indices) != set(range(self.num_envs)):
+            raise ValueError(f"{method_name} acts on every environment of a VecForexEnv; call env_method with indices=None")
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result for _ in indices]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
@@ -1,30 +1,174 @@
+from flask import request
 from flask_socketio import SocketIO, emit
 import json
-import pandas as pd
+import math
 from datetime import datetime
-import os
 from market_simulator import MarketDataSimulator
 import threading
 import time
-from utils.telegram_notifications import TelegramNotifier
+from utils.telegram_notifications import get_notifier
+from trade_journal import get_trade_journal
 
-# Initialize the notifier
-notifier = TelegramNotifier()
+# Market data fan-out
+EMIT_INTERVAL = 0.1        # Seconds between broadcasts; ticks arriving in between are sent as one batch
+MAX_BATCH_TICKS = 50       # Ticks of one instrument per broadcast before conflating to the latest price
+ALL_INSTRUMENTS_ROOM = 'market_data:*'
+INSTRUMENT_ROOM = 'market_data:{}'
+
+class MarketDataHub:
+    """
+    Batched, room-based fan-out of market data ticks to Socket.IO clients.
+
+    Producers only `publish` ticks into per-instrument batches; a background
+    task broadcasts the batches every `emit_interval` seconds as one
+    'market_data_batch' event per room, so each batch is encoded once however
+    many clients are in the room. Clients receive every instrument by default
+    and can `subscribe` to some instruments, or ask to be throttled: throttled
+    clients get only the latest price of each of their instruments, at most
+    once per their interval. Bursts beyond MAX_BATCH_TICKS per instrument are
+    conflated to the latest price.
+
+    This replaces the per-tick 'market_data' event, whose payload was one
+    tick: clients listening for it receive nothing and must handle
+    'market_data_batch', whose payload is a list of ticks, instead.
+
+    The broadcast task runs on the server's async mode (eventlet or gevent
+    when installed, threads otherwise), via `socketio.start_background_task`.
+    """
+
+    def __init__(self, socketio, emit_interval=EMIT_INTERVAL, namespace='/'):
+        self.socketio = socketio
+        self.emit_interval = emit_interval
+        self.namespace = namespace
+        self.stats = {'published': 0, 'broadcasts': 0, 'conflated': 0}
+        self._lock = threading.Lock()
+        self._pending = {}      # Instrument -> ticks published since the last broadcast
+        self._latest = {}       # Instrument -> (sequence number, latest tick)
+        self._sequence = 0      # Ticks published so far
+        self._throttled = {}    # sid -> [instruments (None for all), interval, next send time, last sequence sent]
+        self._task = None
+
+    def publish(self, tick):
+        """
+        Queue a tick for the next broadcast; O(1) and never blocks on clients.
+        """
+        with self._lock:
+            self._pending.setdefault(tick['instrument'], []).append(tick)
+            self._sequence += 1
+            self._latest[tick['instrument']] = (self._sequence, tick)
+            self.stats['published'] += 1
+
+    def subscribe(self, sid, instruments=None, throttle=0):
+        """
+        Set what a client receives, replacing its previous subscription.
+
+        Parameters:
+        - sid (str): Socket.IO session id of the client.
+        - instruments (list of str, optional): Instruments to receive. Defaults to all.
+        - throttle (float, optional): Minimum seconds between updates. Clients
+          slower than the emit interval get the latest price per instrument only.
+        """
+        server = self.socketio.server
+        for room in server.rooms(sid, namespace=self.namespace):
+            if room.startswith(INSTRUMENT_ROOM.format('')):
+                server.leave_room(sid, room, namespace=self.namespace)
+        instruments = sorted(set(instruments)) if instruments else None
+        with self._lock:
+            self._throttled.pop(sid, None)
+            if throttle and throttle > self.emit_interval:
+                self._throttled[sid] = [instruments, throttle, 0.0, 0]
+                return
+        for instrument in instruments or ['*']:
+            room = ALL_INSTRUMENTS_ROOM if instrument == '*' else INSTRUMENT_ROOM.format(instrument)
+            server.enter_room(sid, room, namespace=self.namespace)
+
+    def unsubscribe(self, sid):
+        """Forget a disconnected client (its rooms are left by Socket.IO)."""
+        with self._lock:
+            self._throttled.pop(sid, None)
+
+    def broadcast(self):
+        """
+        Send the ticks published since the last call to every room, and the
+        prices updated since their last update to the throttled clients that are due.
+        """
+        now = time.monotonic()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            due = []
+            for sid, state in self._throttled.items():
+                if now >= state[2] and state[3] < self._sequence:
+                    due.append((sid, state[0], state[3]))
+                    state[2] = now + state[1]
+                    state[3] = self._sequence
+            latest = dict(self._latest) if due else {}
+        if pending:
+            batches = {}
+            for instrument, ticks in pending.items():
+                if len(ticks) > MAX_BATCH_TICKS:
+                    self.stats['conflated'] += len(ticks) - 1
+                    ticks = ticks[-1:]
+                batches[instrument] = ticks
+            self.socketio.emit('market_data_batch', [tick for ticks in batches.values() for tick in ticks],
+                               to=ALL_INSTRUMENTS_ROOM, namespace=self.namespace)
+            for instrument, ticks in batches.items():
+                self.socketio.emit('market_data_batch', ticks, to=INSTRUMENT_ROOM.format(instrument),
+                                   namespace=self.namespace)
+            self.stats['broadcasts'] += 1
+        for sid, instruments, sent in due:
+            snapshot = [latest[i][1] for i in (instruments or latest) if i in latest and latest[i][0] > sent]
+            if snapshot:
+                self.socketio.emit('market_data_batch', snapshot, to=sid, namespace=self.namespace)
+
+    def _run(self):
+        while True:
+            self.socketio.sleep(self.emit_interval)
+            self.broadcast()
+
+    def start(self):
+        """Start the broadcast task (once)."""
+        if self._task is None:
+            self._task = self.socketio.start_background_task(self._run)
 
 def init_socketio(app):
     socketio = SocketIO(app, cors_allowed_origins="*")
+    hub = MarketDataHub(socketio)
+    app.extensions['market_data_hub'] = hub
     
     @socketio.on('connect')
     def handle_connect():
         print('Client connected')
+        hub.subscribe(request.sid)
         emit('status', {'data': 'Connected'})
     
     @socketio.on('disconnect')
     def handle_disconnect():
         print('Client disconnected')
+        hub.unsubscribe(request.sid)
+
+    @socketio.on('subscribe')
+    def handle_subscribe(data):
+        # {'instruments': [...], 'throttle': seconds}; both optional
+        data = data or {}
+        if not isinstance(data, dict):
+            emit('subscribe_error', {'error': "Subscription must be an object"})
+            return
+        instruments, throttle = data.get('instruments'), data.get('throttle') or 0
+        if instruments is not None and (not isinstance(instruments, list) or
+                                        not all(isinstance(i, str) for i in instruments)):
+            emit('subscribe_error', {'error': "instruments must be a list of instrument names"})
+            return
+        if isinstance(throttle, bool) or not isinstance(throttle, (int, float)) or not 0 <= throttle < math.inf:
+            emit('subscribe_error', {'error': "throttle must be a non-negative number of seconds"})
+            return
+        hub.subscribe(request.sid, instruments, float(throttle))
+        emit('subscribed', {'instruments': instruments or '*', 'throttle': throttle})
     
     @socketio.on('place_trade')
     def handle_trade(data):
+        if not isinstance(data, dict):
+            emit('trade_error', {'trade_id': None, 'error': "Trade must be an object"})
+            return
         # Process trade request
         trade = {
             'trade_id': data.get('trade_id'),
@@ -34,28 +178,35 @@ def init_socketio(app):
             'price': data.get('price'),
             'timestamp': datetime.now().isoformat()
         }
-        # Save trade to CSV
-        df = pd.DataFrame([trade])
-        df.to_csv('data/trades.csv', mode='a', 
-                 header=not os.path.exists('data/trades.csv'),
-                 index=False)
+        # Queue the trade for the journal's writer thread
+        try:
+            get_trade_journal().append(trade)
+        except (ValueError, RuntimeError) as e:
+            emit('trade_error', {'trade_id': trade['trade_id'], 'error': str(e)})
+            return
         # Emit trade confirmation
         emit('trade_confirmed', trade)
     
     return socketio 
 
-def start_market_data_stream(socketio):
+def start_market_data_stream(hub, channel=None):
+    """
+    Publish simulated ticks to the market data hub and start its broadcasts.
+
+    Parameters:
+    - hub (MarketDataHub): Socket.IO fan-out.
+    - channel (pubsub.Channel, optional): Also publish the ticks here, e.g. for the SSE endpoint.
+    """
     simulator = MarketDataSimulator()
     
     def stream_data():
-        while True:
-            for tick in simulator.generate_tick():
-                socketio.emit('market_data', tick)
-            time.sleep(1)  # Update every second
+        for tick in simulator.generate_tick():
+            hub.publish(tick)
+            if channel is not None:
+                channel.publish(tick)
     
-    thread = threading.Thread(target=stream_data)
-    thread.daemon = True
-    thread.start()
+    hub.socketio.start_background_task(stream_data)
+    hub.start()
 
 def handle_trade_close(trade_data):
     # Example trade data processing
@@ -63,4 +214,4 @@ def handle_trade_close(trade_data):
     symbol = trade_data.get('instrument')
 
     if profit > 0:
-        notifier.send_profit_notification(symbol, profit)
\ No newline at end of file
+        get_notifier().send_profit_notification(symbol, profit)
\ No newline at end of file